@@ -0,0 +1,166 @@
+import argparse
+import glob
+import json
+import os
+import time
+from multiprocessing import Pool
+
+import cv2
+
+from read_board import CameraFeed
+from game_tracker import GameTracker
+from connect4_solver import RED, YEL, choose_best_move
+from color_calibration import calibration_path
+
+# Headless batch analysis of recorded games.
+#
+# Runs CameraFeed -> stability -> move/cheat detection -> solver over each
+# video as fast as it decodes (no Tk, no frame pacing), one process per file,
+# and writes <out-dir>/<video name>.jsonl with one event per line:
+#
+#   board       new stable board
+#   move        detected move (row, col, color, turn)
+#   illegal     stable board changed by something other than one new piece
+#   cheat       same color moved twice
+#   winner      four in a row
+#   ignored     first player did not follow the suggestion
+#   suggestion  AI column for the current stable board
+#   new_game    board cleared after a finished game
+#   summary     frame counts and throughput, always last
+#
+#   python analyze_videos.py "Test Videos"/*.mp4 --jobs 4 --out-dir analysis
+
+
+def analyze_video(path, out_dir, depth=4, stable_frames=5, motion_gate=False, calibration_dir=None):
+    """Analyze one video file and write its event log. Returns the summary record."""
+    cv2.setNumThreads(1)  # one process per file already uses the cores
+
+    feed = CameraFeed(lock_grid=True, roi_margin=0.1, motion_gate=motion_gate)
+    feed.begin_feed(path)
+    if calibration_dir:
+        feed.use_calibration(calibration_path(path, calibration_dir))
+    fps = feed.cap.get(cv2.CAP_PROP_FPS) or 30.0
+    tracker = GameTracker(stable_frames_required=stable_frames)
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    out_path = os.path.join(out_dir, name + ".jsonl")
+
+    frames = 0
+    analyzed = 0
+    boards = 0
+    moves = 0
+    games = 1
+    game_over = False
+    suggested_col = None
+    winners = []
+    start = time.perf_counter()
+
+    with open(out_path, "w") as out:
+        def emit(kind, **fields):
+            record = {"type": kind, "frame": frames, "t": round(frames / fps, 3)}
+            record.update(fields)
+            out.write(json.dumps(record) + "\n")
+
+        while True:
+            frame, _, board_state, _ = feed.analyze_frame()
+            if frame is None:
+                break
+            if board_state is not None:
+                boards += 1
+            if not feed.analysis_reused:
+                analyzed += 1
+
+            if tracker.update_stable_board(board_state):
+                stable = tracker.stable_board
+                emit("board", board=stable.tolist())
+
+                if game_over:
+                    # a cleared board after a finished game starts the next one
+                    if tracker.start_next_game():
+                        game_over = False
+                        suggested_col = None
+                        games += 1
+                        emit("new_game", game=games)
+                else:
+                    cheater, winner = tracker.process_move(timestamp=frames / fps)
+                    if tracker.last_move_col is not None:
+                        moves += 1
+                        emit("move", row=tracker.last_move_row, col=tracker.last_move_col,
+                             color=tracker.last_move_color, turn=tracker.turn_number)
+                    elif tracker.prev_stable_board is not None:
+                        emit("illegal", previous=tracker.prev_stable_board.tolist())
+                    if cheater is not None:
+                        emit("cheat", color=cheater)
+                        game_over = True
+                    if winner is not None:
+                        emit("winner", color=winner)
+                        winners.append(winner)
+                        game_over = True
+                    if cheater is None and winner is None and tracker.ignored_suggestion(suggested_col):
+                        emit("ignored", played=tracker.last_move_col, suggested=suggested_col)
+
+                    if not game_over:
+                        suggested_col, score = choose_best_move(stable.tolist(), ai_piece=YEL, depth=depth)
+                        emit("suggestion", col=suggested_col, score=score)
+
+            frames += 1
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            "video": path,
+            "frames": frames,
+            "frames_with_board": boards,
+            "frames_analyzed": analyzed,
+            "moves": moves,
+            "games": games,
+            "winners": ["red" if w == RED else "yellow" for w in winners],
+            "seconds": round(elapsed, 3),
+            "fps": round(frames / elapsed, 1) if elapsed else None,
+            "realtime_factor": round(frames / fps / elapsed, 2) if elapsed else None,
+        }
+        emit("summary", **summary)
+
+    feed.close_feed()
+    return summary
+
+
+def _run(job):
+    return analyze_video(*job)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless analysis of recorded Connect 4 videos.")
+    parser.add_argument("videos", nargs="*", help="video files (default: Test Videos/*.mp4)")
+    parser.add_argument("--out-dir", default="analysis", help="where the .jsonl logs go")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="parallel processes")
+    parser.add_argument("--depth", type=int, default=4, help="solver depth for suggestions")
+    parser.add_argument("--stable-frames", type=int, default=5,
+                        help="frames in each cell's stability vote window")
+    parser.add_argument("--motion-gate", action="store_true",
+                        help="only analyze frames after motion stops (reuse results otherwise)")
+    parser.add_argument("--calibration-dir", default=None,
+                        help="classify with per-video color calibrations stored here (created on first run)")
+    args = parser.parse_args()
+
+    videos = args.videos or sorted(glob.glob("Test Videos/*.mp4"))
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs = [(path, args.out_dir, args.depth, args.stable_frames, args.motion_gate, args.calibration_dir)
+            for path in videos]
+
+    start = time.perf_counter()
+    total_frames = 0
+    with Pool(processes=max(1, min(args.jobs, len(jobs)))) as pool:
+        for summary in pool.imap_unordered(_run, jobs):
+            total_frames += summary["frames"]
+            print(json.dumps(summary))
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "files": len(jobs),
+        "frames": total_frames,
+        "seconds": round(elapsed, 3),
+        "fps": round(total_frames / elapsed, 1) if elapsed else None,
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import time
+
+import cv2
+import numpy as np
+
+from read_board import STAGES, CameraFeed, StageTimer
+from frame_store import open_capture
+from synthetic_board import generate
+
+# CV benchmarks over recorded videos.
+#
+# Detection-resolution sweep (default): every frame is analyzed with full
+# detection (no grid lock) at each scale. Accuracy is measured against the
+# full-resolution, uncropped result on the same frame, so run it on videos
+# where that result is trusted.
+#
+#   python benchmark_cv.py --scales 1.0 0.75 0.5 0.35 0.25 --roi-margin 0.1
+#
+# Stage breakdown (--stages): replays the videos through
+# CameraFeed.analyze_frame() with a StageTimer and reports latency
+# percentiles per stage (decode, motion, drift, gray, detect, grid, sample,
+# classify), the fraction of frames with a full 42-cell board and overall
+# FPS. --out writes the whole report, machine info included, as JSON.
+#
+#   python benchmark_cv.py --stages --lock-grid --roi-margin 0.1 --out bench.json
+#
+# Synthetic accuracy (--synthetic N): N labeled frames from
+# synthetic_board.generate(), each analyzed from scratch. Reports how often
+# the full board is found and read exactly on unoccluded frames (overall and
+# by camera tilt), cell confusions, hole center error, how often a hand over
+# the board still yields a wrong board, and the analysis latency.
+#
+#   python benchmark_cv.py --synthetic 100000 --seed 1 --out synthetic.json
+
+PERCENTILES = [50, 90, 99]
+
+
+def run_pass(path, scale, roi_margin):
+    feed = CameraFeed(detection_scale=scale, roi_margin=roi_margin)
+    cap = open_capture(path)
+    boards = []
+    elapsed = 0.0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        start = time.perf_counter()
+        _, board_state, _ = feed.analyze(frame)
+        elapsed += time.perf_counter() - start
+        boards.append(board_state)
+    cap.release()
+    return boards, elapsed
+
+
+def compare(boards, reference):
+    found = sum(b is not None for b in reference)
+    matched = sum(
+        1 for b, r in zip(boards, reference)
+        if b is not None and r is not None and np.array_equal(b, r)
+    )
+    return {
+        "frames": len(reference),
+        "reference_boards": found,
+        "boards": sum(b is not None for b in boards),
+        "accuracy": matched / found if found else None,
+    }
+
+
+def latency_stats(samples):
+    """Count, mean, percentiles and max of a list of durations in seconds, reported in ms."""
+    ms = np.array(samples) * 1000.0
+    stats = {"frames": len(ms), "mean_ms": round(float(ms.mean()), 4)}
+    for p, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+        stats[f"p{p}_ms"] = round(float(value), 4)
+    stats["max_ms"] = round(float(ms.max()), 4)
+    return stats
+
+
+def run_stages(path, **feed_options):
+    """Replay one video with stage timing. Returns (per-frame stage times, board found flags, seconds)."""
+    feed = CameraFeed(**feed_options)
+    feed.stage_timer = StageTimer()
+    feed.begin_feed(path)
+    frames = []
+    found = []
+    start = time.perf_counter()
+    while True:
+        frame, _, board_state, _ = feed.analyze_frame()
+        if frame is None:
+            break
+        frames.append(dict(feed.stage_timer.times))
+        found.append(board_state is not None)
+    elapsed = time.perf_counter() - start
+    feed.close_feed()
+    return frames, found, elapsed
+
+
+def stage_report(frames, found, elapsed):
+    report = {
+        "frames": len(frames),
+        "full_board_fraction": round(sum(found) / len(found), 4) if found else None,
+        "fps": round(len(frames) / elapsed, 1) if elapsed else None,
+        "stages": {},
+    }
+    for stage in STAGES:
+        samples = [times[stage] for times in frames if stage in times]
+        if samples:
+            report["stages"][stage] = latency_stats(samples)
+    if frames:
+        report["total"] = latency_stats([sum(times.values()) for times in frames])
+    return report
+
+
+def run_synthetic(count, seed=0, scale=1.0):
+    feed = CameraFeed(detection_scale=scale)
+    times = []
+    confusion = np.zeros((3, 3), int)         # truth x detected, cells of found clean boards
+    bins = {"tilt": {}, "scale": {}}          # bin -> [clean frames, found, exact]
+    clean = found = exact = 0
+    occluded = occluded_reported = occluded_wrong = 0
+    center_errors = []
+
+    for frame, truth in generate(count, seed=seed):
+        start = time.perf_counter()
+        _, board_state, positions = feed.analyze(frame)
+        times.append(time.perf_counter() - start)
+
+        board = truth["board"]
+        if truth["occluded"].any() or not truth["visible"]:
+            occluded += 1
+            if board_state is not None:
+                occluded_reported += 1
+                occluded_wrong += not np.array_equal(board_state, board)
+            continue
+
+        scene = truth["scene"]
+        tilt = int(max(abs(scene["yaw"]), abs(scene["pitch"])) // 10) * 10
+        width = int(scene["scale"] * 20) * 5
+        counts = [bins["tilt"].setdefault(f"{tilt}-{tilt + 10}deg", [0, 0, 0]),
+                  bins["scale"].setdefault(f"{width}-{width + 5}%", [0, 0, 0])]
+        is_exact = board_state is not None and np.array_equal(board_state, board)
+        for row in counts:
+            row[0] += 1
+            row[1] += board_state is not None
+            row[2] += is_exact
+        clean += 1
+        if board_state is None:
+            continue
+        found += 1
+        exact += is_exact
+        np.add.at(confusion, (board.reshape(-1), board_state.cells.reshape(-1)), 1)
+        center_errors.append(float(np.linalg.norm(positions - truth["centers"], axis=2).mean()))
+
+    def ratio(a, b):
+        return round(a / b, 4) if b else None
+
+    elapsed = sum(times)
+    return {
+        "frames": count,
+        "seed": seed,
+        "scale": scale,
+        "fps": round(count / elapsed, 1) if elapsed else None,
+        "latency": latency_stats(times),
+        "clean_frames": clean,
+        "found": ratio(found, clean),
+        "exact": ratio(exact, clean),
+        "exact_when_found": ratio(exact, found),
+        "by_tilt": {name: {"frames": n, "found": ratio(f, n), "exact": ratio(e, n)}
+                    for name, (n, f, e) in sorted(bins["tilt"].items(), key=lambda item: int(item[0].split("-")[0]))},
+        "by_width": {name: {"frames": n, "found": ratio(f, n), "exact": ratio(e, n)}
+                     for name, (n, f, e) in sorted(bins["scale"].items())},
+        "cell_confusion": confusion.tolist(),
+        "center_error_px": round(float(np.mean(center_errors)), 3) if center_errors else None,
+        "occluded_frames": occluded,
+        "occluded_reported": ratio(occluded_reported, occluded),
+        "occluded_wrong": ratio(occluded_wrong, occluded),
+    }
+
+
+def print_synthetic(report):
+    print(f"{report['frames']} synthetic frames (seed {report['seed']}), {report['fps']} fps, "
+          f"p50 {report['latency']['p50_ms']:.2f} ms, p99 {report['latency']['p99_ms']:.2f} ms")
+    print(f"  clean frames {report['clean_frames']}: board found {100 * (report['found'] or 0):.1f}%, "
+          f"read exactly {100 * (report['exact'] or 0):.1f}% "
+          f"({100 * (report['exact_when_found'] or 0):.1f}% of found), "
+          f"hole center error {report['center_error_px']} px")
+    for label, key in (("tilt", "by_tilt"), ("width", "by_width")):
+        for name, row in report[key].items():
+            print(f"    {label:<5} {name:<9} {row['frames']:>7} frames  found {100 * (row['found'] or 0):5.1f}%  "
+                  f"exact {100 * (row['exact'] or 0):5.1f}%")
+    print("  cells (rows truth, columns read: empty red yellow):")
+    for name, row in zip(("empty", "red", "yellow"), report["cell_confusion"]):
+        print(f"    {name:<7} " + " ".join(f"{v:>9}" for v in row))
+    print(f"  occluded / cut-off frames {report['occluded_frames']}: board reported "
+          f"{100 * (report['occluded_reported'] or 0):.1f}%, wrong board {100 * (report['occluded_wrong'] or 0):.1f}%")
+
+
+def machine_info():
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def print_stage_table(name, report):
+    print(f"{name}: {report['frames']} frames, {report['fps']} fps, "
+          f"full board in {100 * (report['full_board_fraction'] or 0):.1f}%")
+    print(f"  {'stage':<10} {'frames':>7} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  (ms)")
+    rows = list(report["stages"].items())
+    if "total" in report:
+        rows.append(("total", report["total"]))
+    for stage, st in rows:
+        print(f"  {stage:<10} {st['frames']:>7} {st['mean_ms']:>8.3f} {st['p50_ms']:>8.3f} "
+              f"{st['p90_ms']:>8.3f} {st['p99_ms']:>8.3f} {st['max_ms']:>8.3f}")
+
+
+def main_stages(args, videos):
+    options = {
+        "lock_grid": args.lock_grid,
+        "detection_scale": args.scales[0] if args.scales else 1.0,
+        "roi_margin": args.roi_margin,
+        "motion_gate": args.motion_gate,
+    }
+    result = {"machine": machine_info(), "options": options, "videos": {}}
+    all_frames, all_found, all_elapsed = [], [], 0.0
+    for path in videos:
+        frames, found, elapsed = run_stages(path, **options)
+        result["videos"][path] = stage_report(frames, found, elapsed)
+        all_frames += frames
+        all_found += found
+        all_elapsed += elapsed
+    result["all"] = stage_report(all_frames, all_found, all_elapsed)
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for path, report in result["videos"].items():
+            print_stage_table(path, report)
+        print_stage_table("all videos", result["all"])
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detection FPS vs accuracy at several detection scales.")
+    parser.add_argument("videos", nargs="*", help="video files (default: Test Videos/*.mp4)")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.75, 0.5, 0.35, 0.25])
+    parser.add_argument("--roi-margin", type=float, default=None,
+                        help="crop detection to the last board box grown by this fraction")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per result")
+    parser.add_argument("--stages", action="store_true",
+                        help="per-stage latency breakdown instead of the scale sweep (uses the first scale)")
+    parser.add_argument("--lock-grid", action="store_true", help="--stages: lock the grid like the GUIs")
+    parser.add_argument("--motion-gate", action="store_true", help="--stages: enable the motion gate")
+    parser.add_argument("--out", default=None, help="--stages / --synthetic: write the full JSON report here")
+    parser.add_argument("--synthetic", type=int, default=None, metavar="N",
+                        help="accuracy and throughput on N synthetic labeled frames (uses the first scale)")
+    parser.add_argument("--seed", type=int, default=0, help="--synthetic: generator seed")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        report = run_synthetic(args.synthetic, seed=args.seed, scale=args.scales[0])
+        report["machine"] = machine_info()
+        if args.json:
+            print(json.dumps(report))
+        else:
+            print_synthetic(report)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2)
+        return
+
+    videos = args.videos or sorted(glob.glob("Test Videos/*.mp4"))
+    if args.stages:
+        main_stages(args, videos)
+        return
+    results = []
+    for path in videos:
+        reference, _ = run_pass(path, 1.0, None)
+        for scale in args.scales:
+            boards, elapsed = run_pass(path, scale, args.roi_margin)
+            result = {"video": path, "scale": scale, "roi_margin": args.roi_margin}
+            result.update(compare(boards, reference))
+            result["fps"] = len(boards) / elapsed if elapsed else None
+            results.append(result)
+            if args.json:
+                print(json.dumps(result))
+
+    if not args.json:
+        print(f"{'video':<40} {'scale':>6} {'fps':>8} {'boards':>8} {'accuracy':>9}")
+        for r in results:
+            acc = "-" if r["accuracy"] is None else f"{100 * r['accuracy']:.1f}%"
+            print(f"{r['video']:<40} {r['scale']:>6.2f} {r['fps']:>8.1f} "
+                  f"{r['boards']:>4}/{r['frames']:<3} {acc:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import numpy as np
+
+from connect4_solver import EMPTY
+
+# Compact board type shared by the CV, the game tracking, the GUIs and the
+# solver.
+#
+# A Board is immutable: a read-only (rows, columns) int8 array (0 empty,
+# 1 red, 2 yellow, row 0 at the top) plus its 42-byte key. Boards hash and
+# compare by that key, so they work as dict / cache keys and comparing two
+# of them is one bytes compare (None is simply unequal). Against anything
+# else (a number, a NumPy array) == works cell by cell like an array, and
+# NumPy functions see the cells through __array__, so
+# np.array_equal(board, array) and np.any(board) keep working.
+#
+#   board = Board(labels.reshape(6, 7))
+#   board == other                           # True / False
+#   board.diff(previous)                     # [(row, col, before, after), ...]
+#   choose_best_move(board.tolist(), ...)    # solver rows, straight from the bytes
+
+SHAPE = (6, 7)
+
+
+class Board():
+    __slots__ = ("cells", "key", "_hash")
+
+    def __init__(self, cells):
+        if isinstance(cells, Board):
+            cells = cells.cells
+        cells = np.array(cells, dtype=np.int8)   # always a private copy
+        if cells.ndim != 2:
+            raise ValueError(f"board must be 2-D, got shape {cells.shape}")
+        cells.flags.writeable = False
+        self.cells = cells
+        self.key = cells.tobytes()
+        self._hash = hash((self.key, cells.shape))
+
+    @classmethod
+    def empty(cls, shape=SHAPE):
+        return cls(np.zeros(shape, np.int8))
+
+    @classmethod
+    def from_key(cls, key, shape=SHAPE):
+        return cls(np.frombuffer(key, dtype=np.int8).reshape(shape))
+
+    @property
+    def shape(self):
+        return self.cells.shape
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return self.key == other.key and self.cells.shape == other.cells.shape
+        if other is None:
+            return False
+        return self.cells == other
+
+    def __ne__(self, other):
+        if isinstance(other, Board) or other is None:
+            return not self == other
+        return self.cells != other
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __array__(self, dtype=None, copy=None):
+        return self.cells if dtype is None else self.cells.astype(dtype)
+
+    def __reduce__(self):
+        return Board.from_key, (self.key, self.cells.shape)
+
+    def __repr__(self):
+        return f"Board({self.tolist()})"
+
+    def tolist(self):
+        """Rows as lists of ints: the solver's board form."""
+        key, columns = self.key, self.cells.shape[1]
+        return [list(key[i:i + columns]) for i in range(0, len(key), columns)]
+
+    def diff(self, other):
+        """Cells that differ from `other`: [(row, col, before, after), ...] (before = other)."""
+        other = other.cells if isinstance(other, Board) else np.asarray(other)
+        rows, cols = np.nonzero(self.cells != other)
+        return [(int(r), int(c), int(other[r, c]), int(self.cells[r, c])) for r, c in zip(rows, cols)]
+
+    def pieces(self):
+        return int(np.count_nonzero(self.cells))
+
+    def next_open_row(self, col):
+        """Lowest empty row of `col`, or None when the column is full."""
+        empty = np.flatnonzero(self.cells[:, col] == EMPTY)
+        return int(empty[-1]) if len(empty) else None
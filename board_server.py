@@ -0,0 +1,426 @@
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import math
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board
+from connect4_solver import EMPTY, RED, YEL, choose_best_move, search_best_move
+from multi_board import board_worker, parse_source
+
+# Local board server for spectator screens and scoreboards.
+#
+# Every source runs multi_board.board_worker in its own process (CV + game
+# rules), so clients never slow down capture. A reader thread hands the
+# worker events to the asyncio loop, which keeps a snapshot per board and
+# fans each event out to the connected clients as server-sent events. Every
+# client has a bounded queue; one that falls behind loses its oldest events
+# instead of holding up the others. Suggestions and /analyze requests go to
+# a solver process pool; identical requests in flight share one search and
+# finished ones are cached.
+#
+#   python board_server.py 0                                 # camera 0, http://127.0.0.1:8765
+#   python board_server.py "Test Videos"/*.mp4 --realtime --port 9000
+#
+#   GET  /events    text/event-stream: "state" (snapshot) first, then board, move,
+#                   cheat, winner, new_game, stats, end and suggestion events
+#   GET  /state     JSON snapshot of every board
+#   POST /analyze   {"board": 6x7 rows (0 empty, 1 red, 2 yellow), "ai_piece": 2,
+#                    "depth": 6, "time_budget": 1.0} -> {"col", "score", "depth"}
+#                   time_budget defaults to the server's (--time-budget), at most
+#                   10 s; a server without one searches at most depth 6
+
+DEFAULT_PORT = 8765
+CLIENT_QUEUE = 256           # events buffered per client
+KEEPALIVE = 15.0             # seconds between comments on an idle event stream
+MAX_BODY = 64 * 1024
+MAX_DEPTH = 12
+MAX_TIME_BUDGET = 10.0       # seconds an /analyze request may ask for
+MAX_UNBUDGETED_DEPTH = 6     # deepest search without a time budget (a few seconds on one core)
+
+
+def _analyze(board, ai_piece, depth, time_budget):
+    if time_budget is not None:
+        return search_best_move(board, ai_piece=ai_piece, time_budget=time_budget, max_depth=depth)
+    col, score = choose_best_move(board, ai_piece=ai_piece, depth=depth)
+    return col, score, depth
+
+
+def parse_board(value, rows=6, columns=7):
+    """6x7 list of 0/1/2 from a request, or ValueError."""
+    if (not isinstance(value, list) or len(value) != rows or
+            any(not isinstance(row, list) or len(row) != columns for row in value)):
+        raise ValueError(f"board must be {rows} rows of {columns} cells")
+    if any(cell not in (EMPTY, RED, YEL) or isinstance(cell, bool) for row in value for cell in row):
+        raise ValueError("cells must be 0 (empty), 1 (red) or 2 (yellow)")
+    return [list(row) for row in value]
+
+
+def parse_time_budget(value, default):
+    """Seconds for a search from a request (`default` when missing, at most MAX_TIME_BUDGET), or ValueError."""
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError("time_budget must be a number of seconds")
+    if not math.isfinite(value) or value <= 0:
+        raise ValueError("time_budget must be a positive number of seconds")
+    return min(float(value), MAX_TIME_BUDGET)
+
+
+class Analyzer():
+    """
+    Solver process pool behind coroutines. Requests for a position that is
+    already being searched (same board, piece and limits) wait for that
+    search instead of starting another; results are kept in an LRU cache.
+    """
+    def __init__(self, workers=1, cache_size=1024):
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.inflight = {}
+        self.searches = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    async def analyze(self, board, ai_piece=YEL, depth=6, time_budget=None):
+        """(col, score, depth) for `board` (list of rows)."""
+        key = (Board(board).key, ai_piece, depth, time_budget)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            return self.cache[key]
+
+        future = self.inflight.get(key)
+        if future is None:
+            self.searches += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.pool, _analyze, board, ai_piece, depth, time_budget)
+            self.inflight[key] = future
+            future.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        # shielded: a client that disconnects doesn't cancel the others' search
+        return await asyncio.shield(future)
+
+    def _finished(self, key, future):
+        self.inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.cache[key] = future.result()
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class Broadcaster():
+    """Fan-out to event-stream clients; each message is encoded once."""
+    def __init__(self, queue_size=CLIENT_QUEUE):
+        self.queue_size = queue_size
+        self.clients = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        client = asyncio.Queue(maxsize=self.queue_size)
+        self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        self.clients.discard(client)
+
+    @staticmethod
+    def message(kind, data):
+        return f"event: {kind}\ndata: {json.dumps(data)}\n\n".encode()
+
+    def publish(self, kind, data):
+        self.published += 1
+        self._put(self.message(kind, data))
+
+    def close(self):
+        self._put(None)                      # ends every stream
+
+    def _put(self, message):
+        for client in self.clients:
+            if client.full():
+                client.get_nowait()          # a slow client loses its oldest event
+                self.dropped += 1
+            client.put_nowait(message)
+
+
+class BoardServer():
+    def __init__(self, sources=(), depth=6, time_budget=1.0, solver_workers=1, stable_frames=5,
+                 motion_gate=True, realtime=False):
+        self.depth = depth
+        self.time_budget = time_budget
+        self.stable_frames = stable_frames
+        self.motion_gate = motion_gate
+        self.realtime = realtime
+        self.analyzer = Analyzer(workers=solver_workers)
+        self.broadcaster = Broadcaster()
+        self.boards = []                     # snapshot per source, as sent in "state"
+        self.workers = []
+
+        ctx = mp.get_context("spawn")
+        self._ctx = ctx
+        self.events = ctx.Queue()
+        self.stop = ctx.Event()
+        self._pending_sources = list(sources)
+        self._reader = None
+        self._loop = None
+        self._tasks = set()
+        self._ended = set()                  # board ids whose "end" went through (reader thread)
+        self.server = None
+        self.port = None
+
+    # ----- lifecycle -----
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self._loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self._handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._reader = threading.Thread(target=self._read_events, name="BoardServerEvents", daemon=True)
+        self._reader.start()
+        for source in self._pending_sources:
+            self.add_source(source)
+        self._pending_sources = []
+        return self
+
+    def add_source(self, source):
+        """Start watching another camera index or video file. Returns its board id."""
+        board_id = len(self.boards)
+        self.boards.append({"board_id": board_id, "source": str(source), "status": "starting",
+                            "board": None, "turn": 0, "last_move": None, "suggestion": None,
+                            "fps": None})
+        worker = self._ctx.Process(
+            target=board_worker, name=f"board-{board_id}",
+            args=(board_id, source, self.events, self.stop, self.stable_frames, self.motion_gate,
+                  self.realtime),
+            daemon=True,
+        )
+        worker.start()
+        self.workers.append(worker)
+        return board_id
+
+    async def close(self):
+        self.stop.set()
+        self.broadcaster.close()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in list(self._tasks):
+            task.cancel()
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.analyzer.shutdown()
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    # ----- board events -----
+
+    def _read_events(self):
+        # runs on its own thread so the loop never blocks on the process queue
+        while not self.stop.is_set():
+            try:
+                item = self.events.get(timeout=0.2)
+            except queue.Empty:
+                # a worker that died (e.g. the source didn't open) never sends "end"
+                for board_id, worker in enumerate(list(self.workers)):
+                    if not worker.is_alive() and board_id not in self._ended:
+                        self._ended.add(board_id)
+                        item = (board_id, "end", {"error": f"worker exited ({worker.exitcode})"})
+                        self._loop.call_soon_threadsafe(self._on_event, *item)
+                continue
+            if item[1] == "end":
+                self._ended.add(item[0])
+            try:
+                self._loop.call_soon_threadsafe(self._on_event, *item)
+            except RuntimeError:
+                break                        # loop closed
+
+    def _on_event(self, board_id, kind, fields):
+        status = self.boards[board_id]
+        if kind == "stats":
+            status["fps"] = fields["fps"]
+        elif kind == "board":
+            status["board"] = fields["board"]
+            status["suggestion"] = None
+            status["status"] = "playing" if fields["solve"] else "game over"
+            if fields["solve"]:
+                self._spawn(self._suggest(board_id, fields["board"]))
+        elif kind == "move":
+            status["turn"] = fields["turn"]
+            status["last_move"] = fields["col"]
+        elif kind == "new_game":
+            status["turn"] = 0
+            status["last_move"] = None
+        elif kind in ("cheat", "winner"):
+            status["status"] = kind
+        elif kind == "end":
+            status["status"] = fields.get("error", "ended")
+        self.broadcaster.publish(kind, dict(fields, board_id=board_id))
+
+    async def _suggest(self, board_id, board):
+        try:
+            col, score, depth = await self.analyzer.analyze(board, YEL, self.depth, self.time_budget)
+        except Exception as e:
+            self.broadcaster.publish("error", {"board_id": board_id, "error": str(e)})
+            return
+        status = self.boards[board_id]
+        current = status["board"] == board
+        if current:
+            status["suggestion"] = col
+        self.broadcaster.publish("suggestion", {"board_id": board_id, "board": board, "col": col,
+                                                "score": score, "depth": depth, "current": current})
+
+    def _spawn(self, coroutine):
+        task = self._loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def snapshot(self):
+        return {"boards": self.boards, "clients": len(self.broadcaster.clients),
+                "time": round(time.time(), 3)}
+
+    # ----- HTTP -----
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            parts = request_line.decode("latin-1").split()
+            if len(parts) != 3:
+                return
+            method, target, _ = parts
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            path = target.split("?", 1)[0]
+
+            if method == "GET" and path == "/events":
+                await self._stream(writer)
+            elif method == "GET" and path == "/state":
+                await self._respond(writer, 200, self.snapshot())
+            elif method == "POST" and path == "/analyze":
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "request too large"})
+                    return
+                body = await reader.readexactly(length)
+                await self._analyze_request(writer, body)
+            elif method == "OPTIONS":
+                await self._respond(writer, 204, None)
+            else:
+                await self._respond(writer, 404, {"error": f"no route for {method} {path}"})
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _analyze_request(self, writer, body):
+        try:
+            request = json.loads(body or b"{}")
+            board = parse_board(request.get("board"))
+            ai_piece = int(request.get("ai_piece", YEL))
+            depth = int(request.get("depth", self.depth))
+            time_budget = request.get("time_budget")
+            if ai_piece not in (RED, YEL) or not 1 <= depth <= MAX_DEPTH:
+                raise ValueError(f"ai_piece must be 1 or 2 and depth 1..{MAX_DEPTH}")
+            time_budget = parse_time_budget(time_budget, self.time_budget)
+            if time_budget is None:
+                depth = min(depth, MAX_UNBUDGETED_DEPTH)
+        except (ValueError, TypeError, AttributeError) as e:
+            await self._respond(writer, 400, {"error": str(e)})
+            return
+        try:
+            col, score, reached = await self.analyzer.analyze(board, ai_piece, depth, time_budget)
+        except Exception as e:
+            await self._respond(writer, 500, {"error": f"solver failed: {e}"})
+            return
+        await self._respond(writer, 200, {"col": col, "score": score, "depth": reached})
+
+    async def _respond(self, writer, status, payload):
+        reason = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+                  413: "Payload Too Large", 500: "Internal Server Error"}[status]
+        body = json.dumps(payload).encode() if payload is not None else b""
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nAccess-Control-Allow-Origin: *\r\n"
+            f"Access-Control-Allow-Headers: Content-Type\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _stream(self, writer):
+        client = self.broadcaster.subscribe()
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                         b"Access-Control-Allow-Origin: *\r\nConnection: keep-alive\r\n\r\n")
+            writer.write(Broadcaster.message("state", self.snapshot()))
+            await writer.drain()
+            while True:
+                try:
+                    message = await asyncio.wait_for(client.get(), timeout=KEEPALIVE)
+                except asyncio.TimeoutError:
+                    message = b": keep-alive\n\n"
+                if message is None:
+                    break
+                writer.write(message)
+                await writer.drain()
+        finally:
+            self.broadcaster.unsubscribe(client)
+
+
+async def serve(args):
+    server = BoardServer(
+        [parse_source(s) for s in args.sources],
+        depth=args.depth,
+        time_budget=args.time_budget,
+        solver_workers=args.solver_workers,
+        stable_frames=args.stable_frames,
+        motion_gate=not args.no_motion_gate,
+        realtime=args.realtime,
+    )
+    await server.start(args.host, args.port)
+    print(f"Serving {len(server.boards)} board(s) on http://{args.host}:{server.port} (/events, /state, /analyze)")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve live boards and suggestions to local clients.")
+    parser.add_argument("sources", nargs="*", help="camera indices and/or video files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--depth", type=int, default=6, help="deepest search for live suggestions")
+    parser.add_argument("--time-budget", type=float, default=1.0, help="seconds per live suggestion")
+    parser.add_argument("--solver-workers", type=int, default=max(1, (os.cpu_count() or 2) // 4),
+                        help="solver processes shared by suggestions and /analyze")
+    parser.add_argument("--stable-frames", type=int, default=5,
+                        help="frames in each cell's stability vote window")
+    parser.add_argument("--no-motion-gate", action="store_true", help="analyze every frame")
+    parser.add_argument("--realtime", action="store_true", help="play video files at their own frame rate")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+
+# Camera capture helpers: low-latency capture profiles and a background
+# grabber thread that keeps only the newest frames.
+
+CaptureProfile = namedtuple(
+    "CaptureProfile",
+    ["buffer_size", "fourcc", "width", "height", "fps"],
+    defaults=[1, "MJPG", None, None, None],
+)
+
+# 1-frame driver buffer, MJPG so USB cameras can deliver full frame rate
+LOW_LATENCY = CaptureProfile()
+
+
+def apply_capture_profile(cap, profile):
+    """Apply a CaptureProfile to an open cv2.VideoCapture. Unset fields are left alone."""
+    if profile.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile.fourcc))
+    if profile.width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile.width)
+    if profile.height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile.height)
+    if profile.fps:
+        cap.set(cv2.CAP_PROP_FPS, profile.fps)
+    if profile.buffer_size:
+        # not every backend supports this; set() just returns False then
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, profile.buffer_size)
+
+
+class FrameGrabber():
+    """
+    Reads a cv2.VideoCapture on a background thread into a small ring
+    buffer. read() always hands out the newest frame (latest-frame-wins):
+    frames the consumer was too slow to take are counted as dropped instead
+    of queueing up, so on-screen lag is bounded to about one frame.
+
+    Exposes the cv2.VideoCapture methods CameraFeed uses (read, isOpened,
+    release, get, set), so it can stand in for the capture object.
+
+    With `reuse_frames` the frames are decoded into a fixed set of arrays
+    that are recycled: a frame handed out stays valid until the next read,
+    then its array goes back to the pool.
+
+    `realtime` paces a video file at its own frame rate, like a camera
+    would deliver it (cameras pace themselves).
+    """
+    def __init__(self, cap, buffer_size=2, timeout=1.0, reuse_frames=False, realtime=False):
+        self.cap = cap
+        self.timeout = timeout
+        self.reuse_frames = reuse_frames
+        self.frame_interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30.0) if realtime else None
+        self._ring = deque(maxlen=buffer_size)
+        self._free = []                      # recycled frame arrays
+        self._held = None                    # array of the frame the consumer has
+        self._cond = threading.Condition()
+        self._running = True
+        self._next_id = 0
+
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.last_timestamp = None           # capture time of the last frame handed out
+        self.started_at = time.perf_counter()
+
+        self._thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            if self.frame_interval is not None:
+                delay = self.started_at + self.captured * self.frame_interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            with self._cond:
+                buffer = self._free.pop() if self._free else None
+            ret, frame = self.cap.read(buffer)
+            stamp = time.perf_counter()
+            with self._cond:
+                if not ret:
+                    self._running = False
+                    self._cond.notify_all()
+                    break
+                if len(self._ring) == self._ring.maxlen:
+                    self.dropped += 1
+                    self._recycle(self._ring[0][2])
+                self._ring.append((self._next_id, stamp, frame))
+                self._next_id += 1
+                self.captured += 1
+                self._cond.notify_all()
+
+    def read_latest(self):
+        """
+        Wait for a frame newer than the last one returned.
+        Returns (frame, timestamp, frame_id), or (None, None, None) when the
+        source has ended or nothing arrives within `timeout`.
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._ring or not self._running, timeout=self.timeout
+            )
+            if not ready or not self._ring:
+                return None, None, None
+            frame_id, stamp, frame = self._ring.pop()
+            # everything older than the newest frame is skipped
+            self.dropped += len(self._ring)
+            for _, _, old in self._ring:
+                self._recycle(old)
+            self._ring.clear()
+            if self._held is not None:
+                self._recycle(self._held)
+            self._held = frame if self.reuse_frames else None
+
+        self.delivered += 1
+        self.last_timestamp = stamp
+        return frame, stamp, frame_id
+
+    def _recycle(self, frame):
+        if self.reuse_frames:
+            self._free.append(frame)
+
+    def read(self, image=None):
+        # `image` is accepted for cv2.VideoCapture compatibility; frames
+        # come from the grabber's own pool
+        frame, _, _ = self.read_latest()
+        return frame is not None, frame
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started_at
+        return {
+            "captured": self.captured,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "capture_fps": self.captured / elapsed if elapsed > 0 else 0.0,
+            "age": time.perf_counter() - self.last_timestamp if self.last_timestamp else None,
+        }
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=self.timeout)
+        self.cap.release()
@@ -0,0 +1,91 @@
+import os
+import re
+
+import numpy as np
+
+# Calibrated cell classification.
+#
+# The mean BGR color of a cell is quantized to BINS levels per channel and
+# looked up in a BINS^3 table of piece values (0 empty, 1 red, 2 yellow).
+# The table is built from per-class centroids, which are fitted to the
+# colors seen on a stable board (an empty board works too) and stored per
+# camera so later runs start calibrated.
+
+BINS = 32
+SHIFT = 8 - int(np.log2(BINS))
+
+# Default centroids (BGR) for empty / red / yellow, before calibration
+DEFAULT_CENTROIDS = np.array([[125, 140, 150],
+                              [0, 22, 150],
+                              [8, 140, 180]], dtype=np.float64)
+
+CALIBRATION_DIR = "calibration"
+
+
+def calibration_path(source, directory=CALIBRATION_DIR):
+    """File the calibration of a camera index or video file is stored in."""
+    if isinstance(source, int):
+        name = f"camera_{source}"
+    else:
+        name = os.path.splitext(os.path.basename(str(source)))[0]
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+    return os.path.join(directory, name + ".npz")
+
+
+def build_lut(centroids):
+    """BINS^3 table of the nearest centroid for every quantized BGR color."""
+    levels = (np.arange(BINS) << SHIFT) + (1 << SHIFT) / 2   # bin centers
+    b, g, r = np.meshgrid(levels, levels, levels, indexing="ij")
+    colors = np.stack([b, g, r], axis=-1).reshape(-1, 1, 3)
+    dists = np.linalg.norm(colors - centroids[None, :, :], axis=2)
+    return np.argmin(dists, axis=1).astype(np.uint8).reshape(BINS, BINS, BINS)
+
+
+class ColorCalibration():
+    def __init__(self, centroids=DEFAULT_CENTROIDS, lut=None):
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.lut = build_lut(self.centroids) if lut is None else lut
+
+    def classify(self, colors):
+        """Piece value for every row of a (N, 3) BGR color array."""
+        q = np.clip(colors, 0, 255).astype(np.uint8) >> SHIFT
+        return self.lut[q[:, 0], q[:, 1], q[:, 2]]
+
+    def fit(self, colors, iterations=5):
+        """
+        Refit the centroids to cell colors from one stable board.
+        Starts from the current centroids and reassigns cells a few times
+        (k-means). Classes with no cells on the board (e.g. on an empty
+        board) keep their centroid, corrected by the per-channel gain seen
+        on the classes that were present.
+        """
+        colors = np.asarray(colors, dtype=np.float64)
+        old = self.centroids
+        centroids = old.copy()
+        for _ in range(iterations):
+            dists = np.linalg.norm(colors[:, None, :] - centroids[None, :, :], axis=2)
+            labels = np.argmin(dists, axis=1)
+            present = [k for k in range(len(centroids)) if np.any(labels == k)]
+            for k in present:
+                centroids[k] = colors[labels == k].mean(axis=0)
+
+        missing = [k for k in range(len(centroids)) if k not in present]
+        if missing:
+            gain = np.mean([centroids[k] / np.maximum(old[k], 1.0) for k in present], axis=0)
+            for k in missing:
+                centroids[k] = np.clip(old[k] * gain, 0, 255)
+
+        self.centroids = centroids
+        self.lut = build_lut(centroids)
+        return labels
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(path, centroids=self.centroids, lut=self.lut)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(centroids=data["centroids"], lut=data["lut"])
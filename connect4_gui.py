@@ -1,90 +1,201 @@
-import tkinter as tk
 import time
 
-import cv2
-import numpy as np
-from PIL import Image, ImageTk
-import simpleaudio as sa
+LAUNCH = time.perf_counter()                 # startup times are reported from here
+
+import tkinter as tk
 
+from connect4_solver import RED, YEL
+from startup import Startup
 
+# Only tkinter and the light modules are imported up front, so the window
+# shows right away. The camera / CV pipeline (cv2, NumPy), the solver, the
+# sounds (simpleaudio) and the archive are loaded on background threads
+# while it is up (startup.py), and their modules are imported where used.
 
-from read_board import CameraFeed
-from connect4_solver import RED, YEL, choose_best_move, is_winner
+CHEAT_SOUND = "you-cheat.wav"
+_sounds = {}                                 # path -> simpleaudio.WaveObject, decoded once
 
 # There are three sections of code to comment/uncomment to switch between a camera port and video file path. 
-# 1) Line 24/27 Change object initialization 
-# 2) Line 35/42 Change feed initialization 
-# 3) Line 495/498 Change camera port/video file path 
+# 1) __init__ signature: Change object initialization (and pass camera_port to the "camera" step)
+# 2) _open_pipeline: Change feed initialization 
+# 3) __main__: Change camera port/video file path 
+
+
+def load_sound(path):
+    """Decode a WAV file once; every later play reuses the samples in memory."""
+    sound = _sounds.get(path)
+    if sound is None:
+        import simpleaudio as sa
+        sound = _sounds[path] = sa.WaveObject.from_wave_file(path)
+    return sound
 
 
 class Connect4VideoGUI:
     @staticmethod
     def play_sound_async(path):
-        sa.WaveObject.from_wave_file(path).play()
-        pass
+        load_sound(path).play()
 
-    def __init__(self, root, video_path):
+    def __init__(self, root, video_path, archive_path=None, telemetry_path=None, record_path=None,
+                 display_width=640):
 
     # # UNCOMMENT/COMMENT 
-    # def __init__(self, root, camera_port = 0): # this line takes in the camera port instead of the video path 
+    # def __init__(self, root, camera_port = 0, archive_path=None, telemetry_path=None, record_path=None,
+    #              display_width=640): # this line takes in the camera port instead of the video path 
         self.root = root
         self.root.title("Connect 4 Live (Webcam + AI)")
-        
-        # # UNCOMMENT/COMMENT to switch to camera mode 
-
-        # Initialize camera 
-        # self.feed = CameraFeed()
-        # print(f"[CAMERA MODE] Using webcam index: {camera_port}") 
-        # self.feed.begin_feed(camera_port)
-        # #
-
-        # # UNCOMMENT/COMMENT to switch to video file mode 
 
-        # Initialize prerecorded video 
-        self.feed = CameraFeed()
-        print(f"[VIDEO FILE MODE] Using video path: {video_path}") 
-        self.feed.begin_feed(video_path)
-        # #
+        # Initialize startup - camera, solver and assets load on background
+        # threads (see _open_pipeline / _start_solver / _load_archive) and are
+        # picked up by the video loop once they are ready
+        self.startup = Startup(start=LAUNCH)
+        self.pending_steps = []
+        self.feed = None
+        self.watcher = None
+        self.tracker = None
+        self.analysis = None
+        self.view = None
+        self.telemetry = None
+        self.solver = None
+        self.archive = None
+        self.record_path = record_path
 
         # Initialize timer
         self.start_time = time.time()
         self.timer_running = True
 
-        # Initialize turn counter
-        self.turn_number = 0
-
         # Initialize game over flag - helps prevent errors once game is over 
         self.game_over = False
 
-        # Initialize reference frame to prevent garbage collector 
-        self.frame_photo = None
+        # Initialize tick rate - the Tk loop only shows finished results
+        self.poll_interval = 10              # ms between checks for a new analyzed frame
+        self.idle_interval = 100             # ms between redraws while the motion gate sees no change
+        self.last_draw = 0.0
 
-        # Initialize tracking stable board 
-        self.stable_frames_required = 5      # number of identical frames to call it "stable"
-        self.candidate_board = None          # board_state currently being checked
-        self.candidate_frames = 0            # how many consecutive frames matched candidate
-        self.stable_board = None             # last stable board
-        self.prev_stable_board = None        # previous stable board (used to detect moves)
+        # Initialize overlays - rebuilt only when they change, pasted onto each frame
+        self.display_width = display_width   # frames are shown at this width (never scaled up)
+        self.suggestion_key = None
+        self.suggestion_positions = None     # grid the marks were computed from
+        self.suggestion_marks = None
+        self.panel = None
+        self.panel_time = 0.0
+        self.panel_interval = 0.25           # s between timing overlay refreshes
 
-        # Initialize last mover - for cheating detection 
-        self.last_move_color = None          # RED or YEL
-
-        # Initialize first mover 
-        self.first_mover_color = None        # set on first detected move
+        # Initialize board events - found/lost, stable board, piece added, illegal change
+        self.stable_board = None             # last stable board the game rules saw
+        self.stable_version = 0              # bumped on every stable board, for the overlay keys
 
         # Initialize suggestion tracking 
-        self.last_move_col = None            # column index of last detected move
         self.current_suggested_col = None    # AI suggestion for this frame
         self.prev_suggested_col = None       # AI suggestion for last frame 
 
-        # Build UI and start loops
+        # Initialize game archive tracking - finished games are appended once per game
+        self.game_archived = False
+
+        # Initialize timing - per-stage times for the overlay, the telemetry
+        # file (JSON lines / CSV) and cProfile; only measured while one is on
+        self.timing = False
+        self.show_timing = tk.BooleanVar(value=False)
+
+        # Initialize recorder - raw frames + per-frame board sidecar, encoded
+        # on a background thread (started once the camera is open)
+        self.recorder = None
+
+        # Build UI first, so the window shows while the rest starts
         self._build_ui()
+        self.root.after_idle(self.startup.mark, "window")
+
+        # Start the background steps, in parallel
+        self._start_step("camera", self._open_pipeline, video_path, telemetry_path, display_width)   # camera_port in camera mode
+        self._start_step("solver", self._start_solver)
+        self._start_step("sound", load_sound, CHEAT_SOUND)
+        if archive_path:
+            self._start_step("archive", self._load_archive, archive_path)
+
         self._update_timer()
         self._update_video()
 
         # Shutdown for window close 
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
+    # Background startup - each step runs on its own thread, results are taken on the Tk thread 
+
+    def _start_step(self, name, fn, *args):
+        self.pending_steps.append(name)
+        self.startup.run(name, fn, *args)
+
+    def _open_pipeline(self, source, telemetry_path, display_width):
+        from color_calibration import calibration_path
+        from game_tracker import BoardWatcher, GameTracker
+        from pipeline import AnalysisWorker
+        from read_board import CameraFeed
+        from telemetry import Telemetry
+        from video_view import VideoView
+
+        # # UNCOMMENT/COMMENT to switch to camera mode 
+
+        # Initialize camera - background capture thread, newest frame wins
+        # from capture import LOW_LATENCY
+        # feed = CameraFeed(lock_grid=True, roi_margin=0.1, motion_gate=True)
+        # print(f"[CAMERA MODE] Using webcam index: {source}") 
+        # feed.begin_feed(source, threaded=True, profile=LOW_LATENCY)
+        # feed.use_calibration(calibration_path(source))
+        # #
+
+        # # UNCOMMENT/COMMENT to switch to video file mode 
+
+        # Initialize prerecorded video - read on a background thread at the video's frame rate
+        feed = CameraFeed(lock_grid=True, roi_margin=0.1, motion_gate=True)
+        print(f"[VIDEO FILE MODE] Using video path: {source}") 
+        feed.begin_feed(source, threaded=True, realtime=True)
+        feed.use_calibration(calibration_path(source))
+        # #
+
+        # CV analysis runs off the Tk thread (pipeline.py), so video keeps its
+        # frame rate during a deep search
+        watcher = BoardWatcher(stable_frames=5)
+        analysis = AnalysisWorker(feed, watcher, display_width=display_width, rgb=True)
+        tracker = GameTracker(stable_frames_required=5)
+        telemetry = Telemetry(path=telemetry_path)
+        view = VideoView(self.video_label)
+        return feed, watcher, tracker, analysis, telemetry, view
+
+    def _start_solver(self):
+        from pipeline import SolverWorker
+
+        # the solver only runs when the stable board changes, so each position
+        # gets up to a second of iterative deepening; seen positions are cached.
+        # Warming up starts its process and caches the opening position.
+        solver = SolverWorker(depth=10, ai_piece=YEL, time_budget=1.0)
+        solver.warm_up()
+        return solver
+
+    def _load_archive(self, archive_path):
+        from game_archive import GameArchive
+        return GameArchive(archive_path)     # opens (or rebuilds) the position index
+
+    def _collect_startup(self):
+        for name in list(self.pending_steps):
+            if not self.startup.done(name):
+                continue
+            self.pending_steps.remove(name)
+            try:
+                result = self.startup.result(name)
+            except Exception as e:
+                print(f"[STARTUP] {name} failed: {e}")
+                if name != "sound":          # the cheat sound retries (and reports) when played
+                    self.message_label.config(text=f"Startup error ({name}): {e}")
+                continue
+            if name == "camera":
+                self.feed, self.watcher, self.tracker, self.analysis, self.telemetry, self.view = result
+                self.analysis.profile = self.telemetry.thread_profile()   # "Profile 300 Frames" covers the CV thread
+                self.status_label.config(text="Camera open. Looking for the board...")
+                if self.record_path:
+                    self.start_recording(self.record_path)
+            elif name == "solver":
+                self.solver = result
+            elif name == "archive":
+                self.archive = result
+
     # Building UI 
     
     def _build_ui(self):
@@ -93,10 +204,18 @@ class Connect4VideoGUI:
 
         game_menu = tk.Menu(menubar, tearoff=0)
         game_menu.add_command(label="New Game", command=self.new_game)
+        game_menu.add_command(label="Recalibrate Colors", command=self._recalibrate)
+        game_menu.add_command(label="Start/Stop Recording", command=self._toggle_recording)
         game_menu.add_separator()
         game_menu.add_command(label="Quit", command=self.on_close)
         menubar.add_cascade(label="Game", menu=game_menu)
 
+        view_menu = tk.Menu(menubar, tearoff=0)
+        view_menu.add_checkbutton(label="Timing Overlay (F3)", variable=self.show_timing)
+        view_menu.add_command(label="Profile 300 Frames", command=self._start_profile)
+        menubar.add_cascade(label="View", menu=view_menu)
+        self.root.bind("<F3>", lambda event: self.show_timing.set(not self.show_timing.get()))
+
         self.root.config(menu=menubar)
 
         # Top banner
@@ -167,9 +286,13 @@ class Connect4VideoGUI:
     # Initialization of game 
 
     def new_game(self):
-        
+        if self.analysis is None or self.solver is None:   # still starting
+            return
+
+        # Keep the unfinished game before resetting
+        self._archive_game(None)
+
         # Initialize/reset turn number, text, etc when new game starts 
-        self.turn_number = 0
         self.turn_label.config(text="Turn: 0")
         self.message_label.config(text="")
         self.winner_label.config(text="")
@@ -177,23 +300,26 @@ class Connect4VideoGUI:
             text="New game started. Waiting for first move..."
         )
 
-        # Initialize/reset board state 
-        self.candidate_board = None
-        self.candidate_frames = 0
+        # Initialize/reset board state, moves and cheating tracking 
+        self.analysis.reset()                # events of the finished game are dropped
+        self.tracker.reset()
         self.stable_board = None
-        self.prev_stable_board = None
-        self.last_move_color = None
-        self.first_mover_color = None
+        self.stable_version += 1
 
         # Initialize/reset suggestion tracking 
-        self.last_move_col = None
+        self.solver.cancel()
         self.current_suggested_col = None
         self.prev_suggested_col = None
+        self.analysis.suggestion = None
+
+        # Initialize/reset archive tracking
+        self.game_archived = False
 
         # Initialize/reset game voer + timer 
         self.game_over = False
         self.timer_running = True
         self.start_time = time.time()
+        self.analysis.resume()
 
     
     # Piece names 
@@ -214,272 +340,304 @@ class Connect4VideoGUI:
         except Exception as e:
             print(f"Error playing cheat sound: {e}")
 
-    # New stable board state update 
-    def _update_stable_board(self, board_state):
-        
-        if board_state is None:
-            self.candidate_board = None
-            self.candidate_frames = 0
-            return False
-
-        if self.candidate_board is None or not np.array_equal(board_state, self.candidate_board):
-            self.candidate_board = board_state.copy()
-            self.candidate_frames = 1
-            return False
-
-        self.candidate_frames += 1
-
-        if self.candidate_frames < self.stable_frames_required:
-            return False
-
-        if self.stable_board is None or not np.array_equal(self.stable_board, self.candidate_board):
-            self.prev_stable_board = self.stable_board.copy() if self.stable_board is not None else None
-            self.stable_board = self.candidate_board.copy()
-            return True
-
-        return False
-    # Turn counter, check for same color moving twice 
-    def _process_move_and_cheating(self, prev_board, curr_board):
-        
-        if prev_board is None:
-            prev_board = np.zeros_like(curr_board)
+    # Stores the current game in the archive (once per game)
+    def _archive_game(self, winner):
+        if self.archive is None or self.tracker is None or self.game_archived or not self.tracker.game_moves:
+            return
+        try:
+            self.archive.append_game(
+                self.tracker.game_moves, winner=winner, cheats=self.tracker.game_cheats,
+                start_time=self.start_time
+            )
+        except Exception as e:
+            print(f"Error archiving game: {e}")
+        self.game_archived = True
+
+    # Recording 
+    def start_recording(self, path):
+        import cv2
+        from recorder import Recorder
+        fps = self.feed.cap.get(cv2.CAP_PROP_FPS) or 20.0
+        self.recorder = Recorder(path, fps=fps)
+        self.analysis.recorder = self.recorder
+        print(f"[RECORDING] {path} (+ {self.recorder.sidecar_path})")
+
+    def stop_recording(self, wait=False):
+        if self.recorder is None:
+            return
+        self.analysis.recorder = None
+        # finishing may re-encode the video at the rate frames were really
+        # recorded, which runs on the recorder's thread
+        self.recorder.close(wait=wait)
+        print(f"[RECORDING] stopped: {self.recorder.stats()}")
+        self.recorder = None
+
+    def _toggle_recording(self):
+        if self.analysis is None:
+            return
+        if self.recorder is None:
+            self.start_recording(time.strftime("recordings/game_%Y%m%d_%H%M%S.mp4"))
+            self.message_label.config(text=f"Recording to {self.recorder.path}")
+        else:
+            self.stop_recording()
+            self.message_label.config(text="Recording stopped.")
 
-        new_board = (prev_board == 0) & (curr_board != 0)
-        removed_board = (prev_board != 0) & (curr_board == 0)
-        recolor_board = (prev_board != 0) & (curr_board != 0) & (prev_board != curr_board)
+    # Recalibration - the next stable board refits the colors
+    def _recalibrate(self):
+        if self.analysis is not None:
+            self.analysis.recalibrate()      # runs on the analysis thread
 
-        new_positions = np.argwhere(new_board)
-        new_count = len(new_positions)
+    # Timing helpers 
+    def _start_profile(self):
+        if self.telemetry is None:
+            return
+        self.telemetry.start_profile(frames=300, path="profile.prof")
+        self.message_label.config(text="Profiling the next 300 frames...")
 
-        if new_count != 1 or np.any(removed_board) or np.any(recolor_board):
-            self.last_move_col = None
-            return None, None
+    def _mark(self, stage):
+        if self.timing:
+            self.telemetry.timer.mark(stage)
 
-        r, c = new_positions[0]
-        moved_color = int(curr_board[r, c])
-        if moved_color == 0:
-            self.last_move_col = None
-            return None, None
+    # Game over - keep the last frame + banners, stop analyzing until New Game
+    def _end_game(self, winner):
+        self.timer_running = False
+        self.game_over = True
+        self._archive_game(winner)
+        self.analysis.pause()
+        self.solver.cancel()
+
+    # A new stable board - apply the game rules and ask for a suggestion 
+    def _on_stable_board(self, event):
+        self.stable_board = event.board
+        self.stable_version += 1
+        self.prev_suggested_col = self.current_suggested_col
+        self.current_suggested_col = None
+        self.analysis.suggestion = None
 
-        self.last_move_col = int(c)
+        cheater, winner = self.tracker.process_move(event.previous, event.board)
+        self.turn_label.config(text=f"Turn: {self.tracker.turn_number}")
 
-        # Set first mover color from first move
-        if self.first_mover_color is None:
-            self.first_mover_color = moved_color
+        if cheater is not None:
+            color_name = self._piece_name(cheater)
+            self.message_label.config(
+                text=f"Cheating detected: {color_name} played twice in a row!"
+            )
+            self._play_cheat_sound() # call to play sound :) 
+            self._end_game(winner)
 
-        self.turn_number += 1
-        self.turn_label.config(text=f"Turn: {self.turn_number}")
+        if winner is not None:
+            color_name = self._piece_name(winner)
+            self.winner_label.config(
+                text=f"Winner: {color_name}!"
+            )
+            self._end_game(winner)
+
+        if cheater is None and winner is None:
+            if "Cheating detected" not in self.message_label.cget("text"):
+                self.message_label.config(text="")
+
+            # Checks if the person who moved first ignored the suggestion 
+            if self.tracker.ignored_suggestion(self.prev_suggested_col):
+                self.message_label.config(
+                    text=(
+                        f"First player ignored AI: played column "
+                        f"{self.tracker.last_move_col+1}, suggested {self.prev_suggested_col+1}."
+                    )
+                )
 
-        cheater_color = None
-        if self.last_move_color is not None and moved_color == self.last_move_color:
-            cheater_color = moved_color
+            self.solver.request(event.board)
+            self.status_label.config(text="Board detected. AI is thinking...")
 
-        self.last_move_color = moved_color
+    # A finished search - only shown if the board hasn't changed since 
+    def _on_suggestion(self, suggestion):
+        if self.game_over or self.stable_board is None or suggestion.board != self.stable_board:
+            return
 
-        winner_color = None
-        try:
-            if is_winner(curr_board.tolist(), moved_color):
-                winner_color = moved_color
-        except Exception:
-            winner_color = None
+        if suggestion.error is not None: # catch exceptions from the solver 
+            self.current_suggested_col = None
+            self.status_label.config(text="Error computing AI move.")
+            if "Cheating detected" not in self.message_label.cget("text"):
+                self.message_label.config(text=f"AI error: {suggestion.error}")
+        elif suggestion.col is None:  # potential error msgs 
+            self.current_suggested_col = None
+            self.status_label.config(
+                text="Board detected, but no valid moves (board full or invalid)."
+            )
+            if "Cheating detected" not in self.message_label.cget("text"):
+                self.message_label.config(
+                    text="No move available - this position is effectively terminal."
+                )
+        else:
+            self.current_suggested_col = suggestion.col
+            self.status_label.config(
+                text=f"Board detected. AI suggests column: {suggestion.col+1}" # need to add +1 since indexing starts at 0
+            )
+        self.analysis.suggestion = self.current_suggested_col
+
+    # Suggestion marks - top circle + arrow to the landing hole, in display pixels 
+    def _suggestion_marks(self, board, board_positions, best_col, scale):
+        if board is None or board_positions is None:
+            raise ValueError("No board positions available for highlight.")
+
+        rows, cols = board.shape
+        col = int(best_col)
+        if not (0 <= col < cols):
+            raise ValueError(f"Best column {col} out of bounds.") # ONLY checks for columns 
+
+        # board_positions[row, col] = (x, y) in capture pixels
+        # row = 0 -> very top row in camera view
+        # cx and cy 
+        cx_top, cy_top = board_positions[0, col]
+        top = (int(round(cx_top * scale)), int(round(cy_top * scale)))
+
+        # Radius relative to grid spacing
+        if rows > 1:
+            cy1 = board_positions[0, col][1]
+            cy2 = board_positions[1, col][1]
+            cell_h = abs(cy2 - cy1) * scale
+            radius = int(max(8 * scale, round(cell_h * 0.35)))
+        else:
+            radius = int(20 * scale)
+
+        end = None
+        landing_row = board.next_open_row(col)
+        if landing_row is not None:
+            x_end, y_end = board_positions[landing_row, col]
+            end = (int(round(x_end * scale)), int(round(y_end * scale)))
+        return top, radius, end
+
+    # Draws the suggestion; the marks are only recomputed when the column, board or grid changes 
+    def _draw_suggestion(self, output, board, board_positions, best_col, scale):
+        key = (best_col, self.stable_version, scale)
+        if key != self.suggestion_key or board_positions is not self.suggestion_positions:
+            self.suggestion_key = key
+            self.suggestion_positions = board_positions
+            try:
+                self.suggestion_marks = self._suggestion_marks(board, board_positions, best_col, scale)
+            except Exception as e:
+                self.suggestion_marks = None
+                if "Cheating detected" not in self.message_label.cget("text"):
+                    self.message_label.config(text=f"Highlight error: {e}")
+        if self.suggestion_marks is None:
+            return
 
-        return cheater_color, winner_color
-    
-    # Helper to find which row to land 
-    def _find_landing_row(self, board, col):
-        rows, _ = board.shape 
-        for r in range(rows - 1, -1, -1):  # bottom to top, iterate through all the rows 
-            if board[r, col] == 0: # iterate until the last 0 (or empty spot)
-                return r
-        return None
-
-    # All video updates 
+        import cv2
+        top, radius, end = self.suggestion_marks
+        if end is not None:
+            # Draw arrow from topmost circle to landing circle 
+            cv2.arrowedLine(output, top, end, (0, 255, 0), thickness=2, tipLength=0.1)
+        # Circle at top column 
+        cv2.circle(output, top, radius, (0, 255, 0), thickness=-1)
+
+    # Timing overlay - the text panel is redrawn a few times a second, pasted every frame 
+    def _timing_panel(self):
+        from telemetry import overlay_panel
+        now = time.perf_counter()
+        if self.panel is None or now - self.panel_time >= self.panel_interval:
+            self.panel = overlay_panel(self.telemetry)
+            self.panel_time = now
+        return self.panel
+
+    # Frame part of the render key - a frame the motion gate found unchanged keeps
+    # the shown key, so it is only redrawn every idle_interval 
+    def _frame_key(self, result, now):
+        still = result.reused and self.view.key is not None and now - self.last_draw < self.idle_interval / 1000
+        return self.view.key[0] if still else result.frame_id
+
+    # All video updates - shows the newest analyzed frame (pipeline.AnalysisWorker)
     def _update_video(self):
-    
-        if self.game_over:
-            # Keep last frame + banners visible
-            self.root.after(100, self._update_video)
+        if self.pending_steps:
+            self._collect_startup()
+        if self.analysis is None or self.solver is None:
+            # still starting (the window is already up)
+            self.root.after(self.poll_interval, self._update_video)
             return
 
-        try:
-            frame, gray, keypoints = self.feed.detect_ellipse()
-        except Exception as e:
-            if self.game_over:
-                self.root.after(100, self._update_video)
-                return
-            self.message_label.config(text=f"Camera error: {e}")
-            self.root.after(100, self._update_video)
+        result = self.analysis.results.poll()
+        if result is None:
+            # nothing new yet (or paused after game over - last frame + banners stay visible)
+            self.root.after(self.poll_interval, self._update_video)
             return
 
         # this section catches errors 
-        if frame is None:
-            if self.game_over:
-                self.root.after(100, self._update_video)
-                return
+        if result.error is not None:
+            self.message_label.config(text=f"Camera error: {result.error}")
+            self.root.after(100, self._update_video)
+            return
+        if result.ended:
             self.message_label.config(text="No frame from camera. Check connection.") 
             self.root.after(200, self._update_video)
             return
 
-        # Draw detected blobs
-        output = cv2.drawKeypoints(
-            frame, keypoints, np.array([]),
-            (0, 0, 255),
-            cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS
-        )
-
-        board_state, board_positions = self.feed.board_state()
+        # time stages only while something uses them
+        self.timing = self.show_timing.get() or self.telemetry.active
+        self.analysis.timing = self.timing
+        if self.timing:
+            self.telemetry.timer.start()
 
+        # Check for new AND stable board changes, processes the new board state 
+        for event in self.analysis.drain_events():
+            if event.kind == "stable" and not self.game_over:
+                self._on_stable_board(event)
+        self._mark("stability")
 
-        stable_changed = self._update_stable_board(board_state)
-        
         # Messages to catch incomplete board 
-
-        if board_state is None and self.stable_board is None:
+        if result.board is None and self.stable_board is None:
             self.status_label.config(text="Board not detected.")
             self.message_label.config(
                 text="Invalid / incomplete board (need 42 circles). Adjust lighting/position."
             )
-        else:
-            logic_board = self.stable_board if self.stable_board is not None else board_state
-
-            if logic_board is None:
-                self.status_label.config(text="Board not detected.")
-            else:
-                # Check for new AND stable board changes, processes the new board state 
-                if stable_changed:
-                    cheater, winner = self._process_move_and_cheating(
-                        self.prev_stable_board, self.stable_board
-                    )
 
-                    if cheater is not None:
-                        color_name = self._piece_name(cheater)
-                        self.message_label.config(
-                            text=f"Cheating detected: {color_name} played twice in a row!"
-                        )
-                        self._play_cheat_sound() # call to play sound :) 
-                        self.timer_running = False
-                        self.game_over = True
-
-                    if winner is not None:
-                        color_name = self._piece_name(winner)
-                        self.winner_label.config(
-                            text=f"Winner: {color_name}!"
-                        )
-                        self.timer_running = False
-                        self.game_over = True
-
-                    if cheater is None and winner is None:
-                        if "Cheating detected" not in self.message_label.cget("text"):
-                            self.message_label.config(text="")
-
-                    # Checks if the person who moved first ignored the suggestion 
-                    if cheater is None and winner is None:
-                        if (
-                            self.prev_suggested_col is not None and
-                            self.last_move_col is not None and
-                            self.first_mover_color is not None and
-                            self.last_move_color == self.first_mover_color and
-                            self.last_move_col != self.prev_suggested_col
-                        ):
-                            self.message_label.config(
-                                text=(
-                                    f"First player ignored AI: played column "
-                                    f"{self.last_move_col+1}, suggested {self.prev_suggested_col+1}."
-                                )
-                            )
-                        
-
-                # Best move + cheating detection 
-                if not self.game_over:
-                    self.prev_suggested_col = self.current_suggested_col
-
-                    try:
-                        board_list = logic_board.tolist()
-                        best_col, _ = choose_best_move(board_list, ai_piece=YEL, depth=4)  # call to choose_best_move
-                    except Exception as e: # catch exceptions from the solver 
-                        best_col = None
-                        self.current_suggested_col = None
-                        self.status_label.config(text="Error computing AI move.")
-                        if "Cheating detected" not in self.message_label.cget("text"):
-                            self.message_label.config(text=f"AI error: {e}")
-                    else:
-                        self.current_suggested_col = best_col
-
-                        if best_col is None:  # potential error msgs 
-                            self.status_label.config(
-                                text="Board detected, but no valid moves (board full or invalid)."
-                            )
-                            if "Cheating detected" not in self.message_label.cget("text"):
-                                self.message_label.config(
-                                    text="No move available - this position is effectively terminal."
-                                )
-                        else:
-                            self.status_label.config(
-                                text=f"Board detected. AI suggests column: {best_col+1}" # need to add +1 since indexing starts at 0
-                            )
-
-                            try:
-                                if logic_board is None or board_positions is None:
-                                    raise ValueError("No board positions available for highlight.")
-
-                                rows, cols = logic_board.shape
-                                col = int(best_col)
-                                if not (0 <= col < cols):
-                                    raise ValueError(f"Best column {col} out of bounds.") # ONLY checks for columns 
-
-                                # board_positions[row, col] = (x, y)
-                                # row = 0 -> very top row in camera view
-                                # cx and cy 
-                                cx_top, cy_top = board_positions[0, col]
-                                cx_top_i = int(round(cx_top))
-                                cy_top_i = int(round(cy_top))
-
-                                # Radius relative to grid spacing
-                                if rows > 1:
-                                    cy1 = board_positions[0, col][1]
-                                    cy2 = board_positions[1, col][1]
-                                    cell_h = abs(cy2 - cy1)
-                                    radius_i = int(max(8, round(cell_h * 0.35)))
-                                else:
-                                    radius_i = 20
-
-                                landing_row = self._find_landing_row(logic_board, col)
-
-                                if landing_row is not None:
-                                    x_end, y_end = board_positions[landing_row, col]
-                                    x_end_i = int(round(x_end))
-                                    y_end_i = int(round(y_end))
-
-                                    # Draw arrow from topmost circle to landing circle 
-                                    cv2.arrowedLine(
-                                        output,
-                                        (cx_top_i, cy_top_i),
-                                        (x_end_i, y_end_i),
-                                        (0, 255, 0),
-                                        thickness=2,
-                                        tipLength=0.1
-                                    )
-                                # Circle at top column 
-                                cv2.circle(output, (cx_top_i, cy_top_i), radius_i, (0, 255, 0), thickness=-1)
-
-                            except Exception as e:
-                                if "Cheating detected" not in self.message_label.cget("text"):
-                                    self.message_label.config(text=f"Highlight error: {e}")
-
-
-
-        # Convert to Tk image
-        output_rgb = cv2.cvtColor(output, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(output_rgb)
-        self.frame_photo = ImageTk.PhotoImage(image=img)
-        self.video_label.config(image=self.frame_photo)
-
-        self.root.after(30, self._update_video)
+        # Best move - finished searches arrive from the solver process 
+        suggestion = self.solver.results.poll()
+        if suggestion is not None:
+            self._on_suggestion(suggestion)
+
+        self._mark("solver")
+
+        # Skip the redraw when nothing visible changed: the motion gate found the
+        # frame unchanged (redrawn every idle_interval) and the overlays are the same
+        suggested = self.current_suggested_col if not self.game_over else None
+        panel = self._timing_panel() if self.show_timing.get() else None
+        now = time.perf_counter()
+        key = (self._frame_key(result, now), suggested, self.stable_version,
+               self.panel_time if panel is not None else None)
+        if key != self.view.key:
+            output = result.output           # display size, RGB, owned by this result
+            if suggested is not None:
+                self._draw_suggestion(output, self.stable_board, result.positions, suggested, result.scale)
+            if panel is not None:
+                from telemetry import paste_panel
+                paste_panel(output, panel)
+            self.view.show(output, key=key)
+            self.last_draw = now
+            if self.startup.mark("first frame"):
+                print(f"[STARTUP] {self.startup.report()}")
+        self._mark("render")
+        if self.timing:
+            self.telemetry.end_frame(times=result.times)
+
+        self.root.after(self.poll_interval, self._update_video)
 
     # Making sure it closes  
 
     def on_close(self):
         self.timer_running = False
+        # let steps that are still starting finish, so everything they opened is closed
+        for name in self.pending_steps:
+            self.startup.wait(name, timeout=5.0)
+        self._collect_startup()
+        self._archive_game(None)
+        if self.archive is not None:
+            self.archive.close()
+        if self.telemetry is not None:
+            self.telemetry.stop_profile()
+            self.telemetry.close()
+        if self.analysis is not None:
+            self.analysis.stop()
+        if self.solver is not None:
+            self.solver.stop()
+        self.stop_recording(wait=True)
         try:
             self.feed.close_feed()
         except Exception:
@@ -492,9 +650,9 @@ if __name__ == "__main__":
     # UNCOMMENT/COMMENT to put in a webcam instead of a prerecorded video file 
 
     # 0 = default webcam, change if needed (1, 2, ...) to whichever port you're using 
-    # app = Connect4VideoGUI(root, camera_port=0)
+    # app = Connect4VideoGUI(root, camera_port=0, archive_path="games.c4a")
 
     # UNCOMMENT/COMMENT to put in a prerecorded video file rather than a camera 
-    app = Connect4VideoGUI(root, video_path="Test Videos/[VIDEO NAME].mp4")
+    app = Connect4VideoGUI(root, video_path="Test Videos/[VIDEO NAME].mp4", archive_path="games.c4a")
     root.mainloop()
 
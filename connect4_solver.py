@@ -1,4 +1,5 @@
 import math
+import time
 from copy import deepcopy
 
 EMPTY = 0
@@ -6,6 +7,11 @@ RED   = 1
 YEL   = 2
 
 WIN_SCORE = 1_000_000  # base score for outright wins/losses
+DEEPENING_GROWTH = 4.0 # each depth is guessed to take this much longer than the last
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search that ran past its deadline."""
 
 
 def make_board(rows=6, cols=7):
@@ -197,11 +203,14 @@ def ordered_valid_locations(board):
     return sorted(valid, key=lambda c: abs(c - center))
 
 
-def minimax(board, depth, alpha, beta, maximizing_player, ai_piece):
+def minimax(board, depth, alpha, beta, maximizing_player, ai_piece, deadline=None):
     """
     Depth-aware minimax with alpha-beta pruning.
     Faster wins are scored higher; slower losses are less bad.
+    `deadline` (time.perf_counter() value) aborts with SearchTimeout.
     """
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout()
     opp_piece = RED if ai_piece == YEL else YEL
     terminal = is_terminal(board)
 
@@ -231,7 +240,7 @@ def minimax(board, depth, alpha, beta, maximizing_player, ai_piece):
             if child is None:
                 continue
 
-            _, new_score = minimax(child, depth-1, alpha, beta, False, ai_piece)
+            _, new_score = minimax(child, depth-1, alpha, beta, False, ai_piece, deadline)
 
             if new_score > value:
                 value = new_score
@@ -252,7 +261,7 @@ def minimax(board, depth, alpha, beta, maximizing_player, ai_piece):
             if child is None:
                 continue
 
-            _, new_score = minimax(child, depth-1, alpha, beta, True, ai_piece)
+            _, new_score = minimax(child, depth-1, alpha, beta, True, ai_piece, deadline)
 
             if new_score < value:
                 value = new_score
@@ -265,12 +274,12 @@ def minimax(board, depth, alpha, beta, maximizing_player, ai_piece):
         return best_col, value
 
 
-def choose_best_move(board, ai_piece=YEL, depth=5):
+def choose_best_move(board, ai_piece=YEL, depth=5, deadline=None):
     """
     Top-level API: returns (best_column, score).
 
     - First, check for any **immediate winning move** and take it.
-    - Otherwise, run minimax.
+    - Otherwise, run minimax (until `deadline`, see minimax).
     """
     rows, cols = len(board), len(board[0])
 
@@ -282,5 +291,57 @@ def choose_best_move(board, ai_piece=YEL, depth=5):
             return col, WIN_SCORE + depth
 
 
-    col, val = minimax(board, depth, -math.inf, math.inf, True, ai_piece)
+    col, val = minimax(board, depth, -math.inf, math.inf, True, ai_piece, deadline)
     return col, val
+
+
+def choose_best_move_within(board, ai_piece=YEL, depth=5, time_left=None):
+    """
+    choose_best_move with the deadline `time_left` seconds from now, taken
+    on this process's clock. Meant for solver processes: this module is all
+    they import.
+    """
+    deadline = time.perf_counter() + time_left if time_left is not None else None
+    return choose_best_move(board, ai_piece=ai_piece, depth=depth, deadline=deadline)
+
+
+def deepening_search(board, ai_piece=YEL, time_budget=1.0, max_depth=10, growth=DEEPENING_GROWTH,
+                     search=choose_best_move_within):
+    """
+    Iterative deepening: search(board, ai_piece, depth, time_left) at depth
+    1, 2, ... while the time budget lasts, yielding (best_column, score,
+    depth) for every depth that finished. A depth isn't started when the
+    last one times `growth` would not fit, and deepening stops once a win or
+    loss is proven or no empty cells are left to look at. `search` defaults
+    to choose_best_move_within; pass a wrapper to run it elsewhere (e.g. in
+    a solver process).
+    """
+    deadline = time.perf_counter() + time_budget
+    empty = sum(row.count(EMPTY) for row in board)
+    last = 0.0
+    for depth in range(1, max(1, min(max_depth, empty)) + 1):
+        now = time.perf_counter()
+        time_left = None
+        if depth > 1:
+            time_left = deadline - now
+            if time_left < last * growth:
+                return
+        try:
+            col, score = search(board, ai_piece, depth, time_left)
+        except SearchTimeout:
+            return
+        last = time.perf_counter() - now
+        yield col, score, depth
+        if score is not None and abs(score) >= WIN_SCORE:
+            return
+
+
+def search_best_move(board, ai_piece=YEL, time_budget=1.0, max_depth=10, growth=DEEPENING_GROWTH):
+    """
+    deepening_search run to the end: (best_column, score, depth) of the
+    deepest search that finished.
+    """
+    best = (None, None, 0)
+    for best in deepening_search(board, ai_piece, time_budget, max_depth, growth):
+        pass
+    return best
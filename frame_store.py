@@ -0,0 +1,162 @@
+import argparse
+import glob
+import os
+import struct
+
+import cv2
+import numpy as np
+
+# Raw frame store for deterministic, decode-free replay.
+#
+# <name>.c4f   header, padded to DATA_ALIGN, then every frame as raw
+#              height x width x channels uint8 (BGR), back to back
+#
+# FrameStore memory-maps the frames and hands out NumPy views, so replaying
+# costs no decode and no copy, and every OpenCV build sees the exact same
+# pixels. FrameStoreCapture wraps it in the cv2.VideoCapture interface that
+# CameraFeed uses; begin_feed() accepts a .c4f path directly.
+#
+#   python frame_store.py "Test Videos"/*.mp4        # writes Test Videos/*.c4f
+
+STORE_MAGIC = b"C4FS"
+VERSION = 1
+STORE_EXT = ".c4f"
+
+STORE_HEADER = struct.Struct("<4sB3xQIIId")     # magic, version, frames, height, width, channels, fps
+DATA_ALIGN = 4096                               # frames start on a page boundary
+
+
+def store_path_for(video_path, out_dir=None):
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(out_dir or os.path.dirname(video_path), stem + STORE_EXT)
+
+
+def convert(video_path, store_path=None):
+    """Decode a video once into a frame store. Returns the store path."""
+    store_path = store_path or store_path_for(video_path)
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video source: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+    frames = 0
+    shape = None
+    frame = None
+    with open(store_path, "wb") as f:
+        f.write(b"\0" * DATA_ALIGN)              # header is written once the count is known
+        while True:
+            ret, frame = cap.read(frame)
+            if not ret:
+                break
+            if shape is None:
+                shape = frame.shape
+            elif frame.shape != shape:
+                raise ValueError(f"Frame {frames} has shape {frame.shape}, expected {shape}")
+            f.write(np.ascontiguousarray(frame).data)
+            frames += 1
+
+        h, w, c = shape if shape is not None else (0, 0, 3)
+        f.seek(0)
+        f.write(STORE_HEADER.pack(STORE_MAGIC, VERSION, frames, h, w, c, fps))
+    cap.release()
+    return store_path
+
+
+class FrameStore():
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(STORE_HEADER.size)
+        if len(header) < STORE_HEADER.size:
+            raise ValueError(f"{path}: not a frame store (too short)")
+        magic, version, frames, h, w, c, fps = STORE_HEADER.unpack(header)
+        if magic != STORE_MAGIC:
+            raise ValueError(f"{path}: not a frame store")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported frame store version {version}")
+
+        self.fps = fps
+        self.frame_shape = (h, w, c)
+        expected = DATA_ALIGN + frames * h * w * c
+        if os.path.getsize(path) < expected:
+            raise ValueError(f"{path}: truncated ({os.path.getsize(path)} of {expected} bytes)")
+        self.frames = (np.memmap(path, dtype=np.uint8, mode="r", offset=DATA_ALIGN,
+                                 shape=(frames, h, w, c))
+                       if frames else np.empty((0, h, w, c), np.uint8))
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, index):
+        """Read-only view of one frame (or a slice of frames); no copy."""
+        return self.frames[index]
+
+
+class FrameStoreCapture():
+    """
+    cv2.VideoCapture stand-in over a FrameStore: read() returns a read-only
+    view into the mapped file instead of decoding, so replay runs as fast as
+    the pipeline consuming it.
+    """
+    def __init__(self, store):
+        self.store = store if isinstance(store, FrameStore) else FrameStore(store)
+        self.pos = 0
+        self.opened = True
+
+    def read(self, image=None):
+        # `image` is accepted for cv2.VideoCapture compatibility; frames are views
+        if not self.opened or self.pos >= len(self.store):
+            return False, None
+        frame = self.store[self.pos]
+        self.pos += 1
+        return True, frame
+
+    def isOpened(self):
+        return self.opened
+
+    def get(self, prop):
+        h, w, _ = self.store.frame_shape
+        values = {
+            cv2.CAP_PROP_FPS: self.store.fps,
+            cv2.CAP_PROP_FRAME_COUNT: len(self.store),
+            cv2.CAP_PROP_POS_FRAMES: self.pos,
+            cv2.CAP_PROP_FRAME_WIDTH: w,
+            cv2.CAP_PROP_FRAME_HEIGHT: h,
+        }
+        return float(values.get(prop, 0.0))
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.pos = max(0, min(int(value), len(self.store)))
+            return True
+        return False
+
+    def release(self):
+        self.opened = False
+
+
+def open_capture(source):
+    """cv2.VideoCapture for cameras and videos, FrameStoreCapture for .c4f stores."""
+    if isinstance(source, FrameStore) or (isinstance(source, str) and source.lower().endswith(STORE_EXT)):
+        return FrameStoreCapture(source)
+    return cv2.VideoCapture(source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert recordings into memory-mapped raw frame stores.")
+    parser.add_argument("videos", nargs="*", help="video files (default: Test Videos/*.mp4)")
+    parser.add_argument("--out-dir", default=None, help="where the .c4f files go (default: next to the video)")
+    args = parser.parse_args()
+
+    videos = args.videos or sorted(glob.glob("Test Videos/*.mp4"))
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    for path in videos:
+        out = convert(path, store_path_for(path, args.out_dir))
+        store = FrameStore(out)
+        size_mb = os.path.getsize(out) / 1e6
+        print(f"{path} -> {out}: {len(store)} frames {store.frame_shape}, {size_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
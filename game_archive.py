@@ -0,0 +1,390 @@
+import os
+import struct
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from connect4_solver import EMPTY, RED, YEL
+
+# Append-only archive of finished games plus a position index.
+#
+# games.c4a        header, then one variable-size record per game
+# games.c4a.idx    sorted index: position key -> (game offset, ply, winner)
+# games.c4a.pend   unsorted index entries for games appended since the last
+#                  compaction; merged into .idx once it grows large
+#
+# A game is identified by the byte offset of its record in the archive, so
+# reading a game back is a single seek.
+
+ROWS = 6
+COLS = 7
+
+ARCHIVE_MAGIC = b"C4GA"
+INDEX_MAGIC = b"C4IX"
+VERSION = 1
+
+FILE_HEADER = struct.Struct("<4sB3x")          # magic, version
+GAME_HEADER = struct.Struct("<HdBBB")           # record size, start time, winner, n moves, n cheats
+MOVE = struct.Struct("<BI")                     # piece << 3 | col, ms since start
+CHEAT = struct.Struct("<BB")                    # ply of the offending move, cheater color
+INDEX_HEADER = struct.Struct("<4sB3xQQ")        # magic, version, entry count, archive bytes covered
+
+PENDING_DTYPE = np.dtype([("key", "<u8"), ("offset", "<u8"), ("ply", "u1"), ("winner", "u1")])
+
+COMPACT_THRESHOLD = 20_000  # pending entries before they are merged into the sorted index
+
+GameRecord = namedtuple("GameRecord", ["offset", "start_time", "moves", "cheats", "winner"])
+PositionStats = namedtuple("PositionStats", ["games", "red_wins", "yellow_wins", "no_winner"])
+
+
+# ---------------------------------------------------------------------------
+# Position keys
+# ---------------------------------------------------------------------------
+
+def _column_bits(board, col):
+    """
+    Encode one column bottom-up in 7 bits: one bit per piece (1 = red)
+    followed by a sentinel bit marking the column height.
+    """
+    bits = 0
+    height = 0
+    for r in range(ROWS - 1, -1, -1):
+        piece = board[r][col]
+        if piece == EMPTY:
+            break
+        if piece == RED:
+            bits |= 1 << height
+        height += 1
+    for r in range(ROWS - 1 - height, -1, -1):
+        if board[r][col] != EMPTY:
+            raise ValueError(f"Floating piece in column {col}; not a reachable position.")
+    return bits | (1 << height)
+
+
+def position_key(board):
+    """
+    Canonical 49-bit key for a 6x7 board (row 0 = top).
+    A position and its left-right mirror share the same key.
+    """
+    cols = [_column_bits(board, c) for c in range(COLS)]
+    key = 0
+    mirror = 0
+    for c in range(COLS):
+        key |= cols[c] << (7 * c)
+        mirror |= cols[c] << (7 * (COLS - 1 - c))
+    return min(key, mirror)
+
+
+def _replay_keys(moves):
+    """
+    Yield the canonical key after each ply of a game, starting with the
+    empty board (ply 0). Keys are updated incrementally per move.
+    """
+    heights = [0] * COLS
+    key = 0
+    mirror = 0
+    for c in range(COLS):
+        key |= 1 << (7 * c)
+        mirror |= 1 << (7 * c)
+    yield min(key, mirror)
+
+    for col, piece, _ in moves:
+        h = heights[col]
+        if h >= ROWS:
+            raise ValueError(f"Column {col} overflows in archived game.")
+        key = _drop_bits(key, 7 * col + h, piece)
+        mirror = _drop_bits(mirror, 7 * (COLS - 1 - col) + h, piece)
+        heights[col] = h + 1
+        yield min(key, mirror)
+
+
+def _drop_bits(key, bit, piece):
+    # the sentinel at `bit` becomes the piece, and moves up one
+    key &= ~(1 << bit)
+    if piece == RED:
+        key |= 1 << bit
+    return key | (1 << (bit + 1))
+
+
+# ---------------------------------------------------------------------------
+# Archive
+# ---------------------------------------------------------------------------
+
+class GameArchive():
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.pending_path = path + ".pend"
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as f:
+                f.write(FILE_HEADER.pack(ARCHIVE_MAGIC, VERSION))
+        else:
+            with open(path, "rb") as f:
+                magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+            if magic != ARCHIVE_MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a game archive (version {VERSION}).")
+
+        self._file = open(path, "r+b")
+        self._index = None
+        self._pending = None
+
+        if not self._index_is_current():
+            self.rebuild_index()
+
+    def close(self):
+        self._index = None
+        self._pending = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----- writing -----
+
+    def append_game(self, moves, winner=None, cheats=(), start_time=None):
+        """
+        Append a finished game and index every position in it.
+
+        moves   - list of (col, piece, timestamp) with epoch timestamps
+        winner  - RED, YEL or None (draw / abandoned / cheating)
+        cheats  - list of (ply, color) cheating events, ply being the move
+                  number (1-based) of the offending move
+        Returns the game's offset, which identifies it in lookups.
+        """
+        moves = list(moves)
+        cheats = list(cheats)
+        if start_time is None:
+            start_time = moves[0][2] if moves else time.time()
+
+        payload = bytearray()
+        for col, piece, ts in moves:
+            if not (0 <= col < COLS) or piece not in (RED, YEL):
+                raise ValueError(f"Invalid move ({col}, {piece}).")
+            ms = max(0, int(round((ts - start_time) * 1000)))
+            payload += MOVE.pack((piece << 3) | col, ms)
+        for ply, color in cheats:
+            payload += CHEAT.pack(ply, color)
+
+        size = GAME_HEADER.size + len(payload)
+        header = GAME_HEADER.pack(size, start_time, winner or 0, len(moves), len(cheats))
+
+        # validate before touching the file so a bad game cannot corrupt it
+        keys = list(_replay_keys(moves))
+
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(header + payload)
+        self._file.flush()
+
+        entries = np.zeros(len(keys), dtype=PENDING_DTYPE)
+        entries["key"] = keys
+        entries["offset"] = offset
+        entries["ply"] = np.arange(len(keys))
+        entries["winner"] = winner or 0
+        with open(self.pending_path, "ab") as f:
+            f.write(entries.tobytes())
+
+        if self._pending is not None:
+            self._pending = np.concatenate([self._pending, entries])
+        if self._pending_count() >= COMPACT_THRESHOLD:
+            self.compact()
+        return offset
+
+    # ----- reading -----
+
+    def read_game(self, offset):
+        self._file.seek(offset)
+        raw = self._file.read(GAME_HEADER.size)
+        size, start_time, winner, n_moves, n_cheats = GAME_HEADER.unpack(raw)
+        payload = self._file.read(size - GAME_HEADER.size)
+        return self._decode(offset, start_time, winner, n_moves, n_cheats, payload)
+
+    def iter_games(self):
+        """Stream every game in the archive without loading it all."""
+        pos = FILE_HEADER.size
+        end = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            f.seek(pos)
+            while pos + GAME_HEADER.size <= end:
+                size, start_time, winner, n_moves, n_cheats = GAME_HEADER.unpack(f.read(GAME_HEADER.size))
+                if pos + size > end:
+                    break  # torn write at the tail
+                payload = f.read(size - GAME_HEADER.size)
+                yield self._decode(pos, start_time, winner, n_moves, n_cheats, payload)
+                pos += size
+
+    @staticmethod
+    def _decode(offset, start_time, winner, n_moves, n_cheats, payload):
+        moves = []
+        for i in range(n_moves):
+            packed, ms = MOVE.unpack_from(payload, i * MOVE.size)
+            moves.append((packed & 0x7, packed >> 3, start_time + ms / 1000.0))
+        base = n_moves * MOVE.size
+        cheats = [CHEAT.unpack_from(payload, base + i * CHEAT.size) for i in range(n_cheats)]
+        return GameRecord(offset, start_time, moves, cheats, winner or None)
+
+    # ----- position lookup -----
+
+    def lookup(self, board):
+        """Return [(game_offset, ply), ...] for every game that reached `board`."""
+        offsets, plies, _ = self._matches(position_key(board))
+        return list(zip(offsets.tolist(), plies.tolist()))
+
+    def position_stats(self, board):
+        """How often the games that reached `board` were won by each side."""
+        _, _, winners = self._matches(position_key(board))
+        return PositionStats(
+            games=int(len(winners)),
+            red_wins=int(np.count_nonzero(winners == RED)),
+            yellow_wins=int(np.count_nonzero(winners == YEL)),
+            no_winner=int(np.count_nonzero(winners == 0)),
+        )
+
+    def _matches(self, key):
+        index = self._load_index()
+        offsets = []
+        plies = []
+        winners = []
+        if index is not None:
+            keys = index["keys"]
+            lo = np.searchsorted(keys, key, side="left")
+            hi = np.searchsorted(keys, key, side="right")
+            offsets.append(index["offsets"][lo:hi])
+            plies.append(index["plies"][lo:hi])
+            winners.append(index["winners"][lo:hi])
+
+        pending = self._load_pending()
+        hit = pending[pending["key"] == key]
+        offsets.append(hit["offset"])
+        plies.append(hit["ply"])
+        winners.append(hit["winner"])
+
+        return np.concatenate(offsets), np.concatenate(plies), np.concatenate(winners)
+
+    # ----- index maintenance -----
+
+    def rebuild_index(self):
+        """Rebuild the sorted index from the archive itself."""
+        chunks = []
+        for game in self.iter_games():
+            keys = list(_replay_keys(game.moves))
+            entries = np.zeros(len(keys), dtype=PENDING_DTYPE)
+            entries["key"] = keys
+            entries["offset"] = game.offset
+            entries["ply"] = np.arange(len(keys))
+            entries["winner"] = game.winner or 0
+            chunks.append(entries)
+        entries = np.concatenate(chunks) if chunks else np.zeros(0, dtype=PENDING_DTYPE)
+        self._write_index(entries)
+
+    def compact(self):
+        """Merge pending entries into the sorted index."""
+        merged = [self._load_pending()]
+        index = self._load_index()
+        if index is not None:
+            existing = np.zeros(len(index["keys"]), dtype=PENDING_DTYPE)
+            existing["key"] = index["keys"]
+            existing["offset"] = index["offsets"]
+            existing["ply"] = index["plies"]
+            existing["winner"] = index["winners"]
+            merged.insert(0, existing)
+        self._write_index(np.concatenate(merged))
+
+    def _write_index(self, entries):
+        order = np.argsort(entries["key"], kind="stable")
+        entries = entries[order]
+        covered = os.path.getsize(self.path)
+
+        self._index = None
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, len(entries), covered))
+            f.write(np.ascontiguousarray(entries["key"]).astype("<u8").tobytes())
+            f.write(np.ascontiguousarray(entries["offset"]).astype("<u8").tobytes())
+            f.write(np.ascontiguousarray(entries["ply"]).astype("u1").tobytes())
+            f.write(np.ascontiguousarray(entries["winner"]).astype("u1").tobytes())
+        os.replace(tmp, self.index_path)
+
+        with open(self.pending_path, "wb"):
+            pass
+        self._pending = np.zeros(0, dtype=PENDING_DTYPE)
+
+    def _read_index_header(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                raw = f.read(INDEX_HEADER.size)
+        except FileNotFoundError:
+            return None
+        if len(raw) < INDEX_HEADER.size:
+            return None
+        magic, version, count, covered = INDEX_HEADER.unpack(raw)
+        if magic != INDEX_MAGIC or version != VERSION:
+            return None
+        return count, covered
+
+    def _index_is_current(self):
+        """
+        Check that every game past the indexed region has pending entries.
+        A torn record left at the tail by a crash is truncated here so new
+        games are appended on a record boundary.
+        """
+        header = self._read_index_header()
+        covered = header[1] if header is not None else FILE_HEADER.size
+        pending_games = set(self._load_pending()["offset"].tolist())
+
+        current = header is not None
+        end = os.path.getsize(self.path)
+        if covered > end:
+            covered = FILE_HEADER.size
+            current = False
+        pos = covered
+        while pos + GAME_HEADER.size <= end:
+            self._file.seek(pos)
+            size = GAME_HEADER.unpack(self._file.read(GAME_HEADER.size))[0]
+            if size < GAME_HEADER.size or pos + size > end:
+                break
+            if pos not in pending_games:
+                current = False
+            pos += size
+        if pos != end:
+            self._file.truncate(pos)
+        return current
+
+    def _load_index(self):
+        if self._index is not None:
+            return self._index
+        header = self._read_index_header()
+        if header is None or header[0] == 0:
+            return None
+        count = header[0]
+        base = INDEX_HEADER.size
+        self._index = {
+            "keys": np.memmap(self.index_path, dtype="<u8", mode="r", offset=base, shape=(count,)),
+            "offsets": np.memmap(self.index_path, dtype="<u8", mode="r", offset=base + 8 * count, shape=(count,)),
+            "plies": np.memmap(self.index_path, dtype="u1", mode="r", offset=base + 16 * count, shape=(count,)),
+            "winners": np.memmap(self.index_path, dtype="u1", mode="r", offset=base + 17 * count, shape=(count,)),
+        }
+        return self._index
+
+    def _load_pending(self):
+        if self._pending is None:
+            if os.path.exists(self.pending_path):
+                raw = np.fromfile(self.pending_path, dtype=np.uint8)
+                whole = len(raw) - len(raw) % PENDING_DTYPE.itemsize
+                self._pending = raw[:whole].view(PENDING_DTYPE).copy()
+            else:
+                self._pending = np.zeros(0, dtype=PENDING_DTYPE)
+        return self._pending
+
+    def _pending_count(self):
+        if self._pending is not None:
+            return len(self._pending)
+        try:
+            return os.path.getsize(self.pending_path) // PENDING_DTYPE.itemsize
+        except FileNotFoundError:
+            return 0
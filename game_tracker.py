@@ -0,0 +1,239 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from board import Board
+from connect4_solver import EMPTY, is_winner
+
+# Game state that follows the detected boards: stability filtering, move
+# detection, cheating (same color twice) and winner checks. Shared by the
+# GUI and the headless tools; it never touches the UI.
+#
+# BoardWatcher turns the per-frame boards into a few events (board found /
+# lost, new stable board, piece added, illegal change) for consumers that
+# only want to act when something happens; CameraFeed.events() streams them.
+
+PIECES = np.array([0, 1, 2], dtype=np.int8)   # EMPTY, RED, YEL
+
+
+def board_change(prev_board, curr_board):
+    """
+    Classify the change between two stable boards: (row, col, color) when
+    exactly one piece was added and nothing else changed, otherwise None.
+    """
+    curr_board = curr_board if isinstance(curr_board, Board) else Board(curr_board)
+    if prev_board is None:
+        prev_board = Board.empty(curr_board.shape)
+
+    changes = curr_board.diff(prev_board)
+    if len(changes) != 1:
+        return None
+    r, c, before, after = changes[0]
+    if before != EMPTY or after == EMPTY:
+        return None                          # removed or recolored
+    return r, c, after
+
+
+def suggestion_ignored(suggested_col, col, color, first_mover):
+    """True when the first player (`first_mover`) played `col` instead of `suggested_col`."""
+    return (
+        suggested_col is not None and
+        col is not None and
+        first_mover is not None and
+        color == first_mover and
+        col != suggested_col
+    )
+
+
+class GameTracker():
+    """
+    Stability is decided per cell: the last `stable_frames_required`
+    classifications of every cell are kept in a ring buffer, and a cell
+    takes a new value once `votes_required` of them agree on it. A cell
+    that flickers only delays itself, not the rest of the board.
+    """
+    def __init__(self, stable_frames_required=5, votes_required=None, shape=(6, 7)):
+        self.stable_frames_required = stable_frames_required   # frames in each cell's vote window
+        # default: all but one frame of the window (at least a majority)
+        self.votes_required = votes_required or max(stable_frames_required - 1, stable_frames_required // 2 + 1)
+        self.shape = shape
+        self.reset()
+
+    def reset(self):
+        self.history = np.zeros((self.stable_frames_required,) + self.shape, dtype=np.int8)
+        self.history_len = 0                 # valid frames in the ring buffer
+        self.history_pos = 0                 # next slot to overwrite
+        self.stable_board = None             # last stable board
+        self.prev_stable_board = None        # previous stable board (used to detect moves)
+
+        self.turn_number = 0
+        self.last_move_color = None          # RED or YEL, for cheating detection
+        self.first_mover_color = None        # set on first detected move
+        self.last_move_col = None            # column index of last detected move
+        self.last_move_row = None            # row index of last detected move
+
+        self.game_moves = []                 # (col, color, timestamp) per detected move
+        self.game_cheats = []                # (move number, color) per cheating event
+
+    def start_next_game(self):
+        """
+        After a finished game: once the stable board is cleared, start the
+        next game on it (the empty board stays the stable one, so the first
+        piece is a move). Returns True when a new game started.
+        """
+        stable = self.stable_board
+        if stable is None or stable.pieces():
+            return False
+        self.reset()
+        self.stable_board = stable
+        return True
+
+    # New stable board state update
+    def update_stable_board(self, board_state):
+        """Feed one detected board (or None). Returns True when a new stable board was accepted."""
+        if board_state is None:
+            # board lost (occluded / moved): start voting from scratch
+            self.history_len = 0
+            self.history_pos = 0             # the window is history[:history_len]
+            return False
+
+        self.history[self.history_pos] = np.asarray(board_state)
+        self.history_pos = (self.history_pos + 1) % self.stable_frames_required
+        self.history_len = min(self.history_len + 1, self.stable_frames_required)
+
+        # (pieces, rows, cols) vote counts over the window
+        window = self.history[:self.history_len]
+        votes = (window[None] == PIECES[:, None, None, None]).sum(axis=1)
+        winner = votes.argmax(axis=0)
+        confident = votes.max(axis=0) >= self.votes_required
+
+        if self.stable_board is None:
+            if not confident.all():
+                return False
+            new_board = Board(winner)
+        else:
+            changed = confident & (winner != self.stable_board)
+            # a piece can't rest above an empty cell: one that shows up there
+            # is still falling (or held), so it waits until it has landed
+            below_empty = np.ones(self.shape, dtype=bool)
+            below_empty[:-1] = np.where(changed[1:], winner[1:], self.stable_board[1:]) == 0
+            below_empty[-1] = False
+            changed &= ~((winner != 0) & below_empty)
+            if not changed.any():
+                return False
+            new_board = Board(np.where(changed, winner, self.stable_board.cells))
+
+        self.prev_stable_board = self.stable_board
+        self.stable_board = new_board
+        return True
+
+    # Turn counter, check for same color moving twice
+    def process_move(self, prev_board=None, curr_board=None, timestamp=None):
+        """
+        Compare two stable boards (defaults: the last two). Returns
+        (cheater_color, winner_color); both None when nothing happened or
+        the change was not exactly one new piece.
+        """
+        if curr_board is None:
+            prev_board, curr_board = self.prev_stable_board, self.stable_board
+
+        change = board_change(prev_board, curr_board)
+        if change is None:
+            self.last_move_col = None
+            return None, None
+        r, c, moved_color = change
+
+        self.last_move_col = c
+        self.last_move_row = r
+
+        # Set first mover color from first move
+        if self.first_mover_color is None:
+            self.first_mover_color = moved_color
+
+        self.turn_number += 1
+        self.game_moves.append((c, moved_color, timestamp if timestamp is not None else time.time()))
+
+        cheater_color = None
+        if self.last_move_color is not None and moved_color == self.last_move_color:
+            cheater_color = moved_color
+            self.game_cheats.append((len(self.game_moves), cheater_color))
+
+        self.last_move_color = moved_color
+
+        winner_color = None
+        try:
+            if is_winner(curr_board.tolist(), moved_color):
+                winner_color = moved_color
+        except Exception:
+            winner_color = None
+
+        return cheater_color, winner_color
+
+    def ignored_suggestion(self, suggested_col):
+        """True when the first player just played somewhere other than `suggested_col`."""
+        return suggestion_ignored(suggested_col, self.last_move_col, self.last_move_color,
+                                  self.first_mover_color)
+
+
+# kind: "found", "lost", "stable", "piece" or "illegal". `board` is the stable
+# board (for "piece" / "illegal" the board after the change, `previous` the
+# one before); row / col / color are set for "piece".
+BoardEvent = namedtuple(
+    "BoardEvent",
+    ["kind", "frame", "time", "board", "previous", "row", "col", "color"],
+    defaults=[None, None, None, None, None, None],
+)
+
+
+class BoardWatcher():
+    """
+    Turns one detected board per frame into events. Stability uses the
+    GameTracker's per-cell votes; "lost" waits for `lost_frames` frames in
+    a row without a board so a hand passing over the board doesn't count.
+    Game rules (turns, cheating, winner) stay with the consumer, e.g. a
+    GameTracker fed the boards of each "stable" event.
+    """
+    def __init__(self, stable_frames=5, lost_frames=3, shape=(6, 7)):
+        self.votes = GameTracker(stable_frames_required=stable_frames, shape=shape)
+        self.lost_frames = lost_frames
+        self.reset()
+
+    def reset(self):
+        self.votes.reset()
+        self.visible = False
+        self.missing = 0
+        self.frames = 0
+
+    @property
+    def stable_board(self):
+        return self.votes.stable_board
+
+    def update(self, board_state, timestamp=None):
+        """Feed one frame's detected board (or None). Returns the events it caused, usually none."""
+        frame = self.frames
+        self.frames += 1
+        events = []
+
+        if board_state is None:
+            self.missing += 1
+            if self.visible and self.missing >= self.lost_frames:
+                self.visible = False
+                events.append(BoardEvent("lost", frame, timestamp, self.stable_board))
+        else:
+            self.missing = 0
+            if not self.visible:
+                self.visible = True
+                events.append(BoardEvent("found", frame, timestamp, self.stable_board))
+
+        if self.votes.update_stable_board(board_state):
+            board = self.votes.stable_board
+            previous = self.votes.prev_stable_board
+            events.append(BoardEvent("stable", frame, timestamp, board, previous))
+            if previous is not None:
+                change = board_change(previous, board)
+                if change is None:
+                    events.append(BoardEvent("illegal", frame, timestamp, board, previous))
+                else:
+                    events.append(BoardEvent("piece", frame, timestamp, board, previous, *change))
+        return events
@@ -3,10 +3,11 @@ import time
 
 import cv2
 import numpy as np
-from PIL import Image, ImageTk
 
 from read_board import CameraFeed
 from connect4_solver import RED, YEL, choose_best_move, is_winner
+from game_tracker import BoardWatcher
+from video_view import VideoView
 
 
 class Connect4VideoGUI:
@@ -15,7 +16,7 @@ class Connect4VideoGUI:
         self.root.title("Connect 4 Live (Video Feed + AI)")
 
         # initializing video file 
-        self.feed = CameraFeed()
+        self.feed = CameraFeed(lock_grid=True, roi_margin=0.1)
         print(f"[VIDEO MODE] Using video file: {video_path}")
         self.feed.begin_feed(video_path)
 
@@ -29,15 +30,8 @@ class Connect4VideoGUI:
         # initialize game over flag 
         self.game_over = False
 
-        # initialize frame of reference 
-        self.frame_photo = None
-
-        # factors checking for stable board 
-        self.stable_frames_required = 5      # number of identical frames to call it "stable"
-        self.candidate_board = None          # board_state currently being checked
-        self.candidate_frames = 0            # how many consecutive frames matched candidate
-        self.stable_board = None             # last stable board
-        self.prev_stable_board = None        # previous stable board (used to detect moves)
+        # stable board + piece events (found / lost / stable / piece / illegal)
+        self.watcher = BoardWatcher(stable_frames=5)
 
         # initialize who moved last (for cheating detection) 
         self.last_move_color = None          # RED or YEL
@@ -49,9 +43,11 @@ class Connect4VideoGUI:
         self.last_move_col = None            # column index of last detected move
         self.current_suggested_col = None    # AI suggestion for *this* frame
         self.prev_suggested_col = None       # AI suggestion shown *before* last move
+        self.suggestions = {}                # Board.key -> suggested column
 
         # building UI, initializing timer + video 
         self._build_ui()
+        self.view = VideoView(self.video_label)
         self._update_timer()
         self._update_video()
 
@@ -148,10 +144,7 @@ class Connect4VideoGUI:
         )
 
         # reset stable-board / cheating state
-        self.candidate_board = None
-        self.candidate_frames = 0
-        self.stable_board = None
-        self.prev_stable_board = None
+        self.watcher.reset()
         self.last_move_color = None
         self.first_mover_color = None
 
@@ -173,54 +166,18 @@ class Connect4VideoGUI:
         elif piece == YEL:
             return "Yellow"
         return "Unknown"
-    # updating stable board 
-    def _update_stable_board(self, board_state):
-       
-        if board_state is None:
-            self.candidate_board = None
-            self.candidate_frames = 0
-            return False
-
-        if self.candidate_board is None or not np.array_equal(board_state, self.candidate_board):
-            self.candidate_board = board_state.copy()
-            self.candidate_frames = 1
-            return False
-
-        self.candidate_frames += 1
-
-        if self.candidate_frames < self.stable_frames_required:
-            return False
-
-        if self.stable_board is None or not np.array_equal(self.stable_board, self.candidate_board):
-            self.prev_stable_board = self.stable_board.copy() if self.stable_board is not None else None
-            self.stable_board = self.candidate_board.copy()
-            return True
-
-        return False
     # cheating detection 
-    def _process_move_and_cheating(self, prev_board, curr_board):
-      
-        if prev_board is None:
-            prev_board = np.zeros_like(curr_board)
-
-        new_mask = (prev_board == 0) & (curr_board != 0)
-        removed_mask = (prev_board != 0) & (curr_board == 0)
-        recolor_mask = (prev_board != 0) & (curr_board != 0) & (prev_board != curr_board)
-
-        new_positions = np.argwhere(new_mask)
-        new_count = len(new_positions)
-
-        if new_count != 1 or np.any(removed_mask) or np.any(recolor_mask):
-            self.last_move_col = None
-            return None, None
-
-        r, c = new_positions[0]
-        moved_color = int(curr_board[r, c])
-        if moved_color == 0:
+    def _process_move_and_cheating(self, events):
+        """Game rules for the piece / illegal events of one frame."""
+        pieces = [event for event in events if event.kind == "piece"]
+        if not pieces:
             self.last_move_col = None
             return None, None
 
-        self.last_move_col = int(c)
+        piece = pieces[-1]
+        moved_color = piece.color
+        curr_board = piece.board
+        self.last_move_col = piece.col
 
         # finding which color moved first 
         if self.first_mover_color is None:
@@ -254,7 +211,7 @@ class Connect4VideoGUI:
             return
 
         try:
-            frame, gray, keypoints = self.feed.detect_ellipse()
+            frame, keypoints, board_state, board_positions = self.feed.analyze_frame()
         except Exception as e:
             if self.game_over:
                 self.root.after(100, self._update_video)
@@ -278,26 +235,24 @@ class Connect4VideoGUI:
             cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS
         )
 
-        board_state = self.feed.board_state()
-        board_positions = self.feed.board_positions()
-        stable_changed = self._update_stable_board(board_state)
+        events = self.watcher.update(board_state)
+        stable_changed = any(event.kind == "stable" for event in events)
+        stable_board = self.watcher.stable_board
 
-        if board_state is None and self.stable_board is None:
+        if board_state is None and stable_board is None:
             self.status_label.config(text="Board not detected.")
             self.message_label.config(
                 text="Invalid / incomplete board (need 42 circles). Adjust lighting/position."
             )
         else:
-            logic_board = self.stable_board if self.stable_board is not None else board_state
+            logic_board = stable_board if stable_board is not None else board_state
 
             if logic_board is None:
                 self.status_label.config(text="Board not detected.")
             else:
                 # checking for new, stable board state 
                 if stable_changed:
-                    cheater, winner = self._process_move_and_cheating(
-                        self.prev_stable_board, self.stable_board
-                    )
+                    cheater, winner = self._process_move_and_cheating(events)
 
                     if cheater is not None:
                         color_name = self._piece_name(cheater)
@@ -339,8 +294,13 @@ class Connect4VideoGUI:
                 self.prev_suggested_col = self.current_suggested_col
 
                 try:
-                    board_list = logic_board.tolist()
-                    best_col, _ = choose_best_move(board_list, ai_piece=YEL, depth=4)
+                    # search each position once; the same board comes back every frame
+                    key = logic_board.key
+                    if key not in self.suggestions:
+                        if len(self.suggestions) >= 256:
+                            self.suggestions.clear()
+                        self.suggestions[key], _ = choose_best_move(logic_board.tolist(), ai_piece=YEL, depth=4)
+                    best_col = self.suggestions[key]
                 except Exception as e:
                     best_col = None
                     self.current_suggested_col = None
@@ -392,11 +352,8 @@ class Connect4VideoGUI:
                             if "Cheating detected" not in self.message_label.cget("text"):
                                 self.message_label.config(text=f"Highlight error: {e}")
 
-        # Convert to Tk image
-        output_rgb = cv2.cvtColor(output, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(output_rgb)
-        self.frame_photo = ImageTk.PhotoImage(image=img)
-        self.video_label.config(image=self.frame_photo)
+        # Show in the label (one PhotoImage, pasted into)
+        self.view.show(output, bgr=True)
 
         self.root.after(30, self._update_video)
 
@@ -0,0 +1,376 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import cv2
+
+from read_board import CameraFeed
+from capture import LOW_LATENCY
+from game_tracker import GameTracker, suggestion_ignored
+from connect4_solver import YEL, choose_best_move
+
+# Several boards in one process tree.
+#
+# Every source (camera index or video file) gets its own worker process that
+# runs CameraFeed + GameTracker, so the CV pipelines run in parallel on
+# separate cores. Workers only send events (new stable board, move, cheat,
+# winner, fps) to the main process, which keeps one combined JSONL log and a
+# console dashboard and hands solver work to a process pool, round-robin
+# across boards with only the newest position per board kept.
+#
+#   python multi_board.py 0 1 2                    # three cameras
+#   python multi_board.py "Test Videos"/*.mp4 --log hall.jsonl
+
+
+def parse_source(text):
+    """Camera index for plain integers, otherwise a video path."""
+    return int(text) if text.isdigit() else text
+
+
+def board_worker(board_id, source, events, stop, stable_frames=5, motion_gate=True,
+                 realtime=False, stats_interval=1.0):
+    """
+    Run the CV pipeline for one source and put (board_id, kind, fields) on
+    `events`. Always ends with an "end" event, with an `error` when the
+    source could not be opened or the pipeline failed.
+    """
+    cv2.setNumThreads(1)  # one process per board already uses the cores
+    try:
+        end = _run_board(board_id, source, events, stop, stable_frames, motion_gate, realtime,
+                         stats_interval)
+    except Exception as e:
+        end = {"error": f"{type(e).__name__}: {e}"}
+    events.put((board_id, "end", end))
+
+
+def _run_board(board_id, source, events, stop, stable_frames, motion_gate, realtime, stats_interval):
+    live = isinstance(source, int)
+    feed = CameraFeed(lock_grid=True, roi_margin=0.1, motion_gate=motion_gate)
+    feed.begin_feed(source, threaded=live, profile=LOW_LATENCY if live else None)
+    try:
+        return _track_board(board_id, feed, events, stop, stable_frames, live, realtime, stats_interval)
+    finally:
+        feed.close_feed()
+
+
+def _track_board(board_id, feed, events, stop, stable_frames, live, realtime, stats_interval):
+    fps = feed.cap.get(cv2.CAP_PROP_FPS) or 30.0
+    tracker = GameTracker(stable_frames_required=stable_frames)
+
+    def emit(kind, **fields):
+        fields["frame"] = frames
+        events.put((board_id, kind, fields))
+
+    frames = 0
+    game_over = False
+    start = time.perf_counter()
+    last_stats, last_frames = start, 0
+
+    while not stop.is_set():
+        frame, _, board_state, _ = feed.analyze_frame()
+        if frame is None:
+            break
+
+        if tracker.update_stable_board(board_state):
+            stable = tracker.stable_board
+            if game_over:
+                if tracker.start_next_game():
+                    game_over = False
+                    emit("new_game")
+                emit("board", board=stable.tolist(), solve=not game_over)
+            else:
+                cheater, winner = tracker.process_move(timestamp=frames / fps)
+                if cheater is not None or winner is not None:
+                    game_over = True
+                emit("board", board=stable.tolist(), solve=not game_over)
+                if tracker.last_move_col is not None:
+                    emit("move", row=tracker.last_move_row, col=tracker.last_move_col,
+                         color=tracker.last_move_color, turn=tracker.turn_number,
+                         first_mover=tracker.first_mover_color, ends_game=game_over)
+                if cheater is not None:
+                    emit("cheat", color=cheater)
+                if winner is not None:
+                    emit("winner", color=winner)
+
+        frames += 1
+        now = time.perf_counter()
+        if now - last_stats >= stats_interval:
+            emit("stats", fps=round((frames - last_frames) / (now - last_stats), 1))
+            last_stats, last_frames = now, frames
+
+        if realtime and not live:
+            # pace video files like a camera would deliver them
+            delay = start + frames / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    elapsed = time.perf_counter() - start
+    return {"frame": frames, "frames": frames, "seconds": round(elapsed, 3),
+            "fps": round(frames / elapsed, 1) if elapsed else None}
+
+
+def _solve(board, depth):
+    return choose_best_move(board, ai_piece=YEL, depth=depth)
+
+
+# A finished search; `error` is set (and col / score are None) when it failed.
+SolverResult = namedtuple("SolverResult", ["board_id", "board", "col", "score", "error"],
+                          defaults=[None])
+
+
+class FairSolver():
+    """
+    Shares a solver process pool between boards. Each board has at most one
+    search running and one waiting; a newer position replaces the waiting
+    one, and free workers go to waiting boards in round-robin order, so a
+    busy board can't starve the others. A failed search is reported for its
+    board only; a broken pool is replaced.
+    """
+    def __init__(self, workers=1, depth=4):
+        self.depth = depth
+        self.workers = workers
+        self.pool = self._new_pool()
+        self.waiting = {}        # board_id -> board
+        self.running = {}        # board_id -> (board, future)
+        self.order = []          # round-robin order of board ids
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context("spawn"))
+
+    def submit(self, board_id, board):
+        if board_id not in self.order:
+            self.order.append(board_id)
+        self.waiting[board_id] = board
+
+    def cancel(self, board_id):
+        self.waiting.pop(board_id, None)
+
+    def _dispatch(self):
+        for board_id in list(self.order):
+            if len(self.running) >= self.workers:
+                break
+            if board_id in self.waiting and board_id not in self.running:
+                board = self.waiting.pop(board_id)
+                try:
+                    future = self.pool.submit(_solve, board, self.depth)
+                except BrokenProcessPool:
+                    self.pool.shutdown(wait=False, cancel_futures=True)
+                    self.pool = self._new_pool()
+                    future = self.pool.submit(_solve, board, self.depth)
+                self.running[board_id] = (board, future)
+                # served boards go to the back of the line
+                self.order.remove(board_id)
+                self.order.append(board_id)
+
+    def poll(self):
+        """Start waiting searches and return finished ones as SolverResults."""
+        done = []
+        for board_id, (board, future) in list(self.running.items()):
+            if future.done():
+                del self.running[board_id]
+                try:
+                    col, score = future.result()
+                except Exception as e:
+                    done.append(SolverResult(board_id, board, None, None, f"{type(e).__name__}: {e}"))
+                else:
+                    done.append(SolverResult(board_id, board, col, score))
+        self._dispatch()
+        return done
+
+    def busy(self):
+        return bool(self.waiting or self.running)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class BoardStatus():
+    def __init__(self, source):
+        self.source = source
+        self.board = None
+        self.fps = None
+        self.turn = 0
+        self.last_move = None
+        self.suggestion = None
+        self.prev_suggestion = None          # suggestion for the position before the last board
+        self.status = "starting"
+        self.ended = False
+
+
+class MultiBoardMonitor():
+    def __init__(self, sources, log_path=None, solver_workers=1, depth=4, stable_frames=5,
+                 motion_gate=True, realtime=False, dashboard=True):
+        self.sources = list(sources)
+        self.log_path = log_path
+        self.stable_frames = stable_frames
+        self.motion_gate = motion_gate
+        self.realtime = realtime
+        self.dashboard = dashboard
+        self.solver = FairSolver(workers=solver_workers, depth=depth)
+        self.boards = [BoardStatus(source) for source in self.sources]
+
+        ctx = mp.get_context("spawn")
+        self.events = ctx.Queue()
+        self.stop = ctx.Event()
+        self.workers = [
+            ctx.Process(target=board_worker, name=f"board-{i}",
+                        args=(i, source, self.events, self.stop, stable_frames, motion_gate, realtime),
+                        daemon=True)
+            for i, source in enumerate(self.sources)
+        ]
+        self.log = None
+
+    def write(self, board_id, kind, **fields):
+        record = {"type": kind, "board_id": board_id, "source": str(self.boards[board_id].source),
+                  "time": round(time.time(), 3)}
+        record.update(fields)
+        if self.log:
+            self.log.write(json.dumps(record) + "\n")
+            self.log.flush()
+        return record
+
+    def handle_event(self, board_id, kind, fields):
+        status = self.boards[board_id]
+        if kind == "stats":
+            status.fps = fields["fps"]
+            return
+        if kind == "board":
+            status.board = fields["board"]
+            status.prev_suggestion, status.suggestion = status.suggestion, None
+            status.status = "playing" if fields["solve"] else "game over"
+            if fields["solve"]:
+                self.solver.submit(board_id, fields["board"])
+            else:
+                self.solver.cancel(board_id)
+            fields = {"frame": fields["frame"], "board": fields["board"]}
+        elif kind == "move":
+            first_mover = fields.pop("first_mover")
+            ends_game = fields.pop("ends_game")
+            status.turn = fields["turn"]
+            status.last_move = fields["col"]
+            self.write(board_id, kind, **fields)
+            suggested = status.prev_suggestion
+            if not ends_game and suggestion_ignored(suggested, fields["col"], fields["color"], first_mover):
+                self.write(board_id, "ignored", frame=fields["frame"], played=fields["col"], suggested=suggested)
+            return
+        elif kind == "new_game":
+            status.turn = 0
+            status.last_move = None
+        elif kind == "cheat":
+            status.status = "cheat"
+        elif kind == "winner":
+            status.status = "winner"
+        elif kind == "end":
+            if status.ended:
+                return                       # already marked when its process exited
+            status.ended = True
+            status.status = fields.get("error", "ended")
+        self.write(board_id, kind, **fields)
+
+    def handle_suggestion(self, board_id, board, col, score, error=None):
+        status = self.boards[board_id]
+        current = board == status.board
+        if error is not None:
+            self.write(board_id, "suggestion", board=board, col=None, error=error, current=current)
+            return
+        if current:
+            status.suggestion = col
+        # logged either way, with the position it was computed for
+        self.write(board_id, "suggestion", board=board, col=col, score=score, current=current)
+
+    def render_dashboard(self):
+        lines = []
+        for i, status in enumerate(self.boards):
+            fps = f"{status.fps:6.1f}" if status.fps is not None else "     -"
+            move = status.last_move if status.last_move is not None else "-"
+            sugg = status.suggestion if status.suggestion is not None else "-"
+            lines.append(f"[{i}] {str(status.source)[-28:]:<28} {fps} fps  turn {status.turn:2d}  "
+                         f"last col {move}  suggest {sugg}  {status.status}")
+        sys.stdout.write("\x1b[2J\x1b[H" + "\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+    def run(self, dashboard_interval=0.5):
+        if self.log_path:
+            self.log = open(self.log_path, "w")
+        for worker in self.workers:
+            worker.start()
+
+        last_draw = 0.0
+        try:
+            while not all(status.ended for status in self.boards) or self.solver.busy():
+                try:
+                    board_id, kind, fields = self.events.get(timeout=0.02)
+                    self.handle_event(board_id, kind, fields)
+                    # drain whatever else is waiting before scheduling the solver
+                    while True:
+                        board_id, kind, fields = self.events.get_nowait()
+                        self.handle_event(board_id, kind, fields)
+                except queue.Empty:
+                    self._check_workers()
+
+                for result in self.solver.poll():
+                    self.handle_suggestion(*result)
+
+                if self.dashboard and time.perf_counter() - last_draw >= dashboard_interval:
+                    self.render_dashboard()
+                    last_draw = time.perf_counter()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def _check_workers(self):
+        # a worker killed before it could send "end" (e.g. out of memory) would
+        # keep run() waiting forever; one that exits normally has sent it
+        for board_id, worker in enumerate(self.workers):
+            if not self.boards[board_id].ended and worker.exitcode not in (None, 0):
+                self.handle_event(board_id, "end", {"error": f"worker exited ({worker.exitcode})"})
+
+    def close(self):
+        self.stop.set()
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.solver.shutdown()
+        if self.log:
+            self.log.close()
+            self.log = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several Connect 4 boards in one process tree.")
+    parser.add_argument("sources", nargs="+", help="camera indices and/or video files")
+    parser.add_argument("--log", default=None, help="combined JSONL event log")
+    parser.add_argument("--solver-workers", type=int, default=max(1, (os.cpu_count() or 2) // 4),
+                        help="processes shared by all boards for suggestions")
+    parser.add_argument("--depth", type=int, default=4, help="solver depth for suggestions")
+    parser.add_argument("--stable-frames", type=int, default=5,
+                        help="frames in each cell's stability vote window")
+    parser.add_argument("--no-motion-gate", action="store_true", help="analyze every frame")
+    parser.add_argument("--realtime", action="store_true", help="play video files at their own frame rate")
+    parser.add_argument("--quiet", action="store_true", help="no console dashboard")
+    args = parser.parse_args()
+
+    monitor = MultiBoardMonitor(
+        [parse_source(s) for s in args.sources],
+        log_path=args.log,
+        solver_workers=args.solver_workers,
+        depth=args.depth,
+        stable_frames=args.stable_frames,
+        motion_gate=not args.no_motion_gate,
+        realtime=args.realtime,
+        dashboard=not args.quiet,
+    )
+    monitor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import cv2
+
+from board import Board
+from connect4_solver import YEL, choose_best_move_within, deepening_search
+from read_board import StageTimer
+
+# Staged live pipeline for the GUI.
+#
+#   capture (FrameGrabber) -> analysis (AnalysisWorker) -> results -> Tk
+#                                        \-> events (FIFO) -------/  |
+#                     Tk -> positions -> solver (SolverWorker) -> suggestions -> Tk
+#
+# Capture, CV analysis and solving each run on their own thread, connected
+# by LatestValue slots: a newer value replaces one that was not taken yet,
+# so a slow stage skips to the newest input instead of working through a
+# backlog, and no stage waits for a slower one. The search itself runs in
+# a solver process, so a deep search doesn't hold the GIL that Tk and the
+# CV thread need. Stability needs every analyzed frame, so the BoardWatcher
+# runs on the analysis thread and its (rare) events go through a FIFO that
+# is never dropped. The Tk thread only takes finished results, applies the
+# game rules and renders.
+
+
+class LatestValue():
+    """One-slot queue: put() replaces an unread value (counted in `dropped`)."""
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._fresh = False
+        self.closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, value):
+        with self._cond:
+            if self._fresh:
+                self.dropped += 1
+            self._value = value
+            self._fresh = True
+            self.put_count += 1
+            self._cond.notify_all()
+
+    def take(self, timeout=None):
+        """Wait for a value that was not taken yet. None on timeout or close."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._fresh or self.closed, timeout=timeout):
+                return None
+            return self._pop()
+
+    @property
+    def pending(self):
+        """True while a value waits to be taken."""
+        return self._fresh
+
+    def poll(self):
+        """The unread value, or None right away."""
+        with self._cond:
+            return self._pop()
+
+    def _pop(self):
+        if not self._fresh:
+            return None
+        value, self._value, self._fresh = self._value, None, False
+        return value
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+def display_frame(frame, keypoints, scale=1.0, rgb=False, draw_keypoints=True):
+    """
+    New image of `frame` resized by `scale`, with the blobs drawn as red
+    circles (as cv2.drawKeypoints' rich keypoints, but at display size).
+    `rgb` converts it for PIL / Tk.
+    """
+    if scale != 1.0:
+        h, w = frame.shape[:2]
+        size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+        output = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    else:
+        output = frame.copy()
+    if draw_keypoints:
+        shift = 4                            # sub-pixel centers, like drawKeypoints
+        for kp in keypoints:
+            x, y = kp.pt
+            center = (int(round(x * scale * (1 << shift))), int(round(y * scale * (1 << shift))))
+            radius = int(round(kp.size / 2 * scale * (1 << shift)))
+            cv2.circle(output, center, radius, (0, 0, 255), 1, cv2.LINE_AA, shift)
+    if rgb:
+        cv2.cvtColor(output, cv2.COLOR_BGR2RGB, dst=output)
+    return output
+
+
+# One analyzed frame. `output` is a new image at display size (`scale` times
+# the capture size) with the blobs drawn, owned by the result (the raw frame
+# buffer is reused by the feed); `positions` stay in capture pixels. `board`
+# is the detected board, `stable` the stable board, `times` the stage times
+# when timing is on. `ended` / `error` replace the rest at the end of the
+# source or when analysis failed.
+AnalysisResult = namedtuple(
+    "AnalysisResult",
+    ["frame_id", "timestamp", "output", "keypoints", "board", "positions", "stable", "reused",
+     "times", "scale", "ended", "error"],
+    defaults=[None, None, None, None, None, None, None, None, None, 1.0, False, None],
+)
+
+
+class AnalysisWorker():
+    """
+    Runs CameraFeed.analyze_frame() and a BoardWatcher on a background
+    thread. The feed should be threaded (FrameGrabber) so capture runs on
+    its own thread too; the worker then waits for each new frame.
+    Tk-side controls (pause, timing, recorder, suggestion, profile) are
+    plain attributes / flags picked up before the next frame; reset() and
+    recalibrate() change watcher / feed state, so they are queued and run
+    on the worker thread between frames. Every reset starts a new event
+    generation: events analyzed before it are never handed out after it.
+
+    Output images are prepared for the screen here, off the Tk thread:
+    scaled down to `display_width` (None keeps the capture size) and, with
+    `rgb`, already converted for PIL.
+    """
+    def __init__(self, feed, watcher, draw_keypoints=True, display_width=None, rgb=False):
+        self.feed = feed
+        self.watcher = watcher
+        self.draw_keypoints = draw_keypoints
+        self.display_width = display_width
+        self.rgb = rgb
+        self.results = LatestValue()
+        self.events = queue.SimpleQueue()    # (generation, BoardEvent)
+        self.generation = 0                  # event generation the caller wants (bumped by reset())
+
+        self.timing = False                  # collect stage times for the telemetry overlay
+        self.recorder = None                 # recorder.Recorder fed with raw frames
+        self.suggestion = None               # current suggestion, for the recorder sidecar
+        self.profile = None                  # telemetry.ThreadProfile, to profile this thread too
+        self.frames = 0
+        self._commands = queue.SimpleQueue()   # callables run on the worker thread
+        self._generation = 0                   # generation of the events the worker produces
+        self._resume = threading.Event()
+        self._resume.set()
+        self._running = True
+        self._timer = StageTimer()
+
+        self._thread = threading.Thread(target=self._run, name="AnalysisWorker", daemon=True)
+        self._thread.start()
+
+    # ----- controls (any thread) -----
+
+    def reset(self):
+        """Start the stable board over (new game); events from before are dropped."""
+        self.generation += 1
+        self._commands.put(partial(self._reset, self.generation))
+
+    def recalibrate(self):
+        """Fit the color calibration again on the next stable board."""
+        self._commands.put(self.feed.recalibrate)
+
+    def pause(self):
+        self._resume.clear()
+
+    def resume(self):
+        self._resume.set()
+
+    def drain_events(self):
+        """BoardEvents since the last call (and the last reset), oldest first."""
+        events = []
+        while True:
+            try:
+                generation, event = self.events.get_nowait()
+            except queue.Empty:
+                return events
+            if generation == self.generation:
+                events.append(event)
+
+    def stop(self):
+        self._running = False
+        self._resume.set()
+        self._thread.join(timeout=2.0)
+        self.results.close()
+
+    # ----- worker thread -----
+
+    def _run(self):
+        try:
+            self._loop()
+        finally:
+            if self.profile is not None:
+                self.profile.close()
+
+    def _loop(self):
+        while self._running:
+            profile = self.profile
+            if profile is not None:
+                profile.sync()
+            self._run_commands()
+            if not self._resume.wait(timeout=0.1):
+                continue                     # paused; profiles and commands still run
+            if not self._running:
+                break
+
+            self.feed.stage_timer = self._timer if self.timing else None
+            try:
+                frame, keypoints, board_state, board_positions = self.feed.analyze_frame()
+            except Exception as e:
+                self.results.put(AnalysisResult(error=str(e)))
+                time.sleep(0.1)
+                continue
+            if frame is None:
+                self.results.put(AnalysisResult(ended=True))
+                time.sleep(0.1)              # a camera may come back; a file stays ended
+                continue
+
+            scale = min(1.0, self.display_width / frame.shape[1]) if self.display_width else 1.0
+            output = display_frame(frame, keypoints, scale, self.rgb, self.draw_keypoints)
+            self._mark("draw")
+
+            for event in self.watcher.update(board_state, self.feed.frame_timestamp):
+                self.events.put((self._generation, event))
+            stable = self.watcher.stable_board
+            self._mark("stability")
+
+            recorder = self.recorder
+            if recorder is not None:
+                # raw frame (no overlays), so recordings work as test videos
+                recorder.write(frame, timestamp=self.feed.frame_timestamp, board=board_state,
+                               stable=stable, suggestion=self.suggestion)
+
+            self.results.put(AnalysisResult(
+                frame_id=self.frames, timestamp=self.feed.frame_timestamp, output=output,
+                keypoints=keypoints, board=board_state, positions=board_positions,
+                stable=stable,
+                reused=self.feed.analysis_reused,
+                times=dict(self._timer.times) if self.timing else None, scale=scale,
+            ))
+            self.frames += 1
+
+    def _run_commands(self):
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            command()
+
+    def _reset(self, generation):
+        self.watcher.reset()
+        self._generation = generation
+
+    def _mark(self, stage):
+        if self.feed.stage_timer is not None:
+            self.feed.stage_timer.mark(stage)
+
+
+# `board` is the position that was searched; compare it with the current
+# stable board before showing `col`. `depth` is the search depth reached,
+# `error` is set when the search failed.
+Suggestion = namedtuple("Suggestion", ["board", "col", "score", "seconds", "depth", "error"],
+                        defaults=[None, None])
+
+
+class SolverWorker():
+    """
+    Searches the newest requested position on a background thread. With
+    `processes` the search runs in a one-process pool, so it never competes
+    with Tk and the CV thread for the GIL; a position requested while a
+    search runs waits in a LatestValue, replacing older requests.
+
+    Without a `time_budget` every position is searched at `depth`. With one,
+    the search deepens 1, 2, ... up to `depth` while the budget lasts
+    (connect4_solver.deepening_search), publishing each finished depth, and
+    gives up deepening as soon as a newer position is requested. Finished
+    searches are kept per position (the newest `cache_size`), so a position
+    seen again is answered without searching.
+    """
+    def __init__(self, depth=4, ai_piece=YEL, processes=True, time_budget=None, cache_size=256):
+        self.depth = depth
+        self.ai_piece = ai_piece
+        self.time_budget = time_budget
+        self.positions = LatestValue()
+        self.results = LatestValue()
+        self.pool = ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) if processes else None
+        self.cache = OrderedDict()           # (Board.key, ai_piece) -> deepest Suggestion
+        self.cache_size = cache_size
+        self.searches = 0
+        self.cache_hits = 0
+        self.searching = False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="SolverWorker", daemon=True)
+        self._thread.start()
+
+    def request(self, board):
+        """Ask for a suggestion for `board` (Board or (6, 7) array)."""
+        self.positions.put(board if isinstance(board, Board) else Board(board))
+
+    def warm_up(self, board=None):
+        """
+        Start the solver process and search `board` (the empty board every
+        game starts from by default) into the cache ahead of time. It is an
+        ordinary request, so a real one replaces it.
+        """
+        self.request(board if board is not None else Board.empty())
+
+    def cancel(self):
+        """Drop a waiting request (game over)."""
+        self.positions.poll()
+
+    def _run(self):
+        while self._running:
+            board = self.positions.take(timeout=0.5)
+            if board is None:
+                continue
+            self.searching = True
+            try:
+                self._search(board)
+            finally:
+                self.searching = False
+
+    def _call(self, *args):
+        # a solver-module function, so the solver process doesn't import cv2
+        if self.pool is not None:
+            return self.pool.submit(choose_best_move_within, *args).result()
+        return choose_best_move_within(*args)
+
+    def _depths(self, board_list):
+        """(col, score, depth) of each finished search of `board_list`."""
+        if self.time_budget is None:
+            col, score = self._call(board_list, self.ai_piece, self.depth, None)
+            yield col, score, self.depth
+        else:
+            yield from deepening_search(board_list, self.ai_piece, self.time_budget, self.depth,
+                                        search=self._call)
+
+    def _search(self, board):
+        key = (board.key, self.ai_piece)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            self._publish(cached._replace(board=board))
+            return
+
+        self.searches += 1
+        start = time.perf_counter()
+        best = None
+        try:
+            for col, score, depth in self._depths(board.tolist()):
+                best = Suggestion(board, col, score, time.perf_counter() - start, depth)
+                self._publish(best)
+                if self.positions.pending:
+                    return                   # the board moved on; don't keep a half-deepened result
+        except Exception as e:
+            self._publish(Suggestion(board, None, None, None, error=str(e)))
+            return
+
+        if best is not None:
+            self.cache[key] = best
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def _publish(self, suggestion):
+        if self._running:
+            self.results.put(suggestion)
+
+    def stop(self):
+        self._running = False
+        self.positions.close()
+        self._thread.join(timeout=0.5)
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
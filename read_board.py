@@ -1,10 +1,286 @@
+import asyncio
 import cv2
 import numpy as np
 import time
 import os
 
-class CameraFeed():
+from board import Board
+from capture import FrameGrabber, apply_capture_profile
+from color_calibration import ColorCalibration
+from frame_store import open_capture
+from game_tracker import BoardWatcher
+
+# Reference colors (BGR) for empty / red / yellow cells, indexed by piece value
+BG_COLOR = np.array([125,140,150])
+RD_COLOR = np.array([0,22,150])
+YL_COLOR = np.array([8,140,180])
+COLOR_MAP = np.array([BG_COLOR,RD_COLOR,YL_COLOR], dtype=np.float64)
+
+# Custom grayscale (B, G, R weights): red and yellow pieces come out bright
+GRAY_WEIGHTS = np.array([[0.1, 0.8, 1.0]])
+
+
+class BufferPool():
+    """
+    Named arrays reused from frame to frame, reallocated only when the
+    requested shape changes. A disabled pool hands out None, which makes
+    the cv2/numpy calls allocate a fresh output as usual.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._arrays = {}
+
+    def get(self, name, shape, dtype=np.uint8):
+        if not self.enabled:
+            return None
+        array = self._arrays.get(name)
+        if array is None or array.shape != shape or array.dtype != dtype:
+            array = np.empty(shape, dtype)
+            self._arrays[name] = array
+        return array
+
+
+class CellSampler():
+    """
+    Precomputed pixel indices of the filled circle inside every cell, so
+    all cell colors are averaged in one gather + reduceat pass instead of a
+    full-frame mask per cell.
+    """
+    def __init__(self, positions, radii, frame_shape):
+        h, w = frame_shape[:2]
+        self.shape = positions.shape[:2]
+        indices = []
+        counts = []
+        for (x, y), r in zip(positions.reshape(-1, 2), radii.reshape(-1)):
+            cx, cy, r = int(x), int(y), int(r)
+            ys, xs = np.mgrid[cy - r:cy + r + 1, cx - r:cx + r + 1]
+            inside = ((xs - cx) ** 2 + (ys - cy) ** 2 <= r * r) & \
+                     (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+            flat = (ys * w + xs)[inside]
+            indices.append(flat)
+            counts.append(len(flat))
+
+        self.index = np.concatenate(indices)
+        # full (cells, 3) shape: a broadcast divide would allocate iterator buffers
+        self.counts = np.repeat(np.maximum(np.array(counts), 1)[:, None], 3, axis=1).astype(np.float64)
+        self.starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        # gather / sum / mean buffers, reused for every frame
+        self._pixels = np.empty((len(self.index), 3), np.uint8)
+        self._wide = np.empty((len(self.index), 3), np.int32)
+        self._sums = np.empty((len(counts), 3), np.int32)
+        self._means = np.empty((len(counts), 3), np.float64)
+
+    def mean_colors(self, frame):
+        """
+        (cells, 3) mean BGR color per cell, in row-major grid order.
+        The result is a reused buffer, overwritten by the next call.
+        """
+        # mode="clip" writes straight into `out` (the default buffers a copy);
+        # widening into a buffer first keeps reduceat from casting a copy
+        np.take(frame.reshape(-1, 3), self.index, axis=0, out=self._pixels, mode="clip")
+        np.copyto(self._wide, self._pixels)
+        np.add.reduceat(self._wide, self.starts, axis=0, out=self._sums)
+        np.copyto(self._means, self._sums)
+        return np.divide(self._means, self.counts, out=self._means)
+
+
+# nearest reference color m minimizes |m|^2 - 2 c.m (|c|^2 is the same for all m)
+_COLOR_CROSS = -2 * COLOR_MAP.T
+_COLOR_NORMS = (COLOR_MAP ** 2).sum(axis=1)
+
+
+def classify_colors(colors, scores=None, out=None):
+    """
+    Nearest reference color for every row of a (N, 3) color array.
+    `scores` (N, 3) float64 and `out` (N,) intp are optional work buffers.
+    """
+    scores = np.matmul(colors, _COLOR_CROSS, out=scores)
+    scores += _COLOR_NORMS
+    return np.argmin(scores, axis=1, out=out)
+
+
+# lattice coordinates of the corner holes: top-left, top-right, bottom-right, bottom-left
+def _lattice_corners(rows, columns):
+    return np.array([[0, 0], [columns - 1, 0], [columns - 1, rows - 1], [0, rows - 1]], np.float32)
+
+
+def fit_grid(points, rows, columns, tolerance=0.25):
+    """
+    Order (rows * columns, 2) blob centers into the board lattice.
+
+    The corner holes are the extreme points along x + y and x - y; the
+    homography through them maps every center to lattice coordinates, which
+    are rounded to their cell. Works under perspective tilt and moderate
+    roll, where columns overlap in x. Returns a (rows, columns) array of
+    point indices, or None unless every cell gets exactly one point within
+    `tolerance` (in hole pitches) of it, so a stray blob standing in for a
+    missing hole is rejected instead of read as a cell.
+    """
+    n = rows * columns
+    if len(points) != n:
+        return None
+    points = np.asarray(points, np.float32)
+    diagonal = points[:, 0] + points[:, 1]
+    anti = points[:, 0] - points[:, 1]
+    corners = points[[np.argmin(diagonal), np.argmax(anti), np.argmax(diagonal), np.argmin(anti)]]
+    try:
+        homography = cv2.getPerspectiveTransform(corners, _lattice_corners(rows, columns))
+    except cv2.error:
+        return None
+
+    lattice = cv2.perspectiveTransform(points.reshape(-1, 1, 2), homography).reshape(-1, 2)
+    cells = np.rint(lattice)
+    if not np.all(np.isfinite(lattice)) or np.abs(lattice - cells).max() > tolerance:
+        return None
+    c = cells[:, 0].astype(np.intp)
+    r = cells[:, 1].astype(np.intp)
+    if c.min() < 0 or c.max() >= columns or r.min() < 0 or r.max() >= rows:
+        return None
+    index = r * columns + c
+    grid = np.full(n, -1, np.intp)
+    grid[index] = np.arange(n)
+    if np.any(grid < 0):                     # two points in one cell
+        return None
+    return grid.reshape(rows, columns)
+
+
+class GridLock():
+    """
+    Board geometry kept from the last full detection: keypoints in grid
+    order, the lattice -> image homography, and reference samples of the
+    plastic between the holes used to notice when the board has moved.
+    """
+    def __init__(self, keypoints, grid, positions, frame):
+        rows, columns = grid.shape
+        self.keypoints = keypoints
+        self.grid = grid
+        self.positions = positions
+        self.radii = np.array([[keypoints[i].size / 2 for i in row] for row in grid])
+        self.sampler = CellSampler(positions, self.radii, frame.shape)
+        self.frames = 0
+
+        lattice = np.array([[c, r] for r in range(rows) for c in range(columns)], dtype=np.float32)
+        self.homography, _ = cv2.findHomography(lattice, positions.reshape(-1, 2).astype(np.float32))
+
+        # probes sit on the plastic in the middle of each group of four holes
+        # and between the holes of each row (so the top row is watched too)
+        probes = np.array([[c + 0.5, r + 0.5] for r in range(rows - 1) for c in range(columns - 1)] +
+                          [[c + 0.5, r] for r in range(rows) for c in range(columns - 1)],
+                          dtype=np.float32).reshape(-1, 1, 2)
+        probes = cv2.perspectiveTransform(probes, self.homography).reshape(-1, 2)
+        h, w = frame.shape[:2]
+        self.probe_x = np.clip(np.round(probes[:, 0]).astype(int), 0, w - 1)
+        self.probe_y = np.clip(np.round(probes[:, 1]).astype(int), 0, h - 1)
+        self.probe_index = self.probe_y * w + self.probe_x
+
+        n = len(self.probe_index)
+        self._probe = np.empty((n, 3), np.uint8)
+        self._probe_wide = np.empty((n, 3), np.int16)
+        self._probe_diff = np.empty(n, np.int16)
+        self._probe_moved = np.empty(n, bool)
+        self.reference = self.sample_probes(frame).copy()
+
+    def sample_probes(self, frame):
+        """Probe colors as int16, in a buffer reused by the next call."""
+        np.take(frame.reshape(-1, 3), self.probe_index, axis=0, out=self._probe, mode="clip")
+        np.copyto(self._probe_wide, self._probe)
+        return self._probe_wide
+
+    def drifted(self, frame, threshold, max_fraction):
+        diff = np.subtract(self.sample_probes(frame), self.reference, out=self._probe_wide)
+        np.abs(diff, out=diff)
+        # summed |BGR| difference vs. 3x the per-channel mean threshold
+        np.add(diff[:, 0], diff[:, 1], out=self._probe_diff)
+        np.add(self._probe_diff, diff[:, 2], out=self._probe_diff)
+        np.greater(self._probe_diff, 3 * threshold, out=self._probe_moved)
+        return np.count_nonzero(self._probe_moved) > max_fraction * len(diff)
+
+
+class MotionGate():
+    """
+    Cheap motion check: frame difference on a tiny grayscale thumbnail.
+    Full analysis runs while something moves, for `settle_frames` frames
+    after motion stops (a move or a hand has left the frame), until
+    `settle_frames` fresh results in a row agree, and every
+    `refresh_interval` frames. Otherwise the last result is reused, so a
+    still board costs one thumbnail diff per frame.
+    """
+    def __init__(self, size=(32, 24), pixel_threshold=6, min_pixels=2,
+                 settle_frames=6, refresh_interval=30):
+        self.size = size
+        self.pixel_threshold = pixel_threshold   # gray-level change for a thumbnail pixel to count
+        self.min_pixels = min_pixels             # changed pixels that mean "motion"
+        self.settle_frames = settle_frames
+        self.refresh_interval = refresh_interval
+        self.prev = None
+        self.moving = True
+        self.still_frames = 0                    # consecutive frames without motion
+        self.since_analysis = 0                  # frames since the last full analysis
+        self.agreeing = 0                        # consecutive fresh analyses with the same board
+        self._last_board = None
+
+        w, h = size
+        self._small = np.empty((h, w, 3), np.uint8)
+        self._tiny = np.empty((h, w), np.uint8)
+        self._diff = np.empty((h, w), np.uint8)
+
+    def update(self, frame):
+        cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        tiny = cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._tiny)
+        if self.prev is None:
+            self.moving = True
+            self.prev = np.empty_like(tiny)
+        else:
+            cv2.absdiff(tiny, self.prev, dst=self._diff)
+            self.moving = cv2.countNonZero(
+                cv2.threshold(self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._diff)[1]
+            ) >= self.min_pixels
+        self.prev, self._tiny = tiny, self.prev
+        self.still_frames = 0 if self.moving else self.still_frames + 1
+        return self.moving
+
+    def should_analyze(self):
+        return (self.moving or
+                self.agreeing < self.settle_frames or
+                self.still_frames <= self.settle_frames or
+                self.since_analysis >= self.refresh_interval)
+
+    def analyzed(self, board_state):
+        """Record the board from a fresh analysis."""
+        same = board_state == self._last_board   # Boards (or None) compare as a whole
+        self.agreeing = self.agreeing + 1 if same else 1
+        self._last_board = board_state
+        self.since_analysis = 0
+
+
+# Stages CameraFeed can mark, in pipeline order
+STAGES = ("decode", "motion", "drift", "gray", "detect", "grid", "sample", "classify")
+
+
+class StageTimer():
+    """
+    Per-frame stage durations. CameraFeed marks the end of each stage it
+    runs (decode, motion, drift, gray, detect, grid, sample, classify);
+    `times` maps stage -> seconds for the current frame.
+    """
     def __init__(self):
+        self.times = {}
+        self._last = None
+
+    def start(self):
+        self.times.clear()
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.times[stage] = self.times.get(stage, 0.0) + now - self._last
+        self._last = now
+
+
+class CameraFeed():
+    def __init__(self, lock_grid=False, relock_interval=90, detection_scale=1.0, roi_margin=None,
+                 motion_gate=False, reuse_buffers=True):
         params = cv2.SimpleBlobDetector_Params()
 
         params.minThreshold = 10
@@ -13,8 +289,11 @@ class CameraFeed():
         params.blobColor = 255
 
         params.filterByArea = True
-        params.minArea = 800
-        params.maxArea = 2500
+        # area limits are in full-resolution pixels; scale them with the
+        # detection resolution
+        params.minArea = 800 * detection_scale ** 2
+        params.maxArea = 2500 * detection_scale ** 2
+        params.minDistBetweenBlobs = params.minDistBetweenBlobs * detection_scale
 
         params.filterByCircularity = True 
         params.minCircularity = 0.4
@@ -27,91 +306,344 @@ class CameraFeed():
 
         self.detector = cv2.SimpleBlobDetector_create(params)
 
-    def begin_feed(self, source):
-     
-        self.cap = cv2.VideoCapture(source)
+        # Grid lock: after a full detection, later frames reuse the cell
+        # geometry and only sample colors. Full detection runs again when
+        # the drift check fails or every `relock_interval` frames. Any probe
+        # that changed fails it: a hand over a few cells only changes a few
+        # probes, and full detection then reports no board instead of the
+        # locked cells reading the hand as pieces.
+        self.lock_grid = lock_grid
+        self.relock_interval = relock_interval
+        self.drift_threshold = 40            # per-probe mean BGR difference
+        self.drift_fraction = 0.0            # fraction of probes allowed to differ
+        self.grid_lock = None
+
+        # Detection resolution: blobs are found on a frame resized by
+        # `detection_scale`, cropped to the last board bounding box grown by
+        # `roi_margin` (fraction of the board size) once a board was found.
+        # Keypoints are mapped back to full resolution before sampling.
+        self.detection_scale = detection_scale
+        self.roi_margin = roi_margin
+        self.board_roi = None
+
+        # Motion gating: analyze while frames change and until the result has
+        # settled; while nothing moves, hand back the previous result instead.
+        # `analysis_reused` tells callers the result was not recomputed.
+        self.motion_gate = MotionGate() if motion_gate is True else (motion_gate or None)
+        self.last_analysis = None
+        self.analysis_reused = False
+        self.live = False
+
+        # Color calibration: with a ColorCalibration, cells are classified
+        # by a lookup table instead of the fixed reference colors.
+        self.calibration = None
+        self.calibration_path = None
+        self.calibration_pending = False     # fit on the next stable board
+        self.calibration_frames = 5          # identical frames that count as stable
+        self._calib_labels = None
+        self._calib_sum = None
+        self._calib_count = 0
+
+        # Preallocated frame buffers: frames are read into the same array
+        # and the grayscale / detection images are written into reused
+        # buffers, so the steady state allocates nothing frame sized. A
+        # returned frame is only valid until the next capture; copy it to
+        # keep it. `reuse_buffers=False` allocates fresh arrays instead.
+        self.buffers = BufferPool(reuse_buffers)
+        self._frame_buffer = None
+        self.gray = None                     # custom grayscale of the last detection frame
+
+        # Optional StageTimer; None keeps timing out of the hot path
+        self.stage_timer = None
+
+    def use_calibration(self, path):
+        """
+        Classify with the calibration stored at `path`. If there is none yet,
+        calibrate on the first stable board (an empty board is fine) and
+        save it there, so the next start skips calibration.
+        """
+        self.calibration_path = path
+        if os.path.exists(path):
+            self.calibration = ColorCalibration.load(path)
+            self.calibration_pending = False
+        else:
+            self.calibration = ColorCalibration()
+            self.recalibrate()
+
+    def recalibrate(self):
+        """Fit the color calibration again on the next stable board."""
+        if self.calibration is None:
+            self.calibration = ColorCalibration()
+        self.calibration_pending = True
+        self._calib_labels = None
+        self._calib_count = 0
+
+    def _collect_calibration(self, colors, labels):
+        if self._calib_labels is None or not np.array_equal(labels, self._calib_labels):
+            self._calib_labels = labels
+            self._calib_sum = colors
+            self._calib_count = 1
+            return
+        self._calib_sum += colors
+        self._calib_count += 1
+        if self._calib_count >= self.calibration_frames:
+            self.calibration.fit(self._calib_sum / self._calib_count)
+            if self.calibration_path:
+                self.calibration.save(self.calibration_path)
+            self.calibration_pending = False
+
+    def begin_feed(self, source, threaded=False, profile=None, realtime=False):
+        """
+        Open a camera index, video file or .c4f frame store (frame_store.py;
+        frames are handed out as read-only views of the mapped file).
+        `profile` (capture.CaptureProfile) sets buffer size / pixel format /
+        resolution; `threaded` reads the source on a background thread that
+        keeps only the newest frames, paced at the file's frame rate with
+        `realtime`.
+        """
+        self.cap = open_capture(source)
         if not self.cap.isOpened():
             raise RuntimeError(f"Failed to open video source: {source}")
+        self.live = isinstance(source, int)
+        if profile is not None:
+            apply_capture_profile(self.cap, profile)
+        if threaded:
+            self.cap = FrameGrabber(self.cap, reuse_frames=self.buffers.enabled,
+                                    realtime=realtime and not self.live)
+        self.frame_timestamp = None
+        self._frame_buffer = None
 
     def close_feed(self):
         self.cap.release()
 
     def capture_frame(self):
-        ret, frame = self.cap.read()
-        return frame
-    
+        # perf_counter time the frame was captured, for latency measurements
+        if isinstance(self.cap, FrameGrabber):
+            ret, frame = self.cap.read()
+            self.frame_timestamp = self.cap.last_timestamp
+        else:
+            ret, frame = self.cap.read(self._frame_buffer)
+            self.frame_timestamp = time.perf_counter()
+            if ret and self.buffers.enabled:
+                self._frame_buffer = frame
+        return frame if ret else None
+
     def detect_ellipse(self):
-        frame = self.capture_frame().copy()
-        weights = np.array([0.1, 0.8, 1.0])
-        img_float = frame.copy().astype(np.float32)
-        gray_custom = np.dot(img_float, weights)
-        gray_custom = np.clip(gray_custom, 0, 255).astype(np.uint8)
-        gray = gray_custom.copy()
-        keypoints = self.detector.detect(frame)
+        frame = self.capture_frame()
+        gray = self.gray_frame(frame)
+        keypoints = self.detector.detect(gray)
 
         return frame, gray, keypoints
 
+    def gray_frame(self, frame):
+        """Custom grayscale of `frame`, written into a reused buffer (also kept as self.gray)."""
+        self.gray = self.custom_gray(frame, self.buffers.get("gray", frame.shape[:2]))
+        return self.gray
+
+    @staticmethod
+    def custom_gray(frame, out=None):
+        # weighted sum saturated to 0..255 in one pass, no float copy
+        return cv2.transform(frame, GRAY_WEIGHTS, dst=out)
+
+    def analyze_frame(self):
+        """
+        Single pass over one captured frame: detect blobs once, order them
+        into the grid and classify every cell.
+        Returns (frame, keypoints, board_state, board_positions); the board
+        entries are None when no full 42-cell board is visible.
+        """
+        if self.stage_timer is not None:
+            self.stage_timer.start()
+        frame = self.capture_frame()
+        if frame is None:
+            return None, [], None, None
+        self._mark("decode")
+        return (frame,) + self.analyze(frame)
+
+    def _mark(self, stage):
+        if self.stage_timer is not None:
+            self.stage_timer.mark(stage)
+
+    def analyze(self, frame):
+        """Run the analysis on an already captured frame: (keypoints, board_state, board_positions)."""
+        gate = self.motion_gate
+        if gate is not None:
+            gate.update(frame)
+            self._mark("motion")
+            if self.last_analysis is not None and not gate.should_analyze():
+                gate.since_analysis += 1
+                self.analysis_reused = True
+                return self.last_analysis
+
+        self.analysis_reused = False
+        self.last_analysis = self._analyze(frame)
+        if gate is not None:
+            gate.analyzed(self.last_analysis[1])
+        return self.last_analysis
+
+    def _analyze(self, frame):
+        lock = self.grid_lock
+        if lock is not None and lock.frames < self.relock_interval:
+            drifted = lock.drifted(frame, self.drift_threshold, self.drift_fraction)
+            self._mark("drift")
+        else:
+            drifted = True
+        if not drifted:
+            lock.frames += 1
+            board_state = self.classify_cells(frame, lock.sampler)
+            return lock.keypoints, board_state, lock.positions
+
+        self.grid_lock = None
+        keypoints = self.detect_keypoints(frame)
+        board_state, board_positions = self.classify_board(frame, keypoints)
+        if board_positions is None:
+            self.board_roi = None
+        elif self.roi_margin is not None:
+            self.board_roi = self.roi_around(board_positions, frame.shape)
+        return keypoints, board_state, board_positions
+
+    def detect_keypoints(self, frame):
+        """
+        Blob detection on the custom grayscale at the configured scale / ROI,
+        in full-resolution coordinates.
+        """
+        x0, y0 = 0, 0
+        if self.board_roi is not None:
+            # only the ROI is converted; detection never looks outside it
+            x0, y0, x1, y1 = self.board_roi
+            image = self.gray_frame(frame[y0:y1, x0:x1])
+        else:
+            image = self.gray_frame(frame)
+
+        sx = sy = 1.0
+        if self.detection_scale != 1.0:
+            h, w = image.shape
+            size = (max(1, round(w * self.detection_scale)), max(1, round(h * self.detection_scale)))
+            image = cv2.resize(image, size, dst=self.buffers.get("detect", size[::-1]),
+                               interpolation=cv2.INTER_AREA)
+            sx, sy = size[0] / w, size[1] / h
+        self._mark("gray")
+
+        keypoints = self.detector.detect(image)
+        self._mark("detect")
+        if sx == 1.0 and sy == 1.0 and x0 == 0 and y0 == 0:
+            return keypoints
+        return [
+            cv2.KeyPoint((kp.pt[0] + 0.5) / sx - 0.5 + x0,
+                         (kp.pt[1] + 0.5) / sy - 0.5 + y0,
+                         kp.size / sx)
+            for kp in keypoints
+        ]
+
+    def roi_around(self, board_positions, frame_shape):
+        pts = board_positions.reshape(-1, 2)
+        lo = pts.min(axis=0)
+        hi = pts.max(axis=0)
+        # half a cell pitch reaches the outer hole edges, the margin adds slack
+        pad = self.roi_margin * (hi - lo) + 0.5 * (hi - lo) / np.array([6, 5])
+        h, w = frame_shape[:2]
+        x0, y0 = np.maximum(np.floor(lo - pad), 0).astype(int)
+        x1, y1 = np.minimum(np.ceil(hi + pad), [w, h]).astype(int)
+        return int(x0), int(y0), int(x1), int(y1)
+
     def board_state(self):
+        _, _, board_state, board_positions = self.analyze_frame()
+        return board_state, board_positions
+
+    def events(self, stable_frames=5, lost_frames=3, watcher=None):
+        """
+        Stream the meaningful changes of the open source as BoardEvents
+        (game_tracker.BoardWatcher): board found / lost, new stable board,
+        piece added at (row, col), illegal change. Ends with the source.
+
+        Frames are only read while the consumer asks for the next event, so
+        a slow consumer slows down reading a file instead of queueing
+        results, and a threaded camera (FrameGrabber) keeps dropping stale
+        frames, so events always come from the newest frames.
+        """
+        watcher = watcher or BoardWatcher(stable_frames=stable_frames, lost_frames=lost_frames)
+        while True:
+            frame, _, board_state, _ = self.analyze_frame()
+            if frame is None:
+                return
+            yield from watcher.update(board_state, self.frame_timestamp)
+
+    async def async_events(self, **options):
+        """events() for asyncio pipelines: frames are read and analyzed on a worker thread."""
+        stream = self.events(**options)
+        while True:
+            event = await asyncio.to_thread(next, stream, None)
+            if event is None:
+                return
+            yield event
+
+    def classify_board(self, frame, keypoints):
         columns = 7
         rows = 6
-        frame, gray, keypoints = self.detect_ellipse()
 
-        if len(keypoints) != 42:
-            return None, None
-        
-        params = cv2.CirclesGridFinderParameters()
-
-        revals, centers = cv2.findCirclesGrid(image = gray, 
-                                              patternSize=(rows,columns),
-                                              flags = cv2.CALIB_CB_SYMMETRIC_GRID,
-                                              blobDetector=self.detector,
-                                              parameters=params)
-        
-        if centers is None:
+        if len(keypoints) != rows * columns:
             return None, None
-        
-        if len(centers) != 42:
+
+        pos_array = np.array([point.pt for point in keypoints])
+        grid = self.order_grid(pos_array, rows, columns)
+        self._mark("grid")
+        if grid is None:
             return None, None
-        
-        board_state = np.zeros((columns,rows))
-        board_positions = np.zeros((columns,rows,2))
-        pos_array = np.array([[point.pt[0], point.pt[1]] for point in keypoints])
-        for i, center in enumerate(centers):
-            keypoint_idx = np.argmin(np.linalg.norm(pos_array - center, axis=1))
-            keypoint = keypoints[keypoint_idx]
-            color = self.average_color(frame, keypoint)
-            BG_COLOR = np.array([125,140,150])
-            RD_COLOR = np.array([0,22,150])
-            YL_COLOR = np.array([8,140,180])
-            color_map = np.array([BG_COLOR,RD_COLOR,YL_COLOR])
-            color_idx = np.argmin(np.linalg.norm(color_map - color, axis=1))
-            board_state[i // rows, i % rows] = color_idx
-            board_positions[i // rows, i % rows, :] = pos_array[keypoint_idx,:]
-
-        return board_state.T, board_positions.transpose(1,0,2)
-    
-    def average_color(self, frame, keypoint):
-        x, y = keypoint.pt
-        r = int(keypoint.size / 2)
-
-        mask = np.zeros(frame.shape[:2], dtype=np.uint8)
-        cv2.circle(mask, (int(x), int(y)), r, 255, -1)
-
-        mean_color = cv2.mean(frame, mask=mask)
-        return mean_color[:3] 
+
+        board_positions = pos_array[grid]
+        if self.lock_grid:
+            self.grid_lock = GridLock(keypoints, grid, board_positions, frame)
+            sampler = self.grid_lock.sampler
+        else:
+            radii = np.array([keypoints[i].size / 2 for i in grid.reshape(-1)])
+            sampler = CellSampler(board_positions, radii, frame.shape)
+        return self.classify_cells(frame, sampler), board_positions
+
+    def classify_cells(self, frame, sampler):
+        colors = sampler.mean_colors(frame)
+        self._mark("sample")
+        if self.calibration is None:
+            n = len(colors)
+            labels = classify_colors(colors, self.buffers.get("scores", (n, 3), np.float64),
+                                     self.buffers.get("labels", (n,), np.intp))
+        else:
+            labels = self.calibration.classify(colors)
+            if self.calibration_pending:
+                self._collect_calibration(colors.copy(), labels)
+        board_state = Board(labels.reshape(sampler.shape))
+        self._mark("classify")
+        return board_state
+
+    @staticmethod
+    def order_grid(pos_array, rows, columns):
+        """
+        Order the blob centers into the board lattice using the keypoints we
+        already have (no second detection pass). Returns a (rows, columns)
+        array of keypoint indices, row 0 at the top and column 0 on the left,
+        or None if the points are not a clean lattice.
+        """
+        return fit_grid(pos_array, rows, columns)
+
+
 if __name__ == "__main__":
     feed = CameraFeed()
     feed.begin_feed(0)
+    watcher = BoardWatcher()
 
     while True:
-        frame, gray, keypoints = feed.detect_ellipse()
+        frame, keypoints, board_state, board_positions = feed.analyze_frame()
+        if frame is None:
+            break
         output = cv2.drawKeypoints(frame, keypoints, np.array([]), (0, 0, 255),
                             cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
         cv2.imshow("Camera Feed", output)
-        cv2.imshow("Computer Vision", gray)
-        board_state, board_positions = feed.board_state()
-        os.system('cls')
-        print(board_state)
+        cv2.imshow("Computer Vision", feed.custom_gray(frame))
+        # only print when something changed
+        for event in watcher.update(board_state, feed.frame_timestamp):
+            where = f" row {event.row} col {event.col} color {event.color}" if event.kind == "piece" else ""
+            print(f"[{event.kind}] frame {event.frame}{where}")
+            if event.kind == "stable":
+                print(event.board)
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
@@ -1,12 +1,12 @@
 import cv2
 
+from recorder import Recorder
+
 cap = cv2.VideoCapture(1)
 
-fourcc = cv2.VideoWriter_fourcc(*'mp4v')
 fps = 20.0
-frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-out = cv2.VideoWriter('yellow_cheats.mp4', fourcc, fps, (frame_width, frame_height))
+# frames are encoded on a background thread; yellow_cheats.jsonl gets the frame timestamps
+out = Recorder('yellow_cheats.mp4', fps=fps)
 
 while True:
     ret, frame = cap.read()
@@ -21,5 +21,6 @@ while True:
         break
 
 cap.release()
-out.release()
+out.close()
+print(out.stats())
 cv2.destroyAllWindows()
@@ -0,0 +1,204 @@
+import json
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from board import Board
+
+# Non-blocking game recorder.
+#
+# write() copies the frame into a pooled buffer and queues it; a background
+# thread encodes it with cv2.VideoWriter and appends a line to the sidecar
+# (<video>.jsonl) with the frame's capture time, detected board and
+# suggestion. When the encoder falls behind and the queue is full the frame
+# is dropped (and counted) instead of stalling the capture loop, so sidecar
+# frame numbers always match the frames in the video.
+#
+# Only the frames that reach write() are recorded (the GUI writes analyzed
+# frames, and the capture thread skips frames the analysis had no time
+# for), so the real rate can be well below the camera's `fps`. When the
+# recording is finished the rate is measured from the capture times; if it
+# is more than `fps_tolerance` off, the video is re-encoded at the measured
+# rate so it plays back in real time.
+#
+# Sidecar lines:
+#   {"type": "header", "video": ..., "fps": ..., "size": [w, h], "started": unix time}
+#   {"frame": 0, "t": 0.0, "board": [[...]], "stable": [[...]], "suggestion": 3, ...}
+#   {"type": "summary", "frames": ..., "dropped": ..., "fps": rate the video plays at}
+
+
+def _jsonable(value):
+    if isinstance(value, Board):
+        return value.tolist()
+    if isinstance(value, np.ndarray):
+        return value.astype(int).tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class Recorder():
+    def __init__(self, path, fps=20.0, fourcc="mp4v", queue_size=64, sidecar_path=None, fps_tolerance=0.05):
+        self.path = path
+        self.fps = fps
+        self.fps_tolerance = fps_tolerance
+        self.fourcc = fourcc
+        self.sidecar_path = sidecar_path or os.path.splitext(path)[0] + ".jsonl"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._free = []                      # frame buffers returned by the writer
+        self._lock = threading.Lock()
+        self._writer = None
+        self._sidecar = open(self.sidecar_path, "w")
+        self._first_stamp = None
+        self._last_stamp = None
+        self.started = time.time()
+
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.error = None                    # first encoder error; later frames are dropped
+        self.closed = False
+
+        self._thread = threading.Thread(target=self._run, name="Recorder", daemon=True)
+        self._thread.start()
+
+    def write(self, frame, timestamp=None, **info):
+        """
+        Queue one frame (BGR) with its capture time (perf_counter seconds)
+        and sidecar fields such as board=, stable=, suggestion=.
+        Never blocks; returns False when the frame was dropped.
+        """
+        if self.closed or self.error is not None:
+            return False
+        with self._lock:
+            buffer = self._free.pop() if self._free else None
+        if buffer is None or buffer.shape != frame.shape:
+            buffer = np.empty_like(frame)
+        np.copyto(buffer, frame)
+
+        stamp = timestamp if timestamp is not None else time.perf_counter()
+        try:
+            self._queue.put_nowait((buffer, stamp, info))
+        except queue.Full:
+            self.dropped += 1
+            self._recycle(buffer)
+            return False
+        self.queued += 1
+        return True
+
+    def _recycle(self, buffer):
+        with self._lock:
+            if len(self._free) < self._queue.maxsize:
+                self._free.append(buffer)
+
+    def _open_writer(self, frame):
+        h, w = frame.shape[:2]
+        self._writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (w, h))
+        if not self._writer.isOpened():
+            raise RuntimeError(f"Failed to open video writer: {self.path}")
+        self._sidecar.write(json.dumps({
+            "type": "header", "video": os.path.basename(self.path), "fps": self.fps,
+            "size": [w, h], "started": round(self.started, 3),
+        }) + "\n")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            frame, stamp, info = item
+            if self.error is not None:
+                self.dropped += 1            # keep draining, so write() and close() never block
+                continue
+            try:
+                if self._writer is None:
+                    self._open_writer(frame)
+                self._writer.write(frame)
+            except Exception as e:
+                self.error = str(e)
+                self.dropped += 1
+                continue
+            self._recycle(frame)
+
+            if self._first_stamp is None:
+                self._first_stamp = stamp
+            self._last_stamp = stamp
+            record = {"frame": self.written, "t": round(stamp - self._first_stamp, 4)}
+            record.update((key, _jsonable(value)) for key, value in info.items())
+            self._sidecar.write(json.dumps(record) + "\n")
+            self.written += 1
+
+        self._finish()
+
+    def measured_fps(self):
+        """Frames per second of capture time over the written frames (None before two)."""
+        if self.written < 2 or self._last_stamp <= self._first_stamp:
+            return None
+        return (self.written - 1) / (self._last_stamp - self._first_stamp)
+
+    def _retime(self, fps):
+        """Re-encode the finished video at `fps`."""
+        root, ext = os.path.splitext(self.path)
+        temp = root + ".retime" + ext
+        cap = cv2.VideoCapture(self.path)
+        writer = None
+        try:
+            while True:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                if writer is None:
+                    h, w = frame.shape[:2]
+                    writer = cv2.VideoWriter(temp, cv2.VideoWriter_fourcc(*self.fourcc), fps, (w, h))
+                writer.write(frame)
+        finally:
+            cap.release()
+            if writer is not None:
+                writer.release()
+        os.replace(temp, self.path)
+
+    def _finish(self):
+        if self._writer is not None:
+            self._writer.release()
+        fps = self.fps
+        measured = self.measured_fps()
+        if (self.error is None and measured is not None and
+                abs(measured - self.fps) > self.fps_tolerance * self.fps):
+            try:
+                self._retime(measured)
+                fps = measured
+            except Exception as e:
+                self.error = f"retiming to {measured:.1f} fps failed: {e}"
+        summary = {"type": "summary", "frames": self.written, "dropped": self.dropped, "fps": round(fps, 3)}
+        if self.error is not None:
+            summary["error"] = self.error
+        self._sidecar.write(json.dumps(summary) + "\n")
+        self._sidecar.close()
+
+    def stats(self):
+        return {"queued": self.queued, "written": self.written, "dropped": self.dropped,
+                "backlog": self._queue.qsize(), "error": self.error}
+
+    def close(self, wait=True):
+        """
+        Finish encoding what is queued, then close the video and sidecar on
+        the writer thread. `wait=False` returns right away (see join()).
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(None)
+        if wait:
+            self.join()
+
+    def join(self, timeout=None):
+        """Wait until the video and sidecar are finished."""
+        self._thread.join(timeout)
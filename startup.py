@@ -0,0 +1,71 @@
+import threading
+import time
+
+# Background initialization with a startup report.
+#
+# Independent init steps (opening the camera, starting the solver, loading
+# assets) each run on their own thread while the window is already up; the
+# Tk thread polls done() and picks the results up with result(). Every step
+# and milestone (window shown, first frame) is recorded in seconds since
+# `start` - pass the time the program started to get the real launch times.
+#
+#   startup = Startup(start=LAUNCH)
+#   startup.run("camera", open_camera, path)
+#   ...
+#   if startup.done("camera"):
+#       feed = startup.result("camera")          # raises the step's error
+#   startup.mark("first frame")
+#   print(startup.report())                      # window 0.04 s, camera 0.52 s, ...
+
+
+class Startup():
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}                      # name -> seconds since start, in finishing order
+        self._results = {}
+        self._errors = {}
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def run(self, name, fn, *args):
+        """Run fn(*args) on a background thread; marked `name` when it returns."""
+        thread = threading.Thread(target=self._step, args=(name, fn, args), name=f"Startup-{name}",
+                                  daemon=True)
+        self._threads[name] = thread
+        thread.start()
+        return thread
+
+    def _step(self, name, fn, args):
+        try:
+            self._results[name] = fn(*args)
+        except Exception as e:
+            self._errors[name] = e
+        self.mark(name)
+
+    def mark(self, name):
+        """Record a milestone (only its first time)."""
+        with self._lock:
+            if name not in self.marks:
+                self.marks[name] = time.perf_counter() - self.start
+                return True
+        return False
+
+    def done(self, name):
+        return name in self.marks
+
+    def result(self, name):
+        """What step `name` returned; re-raises its error."""
+        if name in self._errors:
+            raise self._errors[name]
+        return self._results.get(name)
+
+    def wait(self, name, timeout=None):
+        thread = self._threads.get(name)
+        if thread is not None:
+            thread.join(timeout)
+        return self.done(name)
+
+    def report(self):
+        parts = [f"{name} {seconds:.2f} s" for name, seconds in self.marks.items() if name not in self._errors]
+        failed = [f"{name} failed: {error}" for name, error in self._errors.items()]
+        return ", ".join(parts + failed)
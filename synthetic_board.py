@@ -0,0 +1,345 @@
+import argparse
+import json
+import math
+import os
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from connect4_solver import EMPTY, RED, YEL
+
+# Synthetic board frames with ground truth.
+#
+# BoardRenderer draws the physical board for any 6x7 position: a flat
+# texture of the blue frame, its holes and the pieces (colors measured on
+# the test videos) is projected through a random camera pose onto a
+# cluttered wall, then lit, blurred, noised and sometimes partly covered by
+# a hand. Every frame comes with its truth: the board, the projected hole
+# centers, the scene parameters and the cells the hand covers.
+#
+#   for frame, truth in generate(1000, seed=1): ...
+#   python synthetic_board.py --count 600 --hold 20 --video synth.mp4   # + synth.jsonl
+#   python benchmark_cv.py --synthetic 10000                            # CameraFeed accuracy / fps
+
+ROWS, COLUMNS = 6, 7
+
+# BGR colors as the camera sees them under office light
+PLASTIC_COLOR = (140, 64, 2)
+RIM_COLOR = (100, 27, 0)
+PIECE_COLORS = {RED: (5, 33, 192), YEL: (50, 170, 200)}
+WALL_COLOR = (160, 165, 155)
+SKIN_COLOR = (120, 150, 200)
+
+# Board geometry in hole pitches, hole (r, c) centered at (c, r)
+HOLE_RADIUS = 0.36
+RIM_RADIUS = 0.42
+BORDER = 0.45                  # frame around the outer holes
+LEG_LENGTH = 0.9
+
+# Per-frame variation: angles are +- degrees, pairs are (low, high) ranges,
+# `scale` is the board width as a fraction of the frame width (the test
+# videos are about 0.8), `shift` a fraction of the frame size and
+# `occlusion` the chance of a hand
+Variation = namedtuple(
+    "Variation",
+    ["yaw", "pitch", "roll", "scale", "shift", "brightness", "gradient", "color_cast",
+     "noise", "blur", "occlusion"],
+    defaults=[25.0, 15.0, 5.0, (0.55, 0.85), 0.08, (0.6, 1.3), 0.25, 0.08, (0.0, 8.0), (0.0, 1.5), 0.2],
+)
+
+DEFAULT_VARIATION = Variation()
+# Straight-on, evenly lit, clean frames
+PLAIN = Variation(0.0, 0.0, 0.0, (0.8, 0.8), 0.0, (1.0, 1.0), 0.0, 0.0, (0.0, 0.0), (0.0, 0.0), 0.0)
+
+
+def random_position(rng, moves=None):
+    """A reachable position: `moves` pieces (random if None) dropped in random columns, red first."""
+    board = np.zeros((ROWS, COLUMNS), np.int8)
+    heights = np.zeros(COLUMNS, int)
+    if moves is None:
+        moves = int(rng.integers(0, ROWS * COLUMNS + 1))
+    for move in range(moves):
+        open_columns = np.flatnonzero(heights < ROWS)
+        col = rng.choice(open_columns)
+        board[ROWS - 1 - heights[col], col] = RED if move % 2 == 0 else YEL
+        heights[col] += 1
+    return board
+
+
+class BoardRenderer():
+    def __init__(self, size=(640, 480), variation=DEFAULT_VARIATION, seed=None, pitch_px=64):
+        self.size = size
+        self.variation = variation
+        self.rng = np.random.default_rng(seed)
+        self.pitch_px = pitch_px
+        self._build_texture()
+
+        w, h = size
+        self._frame = np.empty((h, w, 3), np.uint8)
+        self._light = np.empty((h, w, 3), np.float32)
+        self._covered = np.empty((h, w), np.uint8)
+        # one tile of unit gaussian noise; every frame uses a random window of it
+        self._noise = self.rng.standard_normal((h + 64, w + 64, 3), dtype=np.float32)
+
+    # ----- board texture -----
+
+    def _to_texture(self, x, y):
+        return (x + BORDER) * self.pitch_px, (y + BORDER) * self.pitch_px
+
+    def _build_texture(self):
+        """The empty board face (plastic, lip, hole rims), drawn once."""
+        p = self.pitch_px
+        w = int(round((COLUMNS - 1 + 2 * BORDER) * p))
+        h = int(round((ROWS - 1 + 2 * BORDER) * p))
+
+        # plastic, slightly lighter towards the top, with a raised lip around the edge
+        shade = np.linspace(1.08, 0.92, h)[:, None, None]
+        texture = np.empty((h, w, 3), np.uint8)
+        texture[:] = np.clip(np.array(PLASTIC_COLOR) * shade, 0, 255).astype(np.uint8)
+        lip = max(1, int(0.1 * p))
+        cv2.rectangle(texture, (lip, lip), (w - lip, h - lip), RIM_COLOR, max(1, lip // 2))
+
+        self.hole_centers = []
+        for r in range(ROWS):
+            for c in range(COLUMNS):
+                center = tuple(int(round(v)) for v in self._to_texture(c, r))
+                self.hole_centers.append(center)
+                cv2.circle(texture, center, int(RIM_RADIUS * p), RIM_COLOR, -1, cv2.LINE_AA)
+
+        self.texture = texture
+        self._texture = np.empty_like(texture)
+
+    def _draw_holes(self, board, wall, rng):
+        """Board face for one frame: the wall shows through empty holes, pieces fill the rest."""
+        np.copyto(self._texture, self.texture)
+        p = self.pitch_px
+        radius = int(HOLE_RADIUS * p)
+        for (r, c), piece in np.ndenumerate(board):
+            center = self.hole_centers[r * COLUMNS + c]
+            if piece == EMPTY:
+                cv2.circle(self._texture, center, radius, wall, -1, cv2.LINE_AA)
+                continue
+            color = np.clip(np.array(PIECE_COLORS[int(piece)]) + rng.normal(0, 4, 3), 0, 255)
+            darker = tuple(float(v) for v in color * 0.85)
+            cv2.circle(self._texture, center, radius, tuple(float(v) for v in color), -1, cv2.LINE_AA)
+            # embossed ring on the piece face
+            cv2.circle(self._texture, center, int(0.26 * p), darker, max(1, p // 24), cv2.LINE_AA)
+
+    # ----- scene -----
+
+    def random_scene(self):
+        """Draw the parameters of one frame from the variation ranges."""
+        v = self.variation
+        rng = self.rng
+
+        def spread(limit):
+            return float(rng.uniform(-limit, limit)) if limit else 0.0
+
+        return {
+            "yaw": spread(v.yaw),
+            "pitch": spread(v.pitch),
+            "roll": spread(v.roll),
+            "scale": float(rng.uniform(*v.scale)),
+            "shift": [spread(v.shift), spread(v.shift)],
+            "brightness": float(rng.uniform(*v.brightness)),
+            "gradient": [spread(v.gradient), spread(v.gradient)],
+            "color_cast": [1.0 + spread(v.color_cast) for _ in range(3)],
+            "noise": float(rng.uniform(*v.noise)),
+            "blur": float(rng.uniform(*v.blur)),
+            "occluded": bool(rng.random() < v.occlusion),
+        }
+
+    def board_homography(self, scene):
+        """Homography from board coordinates (hole pitches) to image pixels for a scene's pose."""
+        w, h = self.size
+        focal = float(w)
+        yaw, pitch, roll = (math.radians(scene[k]) for k in ("yaw", "pitch", "roll"))
+        rx = np.array([[1, 0, 0], [0, math.cos(pitch), -math.sin(pitch)], [0, math.sin(pitch), math.cos(pitch)]])
+        ry = np.array([[math.cos(yaw), 0, math.sin(yaw)], [0, 1, 0], [-math.sin(yaw), 0, math.cos(yaw)]])
+        rz = np.array([[math.cos(roll), -math.sin(roll), 0], [math.sin(roll), math.cos(roll), 0], [0, 0, 1]])
+        rotation = rz @ ry @ rx
+
+        # distance that makes the board `scale` of the frame width when seen straight on
+        board_w = COLUMNS - 1 + 2 * BORDER
+        distance = focal * board_w / (scene["scale"] * w)
+        center = np.array([(COLUMNS - 1) / 2, (ROWS - 1) / 2])
+        corners = np.array([[-BORDER, -BORDER], [COLUMNS - 1 + BORDER, -BORDER],
+                            [COLUMNS - 1 + BORDER, ROWS - 1 + BORDER], [-BORDER, ROWS - 1 + BORDER]])
+        points = np.column_stack([corners - center, np.zeros(4)]) @ rotation.T + [0, 0, distance]
+        image = focal * points[:, :2] / points[:, 2:] + [w / 2 + scene["shift"][0] * w,
+                                                           h / 2 + scene["shift"][1] * h]
+        return cv2.getPerspectiveTransform(corners.astype(np.float32), image.astype(np.float32))
+
+    def _background(self, rng, out):
+        """Wall with a soft vertical falloff and a few clutter rectangles. Returns the wall color."""
+        w, h = self.size
+        base = np.clip(np.array(WALL_COLOR) + rng.normal(0, 12, 3), 0, 255)
+        out[:] = np.clip(base * np.linspace(0.9, 1.1, h)[:, None], 0, 255).astype(np.uint8)[:, None, :]
+        for _ in range(int(rng.integers(0, 5))):
+            x0, y0 = int(rng.integers(-w // 4, w)), int(rng.integers(-h // 4, h))
+            x1, y1 = x0 + int(rng.integers(w // 10, w // 2)), y0 + int(rng.integers(h // 10, h // 2))
+            color = tuple(float(v) for v in rng.uniform(20, 240) + rng.normal(0, 10, 3))
+            cv2.rectangle(out, (x0, y0), (x1, y1), color, -1 if rng.random() < 0.6 else int(rng.integers(2, 8)))
+        return tuple(float(v) for v in base)
+
+    def _legs(self, homography, image):
+        """Both legs below the frame, as projected quads in the plastic color."""
+        bottom = ROWS - 1 + BORDER
+        for x0 in (-BORDER, COLUMNS - 1 + BORDER - 0.4):
+            quad = np.array([[[x0, bottom], [x0 + 0.4, bottom], [x0 + 0.4, bottom + LEG_LENGTH],
+                              [x0, bottom + LEG_LENGTH]]], np.float32)
+            points = cv2.perspectiveTransform(quad, homography)[0]
+            cv2.fillConvexPoly(image, np.round(points).astype(np.int32), PLASTIC_COLOR, cv2.LINE_AA)
+
+    def _hand(self, homography, rng, image):
+        """Paint a hand reaching over the board; returns its mask."""
+        h, w = image.shape[:2]
+        covered = self._covered
+        covered[:] = 0
+        spot = np.array([[[rng.uniform(0, COLUMNS - 1), rng.uniform(-0.5, ROWS - 1)]]], np.float32)
+        x, y = cv2.perspectiveTransform(spot, homography)[0, 0]
+        edge = cv2.perspectiveTransform(np.array([[[0, 0], [1, 0]]], np.float32), homography)[0]
+        pitch = float(np.linalg.norm(edge[1] - edge[0]))
+        radius = pitch * rng.uniform(0.6, 1.2)
+        # arm from the palm to the top or a side of the frame
+        end = [(x + rng.uniform(-w / 4, w / 4), -10), (-10, y), (w + 10, y)][int(rng.integers(0, 3))]
+        palm = (int(x), int(y))
+        axes = (int(radius), int(radius * rng.uniform(0.7, 1.0)))
+        angle = float(rng.uniform(0, 180))
+        end = tuple(int(v) for v in end)
+        thickness = max(2, int(radius * 1.2))
+        skin = tuple(float(v) for v in np.clip(np.array(SKIN_COLOR) + rng.normal(0, 15, 3), 0, 255))
+        for target, color in ((image, skin), (covered, 255)):
+            cv2.ellipse(target, palm, axes, angle, 0, 360, color, -1, cv2.LINE_AA)
+            cv2.line(target, palm, end, color, thickness, cv2.LINE_AA)
+        return covered
+
+    # ----- rendering -----
+
+    def render(self, board, scene=None):
+        """
+        One BGR uint8 frame of `board` ((6, 7), EMPTY/RED/YEL) and its truth
+        dict. The frame is a reused buffer, overwritten by the next call.
+        """
+        board = np.asarray(board).astype(np.int8)
+        scene = scene or self.random_scene()
+        rng = self.rng
+        w, h = self.size
+
+        board_to_image = self.board_homography(scene)
+        texture_to_board = np.array([[1 / self.pitch_px, 0, -BORDER], [0, 1 / self.pitch_px, -BORDER], [0, 0, 1]])
+        homography = board_to_image @ texture_to_board
+
+        image = self._frame
+        wall = self._background(rng, image)
+        self._draw_holes(board, wall, rng)
+        self._legs(board_to_image, image)
+        # the board face lands on the background; pixels outside it are left alone
+        cv2.warpPerspective(self._texture, homography, (w, h), dst=image,
+                            flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_TRANSPARENT)
+
+        lattice = np.array([[[c, r] for r in range(ROWS) for c in range(COLUMNS)]], np.float32)
+        centers = cv2.perspectiveTransform(lattice, board_to_image)[0]
+        occluded = np.zeros((ROWS, COLUMNS), bool)
+        if scene["occluded"]:
+            covered = self._hand(board_to_image, rng, image)
+            xs = np.clip(np.round(centers[:, 0]).astype(int), 0, w - 1)
+            ys = np.clip(np.round(centers[:, 1]).astype(int), 0, h - 1)
+            occluded = (covered[ys, xs] > 0).reshape(ROWS, COLUMNS)
+
+        # lighting: overall level and color cast, ramping linearly between the
+        # corners (gradient), applied as one saturating multiply
+        gx, gy = scene["gradient"]
+        corners = np.array([[1 - gx - gy, 1 + gx - gy], [1 - gx + gy, 1 + gx + gy]], np.float32)
+        gain = corners[:, :, None] * (scene["brightness"] * np.array(scene["color_cast"], np.float32))
+        cv2.resize(gain, (w, h), dst=self._light, interpolation=cv2.INTER_LINEAR)
+        cv2.multiply(image, self._light, dst=image, dtype=cv2.CV_8U)
+
+        if scene["blur"] > 0.05:
+            cv2.GaussianBlur(image, (0, 0), scene["blur"], dst=image)
+        if scene["noise"] > 0:
+            x, y = rng.integers(0, 64, 2)
+            cv2.addWeighted(image, 1.0, self._noise[y:y + h, x:x + w], scene["noise"], 0.0,
+                            dst=image, dtype=cv2.CV_8U)
+
+        visible = (centers[:, 0] >= 0) & (centers[:, 0] < w) & (centers[:, 1] >= 0) & (centers[:, 1] < h)
+        truth = {
+            "board": board,
+            "centers": centers.reshape(ROWS, COLUMNS, 2),
+            "occluded": occluded,
+            "visible": bool(visible.all()),
+            "scene": scene,
+        }
+        return self._frame, truth
+
+
+def generate(count, seed=None, variation=DEFAULT_VARIATION, size=(640, 480), hold=1):
+    """
+    Yield `count` (frame, truth) pairs. Each random position and scene is
+    held for `hold` frames (fresh noise each frame), so videos give the
+    stability filter something to settle on. Frames are reused buffers.
+    """
+    renderer = BoardRenderer(size=size, variation=variation, seed=seed)
+    board = scene = None
+    for i in range(count):
+        if i % hold == 0:
+            board = random_position(renderer.rng)
+            scene = renderer.random_scene()
+        yield renderer.render(board, scene)
+
+
+def truth_record(truth):
+    """JSON-friendly ground truth for a sidecar line."""
+    return {
+        "board": truth["board"].astype(int).tolist(),
+        "centers": np.round(truth["centers"], 2).tolist(),
+        "occluded": truth["occluded"].astype(int).tolist(),
+        "visible": truth["visible"],
+        "scene": {k: (round(v, 4) if isinstance(v, float) else v) for k, v in truth["scene"].items()},
+    }
+
+
+def write_video(path, count, seed=None, variation=DEFAULT_VARIATION, size=(640, 480), hold=1,
+                fps=20.0, fourcc="mp4v", sidecar_path=None):
+    """
+    Render `count` frames into a video with a recorder-style sidecar
+    (<video>.jsonl: header, one truth line per frame, summary).
+    Returns the sidecar path.
+    """
+    sidecar_path = sidecar_path or os.path.splitext(path)[0] + ".jsonl"
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Failed to open video writer: {path}")
+    with open(sidecar_path, "w") as sidecar:
+        sidecar.write(json.dumps({"type": "header", "video": os.path.basename(path), "fps": fps,
+                                  "size": list(size), "synthetic": True, "seed": seed,
+                                  "variation": variation._asdict()}) + "\n")
+        frames = 0
+        for frame, truth in generate(count, seed=seed, variation=variation, size=size, hold=hold):
+            writer.write(frame)
+            record = {"frame": frames, "t": round(frames / fps, 4)}
+            record.update(truth_record(truth))
+            sidecar.write(json.dumps(record) + "\n")
+            frames += 1
+        sidecar.write(json.dumps({"type": "summary", "frames": frames, "dropped": 0}) + "\n")
+    writer.release()
+    return sidecar_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render synthetic Connect 4 board frames with ground truth.")
+    parser.add_argument("--count", type=int, default=600, help="frames to render")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hold", type=int, default=1, help="frames each random position / pose is held")
+    parser.add_argument("--video", default="synthetic.mp4", help="output video (sidecar goes next to it)")
+    parser.add_argument("--plain", action="store_true", help="no pose, lighting, noise or occlusion variation")
+    args = parser.parse_args()
+
+    sidecar = write_video(args.video, args.count, seed=args.seed, hold=args.hold,
+                          variation=PLAIN if args.plain else DEFAULT_VARIATION)
+    print(f"wrote {args.count} frames to {args.video}, ground truth in {sidecar}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import cProfile
+import csv
+import io
+import json
+import pstats
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from read_board import STAGES, StageTimer
+
+# Live per-stage timing for the GUI.
+#
+# A Telemetry owns the StageTimer that is attached to the CameraFeed while
+# timing is on. The feed marks its own stages (decode ... classify), the GUI
+# adds the ones after it (draw, stability, solver, render), and end_frame()
+# closes the frame: it goes into a rolling window for the on-screen overlay
+# and, if a path was given, is appended to a JSON-lines or CSV file.
+# Nothing is recorded while the timer is detached. When the feed runs on
+# another thread (pipeline.AnalysisWorker) its stage times arrive with each
+# result and are passed to end_frame() next to the GUI's own.
+#
+# cProfile only sees the thread that enabled it, so a profile started on the
+# Tk thread is joined by worker threads through a ThreadProfile that they
+# sync() once per frame; stop_profile() merges their stats into one file.
+
+GUI_STAGES = ("draw", "stability", "solver", "render")
+ALL_STAGES = STAGES + GUI_STAGES
+
+
+class Telemetry():
+    def __init__(self, window=60, path=None):
+        self.timer = StageTimer()
+        self.frames = deque(maxlen=window)   # stage times of the last frames
+        self.ticks = deque(maxlen=window)    # end time of the last frames
+        self.count = 0
+
+        self.path = None
+        self._file = None
+        self._csv = None
+        if path:
+            self.open(path)
+
+        self.profiler = None
+        self.profile_left = 0
+        self.profile_path = None
+        self.profile_generation = 0
+        self._profile_lock = threading.Lock()
+        self._thread_profiles = []           # (profiler, finished Event) enabled on worker threads
+
+    # ----- export -----
+
+    def open(self, path):
+        """Stream every frame to `path`: CSV if it ends in .csv, JSON lines otherwise."""
+        self.close()
+        self.path = path
+        self._file = open(path, "w", newline="")
+        if path.lower().endswith(".csv"):
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(["frame", "time"] + [f"{stage}_ms" for stage in ALL_STAGES] + ["total_ms"])
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._csv = None
+        self.path = None
+
+    def _write(self, times, stamp):
+        ms = {stage: round(t * 1000.0, 3) for stage, t in times.items()}
+        total = round(sum(times.values()) * 1000.0, 3)
+        if self._csv is not None:
+            self._csv.writerow([self.count, round(stamp, 4)] + [ms.get(stage, "") for stage in ALL_STAGES] + [total])
+        else:
+            self._file.write(json.dumps({"frame": self.count, "time": round(stamp, 4),
+                                         "stages_ms": ms, "total_ms": total}) + "\n")
+
+    # ----- recording -----
+
+    @property
+    def active(self):
+        """True when frames should be timed (export or profiling running)."""
+        return self._file is not None or self.profiler is not None
+
+    def end_frame(self, times=None):
+        """
+        Close the current frame: keep it for the overlay, export it, count
+        down profiling. `times` adds stage times measured elsewhere (a
+        stage timed on both threads is summed).
+        """
+        now = time.perf_counter()
+        times = dict(times or {})
+        for stage, seconds in self.timer.times.items():
+            times[stage] = times.get(stage, 0.0) + seconds
+        self.frames.append(times)
+        self.ticks.append(now)
+        if self._file is not None:
+            self._write(times, time.time())
+        self.count += 1
+        if self.profiler is not None:
+            self.profile_left -= 1
+            if self.profile_left <= 0:
+                self.stop_profile()
+
+    def fps(self):
+        if len(self.ticks) < 2:
+            return 0.0
+        span = self.ticks[-1] - self.ticks[0]
+        return (len(self.ticks) - 1) / span if span > 0 else 0.0
+
+    def breakdown(self):
+        """Per stage (mean ms per frame, max ms) over the rolling window, in pipeline order."""
+        n = len(self.frames)
+        rows = []
+        for stage in ALL_STAGES:
+            samples = [times[stage] for times in self.frames if stage in times]
+            if samples:
+                rows.append((stage, 1000.0 * sum(samples) / n, 1000.0 * max(samples)))
+        return rows
+
+    # ----- profiling -----
+
+    def start_profile(self, frames=300, path="profile.prof"):
+        """Run cProfile over the next `frames` frames, then write `path` and print the top entries."""
+        if self.profiler is not None:
+            return
+        self.profile_left = frames
+        self.profile_path = path
+        with self._profile_lock:
+            self.profile_generation += 1
+            self._thread_profiles = []
+            self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def thread_profile(self):
+        """A ThreadProfile for a worker thread to join this telemetry's profiles."""
+        return ThreadProfile(self)
+
+    def _join_profile(self, generation):
+        with self._profile_lock:
+            if self.profiler is None or generation != self.profile_generation:
+                return None
+            part = (cProfile.Profile(), threading.Event())
+            self._thread_profiles.append(part)
+            return part
+
+    def stop_profile(self, wait=1.0):
+        """
+        Stop profiling and write the stats of this thread plus the worker
+        threads (each given up to `wait` seconds to stop its own profiler).
+        """
+        if self.profiler is None:
+            return None
+        self.profiler.disable()
+        with self._profile_lock:
+            profiler, self.profiler = self.profiler, None
+            parts, self._thread_profiles = self._thread_profiles, []
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out)
+        deadline = time.perf_counter() + wait
+        for part, finished in parts:
+            if finished.wait(max(0.0, deadline - time.perf_counter())):
+                stats.add(part)
+        stats.dump_stats(self.profile_path)
+        stats.sort_stats("cumulative").print_stats(25)
+        print(f"[PROFILE] wrote {self.profile_path}")
+        print(out.getvalue())
+        return self.profile_path
+
+
+class ThreadProfile():
+    """
+    Profiles one worker thread while its Telemetry profiles: call sync() on
+    that thread once per frame (it enables / disables the thread's own
+    profiler) and close() when the thread ends.
+    """
+    def __init__(self, telemetry):
+        self.telemetry = telemetry
+        self.generation = None
+        self.part = None
+
+    def sync(self):
+        telemetry = self.telemetry
+        generation = telemetry.profile_generation if telemetry.profiler is not None else None
+        if generation == self.generation:
+            return
+        self.close()
+        self.generation = generation
+        if generation is not None:
+            self.part = telemetry._join_profile(generation)
+            if self.part is not None:
+                self.part[0].enable()
+
+    def close(self):
+        if self.part is not None:
+            profiler, finished = self.part
+            profiler.disable()
+            finished.set()
+            self.part = None
+        self.generation = None
+
+
+def overlay_panel(telemetry):
+    """FPS and the rolling per-stage breakdown as a small BGR image, to paste onto frames."""
+    rows = telemetry.breakdown()
+    total = sum(mean for _, mean, _ in rows)
+    lines = [f"FPS {telemetry.fps():5.1f}  frame {total:5.1f} ms"]
+    lines += [f"{stage:<9} {mean:5.1f} / {peak:5.1f}" for stage, mean, peak in rows]
+
+    panel = np.zeros((16 * len(lines) + 7, 195, 3), np.uint8)
+    y = 14
+    for line in lines:
+        cv2.putText(panel, line, (4, y), cv2.FONT_HERSHEY_PLAIN, 1.0, (255, 255, 255), 1, cv2.LINE_AA)
+        y += 16
+    return panel
+
+
+def paste_panel(image, panel, origin=(8, 18)):
+    """Copy an overlay panel onto an image (in place), clipped to the image."""
+    x, y = origin[0] - 4, origin[1] - 14
+    h = min(panel.shape[0], image.shape[0] - y)
+    w = min(panel.shape[1], image.shape[1] - x)
+    if h > 0 and w > 0:
+        image[y:y + h, x:x + w] = panel[:h, :w]
+    return image
+
+
+def draw_overlay(image, telemetry, origin=(8, 18)):
+    """Draw FPS and the rolling per-stage breakdown onto a BGR image (in place)."""
+    return paste_panel(image, overlay_panel(telemetry), origin)
@@ -0,0 +1,41 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from board import Board
+from connect4_solver import RED, YEL
+from game_tracker import GameTracker
+
+
+def test_boards_hash_and_compare_by_content():
+    cells = np.zeros((6, 7))
+    cells[5, 3] = RED
+    board = Board(cells)
+    cells[5, 4] = YEL                        # the board keeps its own copy
+    assert board == Board(board.tolist())
+    assert board != Board.empty()
+    assert board != None                     # noqa: E711
+    assert {board: 3}[Board.from_key(board.key)] == 3
+    assert board.cells.dtype == np.int8 and not board.cells.flags.writeable
+    assert np.array_equal(board, cells * (cells == RED))
+    assert pickle.loads(pickle.dumps(board)) == board
+    with pytest.raises(ValueError):
+        Board([1, 2, 3])
+
+
+def test_board_diff_and_landing_row():
+    before = Board.empty()
+    after = Board([[0] * 7] * 5 + [[0, 0, 0, RED, 0, 0, 0]])
+    assert after.diff(before) == [(5, 3, 0, RED)]
+    assert after.tolist()[5] == [0, 0, 0, RED, 0, 0, 0]
+    assert after.pieces() == 1
+    assert after.next_open_row(3) == 4 and after.next_open_row(0) == 5
+    assert Board(np.full((6, 7), YEL)).next_open_row(2) is None
+
+
+def test_tracker_stable_board_is_a_board():
+    tracker = GameTracker(stable_frames_required=1)
+    assert tracker.update_stable_board(np.zeros((6, 7)))
+    assert isinstance(tracker.stable_board, Board)
+    assert tracker.stable_board == Board.empty()
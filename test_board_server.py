@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+from board_server import BoardServer
+
+VIDEO = "Test Videos/red_cheats.mp4"
+
+
+async def request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+                 + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    data = await reader.read()
+    writer.close()
+    return status, json.loads(data) if data else None
+
+
+async def read_events(port, until):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    await writer.drain()
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    events, kind = [], None
+    while not events or events[-1][0] != until:
+        line = (await reader.readline()).decode()
+        if line.startswith("event:"):
+            kind = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            events.append((kind, json.loads(line[len("data:"):])))
+    writer.close()
+    return events
+
+
+def test_clients_get_the_game_as_events():
+    async def run():
+        server = await BoardServer(time_budget=0.2).start(port=0)
+        try:
+            clients = [asyncio.create_task(read_events(server.port, until="end")) for _ in range(3)]
+            await asyncio.sleep(0.2)
+            server.add_source(VIDEO)
+            streams = await asyncio.wait_for(asyncio.gather(*clients), timeout=120)
+            _, state = await request(server.port, "GET", "/state")
+        finally:
+            await server.close()
+        return streams, state
+
+    streams, state = asyncio.run(run())
+    kinds = [kind for kind, _ in streams[0] if kind not in ("stats", "suggestion")]
+    assert kinds == ["state", "board", "board", "move", "board", "move", "board", "move", "cheat",
+                     "winner", "end"]
+    assert all(stream[1:] == streams[0][1:] for stream in streams)   # same events after the snapshot
+    move = dict(streams[0])["move"]
+    assert (move["row"], move["col"], move["color"]) == (2, 1, 1)
+    assert state["boards"][0]["turn"] == 3 and state["boards"][0]["status"] == "ended"
+
+
+def test_identical_analysis_requests_share_one_search():
+    board = [[0] * 7 for _ in range(6)]
+    board[5][2:5] = [2, 2, 2]
+
+    async def run():
+        server = await BoardServer().start(port=0)
+        try:
+            answers = await asyncio.gather(*[
+                request(server.port, "POST", "/analyze", {"board": board, "depth": 4}) for _ in range(3)
+            ])
+            again = await request(server.port, "POST", "/analyze", {"board": board, "depth": 4})
+            bad = await request(server.port, "POST", "/analyze", {"board": [[3] * 7] * 6})
+            analyzer = server.analyzer
+            return answers, again, bad, (analyzer.searches, analyzer.coalesced, analyzer.cache_hits)
+        finally:
+            await server.close()
+
+    answers, again, bad, counts = asyncio.run(run())
+    assert answers[0][0] == 200 and answers[0][1]["col"] in (1, 5)
+    assert all(answer == answers[0] for answer in answers) and again == answers[0]
+    assert counts == (1, 2, 1)
+    assert bad[0] == 400
+
+
+def test_analysis_requests_are_always_bounded():
+    board = [[0] * 7 for _ in range(6)]
+
+    async def run():
+        server = await BoardServer(time_budget=None).start(port=0)
+        calls = []
+        analyze = server.analyzer.analyze
+
+        async def recorded(board, ai_piece, depth, time_budget):
+            calls.append((depth, time_budget))
+            return await analyze(board, ai_piece, 1, time_budget)
+
+        server.analyzer.analyze = recorded
+        try:
+            bad = [await request(server.port, "POST", "/analyze", {"board": board, "time_budget": budget})
+                   for budget in (0, -1, "1", True, 1e400)]
+            await request(server.port, "POST", "/analyze", {"board": board, "depth": 12})
+            await request(server.port, "POST", "/analyze", {"board": board, "depth": 12, "time_budget": 60})
+            server.time_budget = 0.5
+            await request(server.port, "POST", "/analyze", {"board": board, "depth": 12})
+        finally:
+            await server.close()
+        return bad, calls
+
+    bad, calls = asyncio.run(run())
+    assert [status for status, _ in bad] == [400] * 5
+    assert calls == [(6, None), (12, 10.0), (12, 0.5)]
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import numpy as np
+
+from capture import FrameGrabber
+
+
+class FakeCapture():
+    """Delivers `frames` numbered frames as fast as asked, then stalls until released."""
+    def __init__(self, frames):
+        self.frames = frames
+        self.count = 0
+        self.stalled = threading.Event()
+        self.release_stall = threading.Event()
+
+    def read(self, image=None):
+        if self.count >= self.frames:
+            self.stalled.set()
+            self.release_stall.wait()
+            return False, None
+        frame = np.full((4, 4, 3), self.count, np.uint8)
+        self.count += 1
+        return True, frame
+
+    def get(self, prop):
+        return 0.0
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        self.release_stall.set()
+
+
+def test_read_returns_the_newest_frame_and_counts_skipped_ones():
+    cap = FakeCapture(frames=10)
+    grabber = FrameGrabber(cap, buffer_size=2, timeout=2.0)
+    assert cap.stalled.wait(2.0)             # all 10 captured, nobody reading
+
+    ok, frame = grabber.read()
+    assert ok and frame[0, 0, 0] == 9
+    assert grabber.captured == 10 and grabber.delivered == 1
+    assert grabber.dropped == 9
+    cap.release()
+    grabber.release()
+
+
+def test_stalled_source_times_out_instead_of_blocking():
+    cap = FakeCapture(frames=1)
+    grabber = FrameGrabber(cap, timeout=0.2)
+    assert grabber.read()[0]
+
+    start = time.perf_counter()
+    ok, frame = grabber.read()
+    assert not ok and frame is None
+    assert 0.15 <= time.perf_counter() - start < 1.0
+    cap.release()
+    grabber.release()
@@ -0,0 +1,35 @@
+import numpy as np
+
+from color_calibration import ColorCalibration, DEFAULT_CENTROIDS, calibration_path
+
+
+def test_default_lut_matches_nearest_centroid():
+    calib = ColorCalibration()
+    colors = np.array([[125, 140, 150], [5, 25, 160], [10, 150, 190], [120, 135, 140]])
+    assert calib.classify(colors).tolist() == [0, 1, 2, 0]
+
+
+def test_fit_follows_lighting_change():
+    # board under dimmer, bluer light: default centroids misclassify yellow
+    gain = np.array([1.3, 0.7, 0.65])
+    board = np.array([0] * 30 + [1] * 6 + [2] * 6)
+    rng = np.random.default_rng(0)
+    colors = DEFAULT_CENTROIDS[board] * gain + rng.normal(0, 3, (42, 3))
+
+    calib = ColorCalibration()
+    calib.fit(colors)
+    assert np.array_equal(calib.classify(colors), board)
+
+
+def test_empty_board_fit_scales_missing_classes(tmp_path):
+    gain = np.array([0.8, 0.8, 0.8])
+    colors = np.tile(DEFAULT_CENTROIDS[0] * gain, (42, 1))
+
+    calib = ColorCalibration()
+    calib.fit(colors)
+    assert np.allclose(calib.centroids[1], DEFAULT_CENTROIDS[1] * gain)
+
+    path = calibration_path(0, str(tmp_path))
+    calib.save(path)
+    loaded = ColorCalibration.load(path)
+    assert np.array_equal(loaded.lut, calib.lut)
@@ -4,7 +4,10 @@ from connect4_solver import (
     EMPTY,
     RED,
     YEL,
+    SearchTimeout,
     choose_best_move,
+    deepening_search,
+    search_best_move,
     is_winner,
     drop_piece_copy,
     count_immediate_wins,
@@ -197,3 +200,37 @@ def test_faster_win_preferred_over_slow_win():
 
     new_board = drop_piece_copy(board, best_col, YEL)
     assert is_winner(new_board, YEL)
+
+
+def test_iterative_deepening_matches_fixed_depth_search():
+
+    board = make_empty_board()
+    board[5][3] = RED
+    board[5][2] = YEL
+    board[4][3] = RED
+
+    best_col, score, depth = search_best_move(board, ai_piece=YEL, time_budget=5.0, max_depth=3)
+    assert depth == 3
+    assert (best_col, score) == choose_best_move(board, ai_piece=YEL, depth=3)
+
+    with pytest.raises(SearchTimeout):
+        choose_best_move(board, ai_piece=YEL, depth=4, deadline=0.0)
+    # an expired budget still answers with the depth-1 search
+    assert search_best_move(board, ai_piece=YEL, time_budget=0.0)[2] == 1
+
+
+def test_deepening_search_yields_every_finished_depth():
+
+    board = make_empty_board()
+    board[5][3] = RED
+    calls = []
+
+    def search(board, ai_piece, depth, time_left):
+        calls.append(time_left)
+        if depth == 3:
+            raise SearchTimeout()
+        return depth, float(depth)
+
+    steps = list(deepening_search(board, ai_piece=YEL, time_budget=5.0, search=search))
+    assert steps == [(1, 1.0, 1), (2, 2.0, 2)]
+    assert calls[0] is None and 0 < calls[1] <= 5.0
@@ -0,0 +1,21 @@
+from types import SimpleNamespace
+
+from connect4_gui import Connect4VideoGUI
+
+
+def idle_gui(shown_key):
+    gui = Connect4VideoGUI.__new__(Connect4VideoGUI)   # no Tk: only the render decision
+    gui.view = SimpleNamespace(key=shown_key)
+    gui.idle_interval = 100
+    gui.last_draw = 10.0
+    return gui
+
+
+def test_still_frames_are_redrawn_only_every_idle_interval():
+    gui = idle_gui(shown_key=(7, None, 0, None))
+    still = SimpleNamespace(reused=True, frame_id=8)
+    assert gui._frame_key(still, now=10.05) == 7          # same key: not redrawn
+    assert gui._frame_key(still, now=10.15) == 8          # idle interval passed
+    moving = SimpleNamespace(reused=False, frame_id=9)
+    assert gui._frame_key(moving, now=10.01) == 9
+    assert idle_gui(shown_key=None)._frame_key(still, now=10.01) == 8   # nothing shown yet
@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+import pytest
+
+from frame_store import STORE_HEADER, FrameStore, FrameStoreCapture, convert, open_capture
+from read_board import CameraFeed
+
+
+def write_video(path, frames=5, size=(80, 60)):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 20.0, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), i * 40, np.uint8))
+    writer.release()
+
+
+def test_convert_round_trip_with_zero_copy_views(tmp_path):
+    video = str(tmp_path / "clip.mp4")
+    write_video(video)
+    store = FrameStore(convert(video))
+    assert store.path.endswith("clip.c4f")
+    assert len(store) == 5 and store.frame_shape == (60, 80, 3) and store.fps == 20.0
+
+    cap = cv2.VideoCapture(video)
+    decoded = [cap.read()[1] for _ in range(5)]
+    cap.release()
+    for i, frame in enumerate(decoded):
+        assert np.array_equal(store[i], frame)
+
+    capture = open_capture(store)
+    assert isinstance(capture, FrameStoreCapture)
+    ret, first = capture.read()
+    assert ret and np.shares_memory(first, store.frames) and not first.flags.writeable
+    capture.set(cv2.CAP_PROP_POS_FRAMES, 4)
+    assert capture.read()[0] and not capture.read()[0]
+
+
+def test_camera_feed_replays_store(tmp_path):
+    video = str(tmp_path / "clip.mp4")
+    write_video(video, frames=3)
+    path = convert(video)
+    feed = CameraFeed()
+    feed.begin_feed(path)
+    assert not feed.live and feed.cap.get(cv2.CAP_PROP_FRAME_COUNT) == 3
+    frames = 0
+    while feed.capture_frame() is not None:
+        frames += 1
+    feed.close_feed()
+    assert frames == 3
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "bogus.c4f"
+    path.write_bytes(b"\0" * STORE_HEADER.size)
+    with pytest.raises(ValueError):
+        FrameStore(str(path))
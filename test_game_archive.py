@@ -0,0 +1,80 @@
+import pytest
+
+from connect4_solver import EMPTY, RED, YEL
+from game_archive import GameArchive, position_key
+
+
+def make_empty_board(rows=6, cols=7):
+    return [[EMPTY for _ in range(cols)] for _ in range(rows)]
+
+
+def play(moves):
+    board = make_empty_board()
+    for col, piece, _ in moves:
+        row = max(r for r in range(6) if board[r][col] == EMPTY)
+        board[row][col] = piece
+    return board
+
+
+RED_WINS = [(3, RED, 0.0), (2, YEL, 1.0), (3, RED, 2.0), (2, YEL, 3.0),
+            (3, RED, 4.0), (2, YEL, 5.0), (3, RED, 6.0)]
+
+
+def test_append_and_read_back(tmp_path):
+    path = str(tmp_path / "games.c4a")
+    with GameArchive(path) as archive:
+        offset = archive.append_game(RED_WINS, winner=RED, cheats=[(4, RED)], start_time=0.0)
+        game = archive.read_game(offset)
+
+    assert game.winner == RED
+    assert [(c, p) for c, p, _ in game.moves] == [(c, p) for c, p, _ in RED_WINS]
+    assert game.moves[-1][2] == pytest.approx(6.0)
+    assert game.cheats == [(4, RED)]
+
+
+def test_mirrored_positions_share_a_key():
+    board = play([(0, RED, 0), (1, YEL, 0)])
+    mirrored = [row[::-1] for row in board]
+    assert position_key(board) == position_key(mirrored)
+    assert position_key(board) != position_key(play([(0, YEL, 0), (1, RED, 0)]))
+
+
+def test_position_stats_across_games(tmp_path):
+    path = str(tmp_path / "games.c4a")
+    with GameArchive(path) as archive:
+        archive.append_game(RED_WINS, winner=RED)
+        archive.append_game(RED_WINS[:2] + [(4, RED, 2.0)], winner=None)
+        # mirror image of the first game, won by red as well
+        archive.append_game([(6 - c, p, t) for c, p, t in RED_WINS], winner=RED)
+
+        opening = play(RED_WINS[:2])
+        stats = archive.position_stats(opening)
+        assert stats.games == 3
+        assert stats.red_wins == 2
+        assert stats.no_winner == 1
+
+        hits = archive.lookup(play(RED_WINS[:5]))
+        assert sorted(ply for _, ply in hits) == [5, 5]
+
+
+def test_index_survives_reopen_and_compaction(tmp_path):
+    path = str(tmp_path / "games.c4a")
+    with GameArchive(path) as archive:
+        archive.append_game(RED_WINS, winner=RED)
+
+    with GameArchive(path) as archive:
+        archive.append_game(RED_WINS[:3], winner=YEL)
+        archive.compact()
+        assert archive.position_stats(play(RED_WINS[:3])).games == 2
+
+    with GameArchive(path) as archive:
+        stats = archive.position_stats(play(RED_WINS[:3]))
+        assert (stats.games, stats.red_wins, stats.yellow_wins) == (2, 1, 1)
+        assert len(list(archive.iter_games())) == 2
+
+
+def test_floating_piece_is_rejected():
+    board = make_empty_board()
+    board[3][2] = RED
+    with pytest.raises(ValueError):
+        position_key(board)
@@ -0,0 +1,143 @@
+import numpy as np
+
+from connect4_solver import RED, YEL
+from game_tracker import BoardWatcher, GameTracker
+
+
+def board_with(*pieces):
+    board = np.zeros((6, 7))
+    for r, c, piece in pieces:
+        board[r, c] = piece
+    return board
+
+
+def feed(tracker, board, frames):
+    changed = False
+    for _ in range(frames):
+        changed = tracker.update_stable_board(board) or changed
+    return changed
+
+
+def test_board_needs_enough_votes_to_become_stable():
+    tracker = GameTracker(stable_frames_required=5)
+    assert tracker.votes_required == 4
+    empty = board_with()
+    assert not feed(tracker, empty, 3)
+    assert feed(tracker, empty, 1)
+    assert np.array_equal(tracker.stable_board, empty)
+
+    # a missing board resets the votes
+    feed(tracker, board_with((5, 3, RED)), 3)
+    tracker.update_stable_board(None)
+    assert not feed(tracker, board_with((5, 3, RED)), 3)
+    assert feed(tracker, board_with((5, 3, RED)), 1)
+
+
+def test_lost_board_does_not_vote_with_frames_from_before():
+    tracker = GameTracker(stable_frames_required=5)
+    covered = board_with((5, 0, YEL))
+    feed(tracker, covered, 2)
+    tracker.update_stable_board(None)
+    after = board_with((5, 3, RED))
+    assert not feed(tracker, after, 3)
+    assert feed(tracker, after, 1)
+    assert np.array_equal(tracker.stable_board, after)
+
+
+def test_flickering_cell_does_not_hold_back_the_rest():
+    tracker = GameTracker(stable_frames_required=5)
+    feed(tracker, board_with(), 5)
+
+    moved = board_with((5, 3, RED))
+    flicker = board_with((5, 3, RED), (0, 6, YEL))
+    changed = [tracker.update_stable_board(b) for b in (moved, flicker, moved, flicker, moved)]
+    # the whole board is never identical 5 times, but (5, 3) has its votes
+    assert any(changed)
+    assert np.array_equal(tracker.stable_board, moved)
+
+
+def test_piece_above_an_empty_cell_waits_until_it_lands():
+    tracker = GameTracker(stable_frames_required=5)
+    feed(tracker, board_with(), 5)
+
+    # held / falling piece seen in row 3 of an empty column
+    assert not feed(tracker, board_with((3, 2, RED)), 5)
+    assert feed(tracker, board_with((5, 2, RED)), 4)
+    assert tracker.process_move() == (None, None)
+    assert (tracker.last_move_row, tracker.last_move_col) == (5, 2)
+
+
+def test_single_new_piece_is_a_move():
+    tracker = GameTracker(stable_frames_required=2)
+    feed(tracker, board_with(), 2)
+    assert feed(tracker, board_with((5, 3, RED)), 2)
+
+    assert tracker.process_move() == (None, None)
+    assert (tracker.last_move_row, tracker.last_move_col) == (5, 3)
+    assert tracker.turn_number == 1
+    assert tracker.first_mover_color == RED
+
+
+def test_same_color_twice_is_cheating():
+    tracker = GameTracker(stable_frames_required=2)
+    feed(tracker, board_with((5, 3, RED)), 2)
+    tracker.process_move()
+    feed(tracker, board_with((5, 3, RED), (5, 4, RED)), 2)
+
+    cheater, winner = tracker.process_move()
+    assert cheater == RED
+    assert winner is None
+    assert tracker.game_cheats == [(2, RED)]
+
+
+def test_two_new_pieces_are_not_a_move():
+    tracker = GameTracker(stable_frames_required=2)
+    feed(tracker, board_with(), 2)
+    feed(tracker, board_with((5, 3, RED), (5, 4, YEL)), 2)
+
+    assert tracker.process_move() == (None, None)
+    assert tracker.last_move_col is None
+    assert tracker.turn_number == 0
+
+
+def test_watcher_reports_only_changes():
+    watcher = BoardWatcher(stable_frames=2, lost_frames=2)
+
+    def kinds(board, frames=1):
+        return [event.kind for _ in range(frames) for event in watcher.update(board)]
+
+    assert kinds(board_with()) == ["found"]
+    assert kinds(board_with(), 5) == ["stable"]
+    events = [e for _ in range(2) for e in watcher.update(board_with((5, 3, RED)))]
+    assert [e.kind for e in events] == ["stable", "piece"]
+    assert (events[1].row, events[1].col, events[1].color) == (5, 3, RED)
+
+    # a single frame without a board is not "lost"
+    assert kinds(None) == [] and kinds(None) == ["lost"]
+    assert kinds(board_with((5, 3, RED))) == ["found"]
+    assert kinds(board_with((5, 3, YEL)), 2) == ["stable", "illegal"]
+
+
+def test_cleared_board_after_a_game_starts_the_next_one():
+    tracker = GameTracker(stable_frames_required=2)
+    feed(tracker, board_with((5, 3, RED)), 2)
+    tracker.process_move()
+    assert not tracker.start_next_game()     # pieces still on the board
+
+    feed(tracker, board_with(), 2)
+    assert tracker.start_next_game()
+    assert not tracker.stable_board.pieces() and tracker.turn_number == 0
+    assert feed(tracker, board_with((5, 4, YEL)), 2)
+    assert tracker.process_move() == (None, None)
+    assert tracker.first_mover_color == YEL
+
+
+def test_ignored_suggestion_only_counts_the_first_player():
+    tracker = GameTracker(stable_frames_required=1)
+    feed(tracker, board_with(), 1)
+    feed(tracker, board_with((5, 3, RED)), 1)
+    tracker.process_move()
+    assert tracker.ignored_suggestion(2) and not tracker.ignored_suggestion(3)
+    feed(tracker, board_with((5, 3, RED), (5, 4, YEL)), 1)
+    tracker.process_move()
+    assert not tracker.ignored_suggestion(2)
@@ -0,0 +1,77 @@
+import time
+
+from multi_board import FairSolver, MultiBoardMonitor, parse_source
+
+
+def wait_for(solver, timeout=30.0):
+    results = []
+    deadline = time.time() + timeout
+    while solver.busy() and time.time() < deadline:
+        results.extend(solver.poll())
+        time.sleep(0.005)
+    return results
+
+
+def test_parse_source():
+    assert parse_source("2") == 2
+    assert parse_source("Test Videos/obvious_win.mp4") == "Test Videos/obvious_win.mp4"
+
+
+def test_newer_position_replaces_waiting_one():
+    empty = [[0] * 7 for _ in range(6)]
+    one = [row[:] for row in empty]
+    one[5][3] = 1
+    two = [row[:] for row in one]
+    two[5][4] = 2
+
+    solver = FairSolver(workers=1, depth=2)
+    try:
+        solver.submit(0, empty)
+        solver.poll()                 # board 0 starts searching
+        solver.submit(0, one)
+        solver.submit(0, two)         # replaces `one` while it waits
+        boards = [board for _, board, _, _, _ in wait_for(solver)]
+    finally:
+        solver.shutdown()
+    assert boards == [empty, two]
+
+
+def test_boards_are_served_round_robin():
+    empty = [[0] * 7 for _ in range(6)]
+    solver = FairSolver(workers=1, depth=2)
+    try:
+        order = []
+        for board_id in (0, 0, 1, 2):
+            solver.submit(board_id, empty)
+        # board 0 keeps resubmitting, but 1 and 2 still get their turn
+        deadline = time.time() + 30
+        while len(order) < 4 and time.time() < deadline:
+            for board_id, *_ in solver.poll():
+                order.append(board_id)
+                solver.submit(0, empty)
+            time.sleep(0.005)
+    finally:
+        solver.shutdown()
+    assert order[:3] == [0, 1, 2]
+
+
+def test_source_that_does_not_open_ends_the_board():
+    monitor = MultiBoardMonitor(["no such video.mp4"], dashboard=False)
+    start = time.time()
+    monitor.run()
+    assert time.time() - start < 30.0
+    assert monitor.boards[0].ended
+    assert "Failed to open" in monitor.boards[0].status
+
+
+def test_failed_search_is_reported_for_its_board_only():
+    empty = [[0] * 7 for _ in range(6)]
+    solver = FairSolver(workers=1, depth=2)
+    try:
+        solver.submit(0, [])                 # not a board: the search raises
+        solver.submit(1, empty)
+        results = {result.board_id: result for result in wait_for(solver)}
+    finally:
+        solver.shutdown()
+    assert results[0].col is None and "IndexError" in results[0].error
+    assert results[1].error is None and results[1].col is not None
@@ -0,0 +1,156 @@
+import pstats
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from board import Board
+from connect4_solver import YEL, choose_best_move
+from game_tracker import BoardWatcher
+from pipeline import AnalysisWorker, LatestValue, SolverWorker, display_frame
+from read_board import CameraFeed
+from telemetry import Telemetry
+
+VIDEO = "Test Videos/obvious_win.mp4"
+
+
+def test_latest_value_keeps_only_the_newest():
+    slot = LatestValue()
+    assert slot.poll() is None
+    for i in range(5):
+        slot.put(i)
+    assert slot.dropped == 4
+    assert slot.take(timeout=0.1) == 4
+    assert slot.take(timeout=0.05) is None
+
+    threading.Timer(0.05, slot.put, args=("late",)).start()
+    assert slot.take(timeout=2.0) == "late"
+    slot.close()
+    assert slot.take() is None
+
+
+def test_display_frame_matches_draw_keypoints():
+    frame = np.full((120, 160, 3), 90, np.uint8)
+    keypoints = [cv2.KeyPoint(40.3, 50.6, 22.0), cv2.KeyPoint(100.0, 60.0, 15.5)]
+    expected = cv2.drawKeypoints(frame, keypoints, np.array([]), (0, 0, 255),
+                                 cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
+    assert np.array_equal(display_frame(frame, keypoints), expected)
+
+    small = display_frame(frame, keypoints, scale=0.5, rgb=True)
+    assert small.shape == (60, 80, 3)
+    assert small[25, 20 - 5, 0] > small[25, 20 - 5, 2]   # red circle, in RGB order
+
+
+def test_analysis_worker_streams_results_and_every_event():
+    feed = CameraFeed(lock_grid=True, roi_margin=0.1)
+    feed.begin_feed(VIDEO)
+    worker = AnalysisWorker(feed, BoardWatcher(stable_frames=5))
+    results = []
+    while True:
+        result = worker.results.take(timeout=5.0)
+        assert result is not None and result.error is None
+        if result.ended:
+            break
+        results.append(result)
+        time.sleep(0.02)                     # a slow consumer skips frames instead of queueing them
+    worker.stop()
+    feed.close_feed()
+
+    assert results and worker.results.dropped > 0
+    assert len(results) + worker.results.dropped >= worker.frames
+    assert [r.frame_id for r in results] == sorted(r.frame_id for r in results)
+    events = [(e.kind, e.row, e.col, e.color) for e in worker.drain_events()]
+    assert events == [("found", None, None, None), ("stable", None, None, None),
+                      ("stable", None, None, None), ("piece", 5, 5, 2)]
+    assert np.array_equal(results[-1].stable, worker.watcher.stable_board)
+
+
+def test_reset_drops_earlier_events_and_runs_on_the_worker():
+    feed = CameraFeed(lock_grid=True, roi_margin=0.1)
+    feed.begin_feed(VIDEO)
+    threads = []
+    feed.recalibrate = lambda: threads.append(threading.current_thread().name)
+    worker = AnalysisWorker(feed, BoardWatcher(stable_frames=5))
+    while worker.events.empty():
+        time.sleep(0.01)
+
+    worker.reset()
+    worker.recalibrate()
+    assert worker.drain_events() == []       # analyzed before the reset
+    events = []
+    deadline = time.perf_counter() + 10.0
+    while not events and time.perf_counter() < deadline:
+        time.sleep(0.05)
+        events = worker.drain_events()
+    worker.stop()
+    feed.close_feed()
+
+    assert events and events[0].kind == "found"   # the watcher started over
+    assert threads == ["AnalysisWorker"]
+
+
+def test_solver_worker_answers_the_newest_position():
+    board = np.zeros((6, 7))
+    board[5, 0:3] = YEL
+    solver = SolverWorker(depth=2, processes=False)
+    solver.request(board)
+    suggestion = solver.results.take(timeout=10.0)
+    solver.stop()
+
+    assert suggestion.error is None and np.array_equal(suggestion.board, board)
+    assert suggestion.col == choose_best_move(board.tolist(), ai_piece=YEL, depth=2)[0] == 3
+
+
+def test_solver_worker_deepens_and_caches_positions():
+    board = np.zeros((6, 7))
+    board[5, 3] = YEL
+    board[5, 2] = 1
+    solver = SolverWorker(depth=3, processes=False, time_budget=10.0)
+    solver.request(board)
+    depths = []
+    while not depths or depths[-1] < 3:
+        suggestion = solver.results.take(timeout=10.0)
+        assert suggestion is not None and suggestion.error is None
+        depths.append(suggestion.depth)
+    assert depths == sorted(depths)
+    assert suggestion.col == choose_best_move(board.tolist(), ai_piece=YEL, depth=3)[0]
+
+    solver.request(board.copy())
+    again = solver.results.take(timeout=10.0)
+    solver.stop()
+    assert again.depth == 3 and again.col == suggestion.col
+    assert solver.searches == 1 and solver.cache_hits == 1
+
+
+def test_solver_warm_up_caches_the_opening_position():
+    solver = SolverWorker(depth=2, processes=False, time_budget=10.0)
+    solver.warm_up()
+    depth = 0
+    while depth < 2:
+        depth = solver.results.take(timeout=10.0).depth
+    while solver.searching:
+        time.sleep(0.01)
+    solver.request(np.zeros((6, 7)))
+    first = solver.results.take(timeout=10.0)
+    solver.stop()
+    assert first.depth == 2 and first.board == Board.empty()
+    assert solver.searches == 1 and solver.cache_hits == 1
+
+
+def test_profile_covers_the_analysis_thread(tmp_path, capsys):
+    feed = CameraFeed(lock_grid=True, roi_margin=0.1)
+    feed.begin_feed(VIDEO)
+    worker = AnalysisWorker(feed, BoardWatcher(stable_frames=5))
+    telemetry = Telemetry()
+    worker.profile = telemetry.thread_profile()
+    path = str(tmp_path / "gui.prof")
+    telemetry.start_profile(frames=1000, path=path)
+    for _ in range(5):
+        assert worker.results.take(timeout=5.0) is not None
+    telemetry.stop_profile()
+    worker.stop()
+    feed.close_feed()
+
+    functions = {name for _, _, name in pstats.Stats(path).stats}
+    assert "analyze_frame" in functions
@@ -0,0 +1,278 @@
+import asyncio
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from read_board import COLOR_MAP, CameraFeed, MotionGate, StageTimer, classify_colors, fit_grid
+from synthetic_board import BoardRenderer, random_position
+
+VIDEO = "Test Videos/obvious_win.mp4"
+
+
+def test_custom_gray_matches_weighted_sum():
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (48, 64, 3), dtype=np.uint8)
+    expected = np.clip(frame.astype(np.float64) @ [0.1, 0.8, 1.0], 0, 255)
+    out = np.empty((48, 64), np.uint8)
+    gray = CameraFeed.custom_gray(frame, out)
+    assert gray is out
+    assert np.abs(gray - expected).max() <= 1
+
+
+def test_classify_colors_picks_nearest_reference():
+    rng = np.random.default_rng(1)
+    colors = rng.uniform(0, 255, (500, 3))
+    dists = np.linalg.norm(colors[:, None, :] - COLOR_MAP[None, :, :], axis=2)
+    assert np.array_equal(classify_colors(colors), np.argmin(dists, axis=1))
+
+
+def tilted_lattice(roll=12.0, rows=6, columns=7):
+    """Hole centers of a board seen at an angle, shuffled, with their true cells."""
+    lattice = np.array([[c, r] for r in range(rows) for c in range(columns)], np.float32)
+    quad = np.float32([[100, 60], [540, 30], [520, 440], [90, 400]])
+    corners = np.float32([[0, 0], [columns - 1, 0], [columns - 1, rows - 1], [0, rows - 1]])
+    points = cv2.perspectiveTransform(lattice[None], cv2.getPerspectiveTransform(corners, quad))[0]
+    angle = np.radians(roll)
+    points = points @ np.array([[np.cos(angle), np.sin(angle)], [-np.sin(angle), np.cos(angle)]])
+    order = np.random.default_rng(0).permutation(rows * columns)
+    return points[order], order
+
+
+def test_fit_grid_orders_a_tilted_board():
+    points, order = tilted_lattice()
+    grid = fit_grid(points, 6, 7)
+    # grid[r, c] is the shuffled index of the point that started as cell r * 7 + c
+    assert np.array_equal(order[grid], np.arange(42).reshape(6, 7))
+    assert np.array_equal(CameraFeed.order_grid(points, 6, 7), grid)
+
+
+def test_fit_grid_rejects_a_stray_blob():
+    points, _ = tilted_lattice()
+    points[5] += [30, 20]                    # a blob between holes instead of one of them
+    assert fit_grid(points, 6, 7) is None
+    assert fit_grid(points[:41], 6, 7) is None
+
+
+def test_locked_frames_reuse_buffers():
+    feed = CameraFeed(lock_grid=True)
+    feed.begin_feed(VIDEO)
+    for _ in range(20):
+        frame, _, board_state, _ = feed.analyze_frame()
+    assert board_state is not None
+
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(30):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            next_frame = feed.analyze_frame()[0]
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+        feed.close_feed()
+
+    # frames are decoded into the same array
+    assert np.shares_memory(frame, next_frame)
+    # nothing frame sized (640x480x3 = 900 KB) is allocated per frame
+    assert sorted(peaks)[len(peaks) // 2] < 16 * 1024
+
+
+def test_stage_timer_marks_the_stages_that_ran():
+    feed = CameraFeed(lock_grid=True)
+    feed.stage_timer = StageTimer()
+    feed.begin_feed(VIDEO)
+    try:
+        frames = []
+        for _ in range(10):
+            feed.analyze_frame()
+            frames.append(dict(feed.stage_timer.times))
+    finally:
+        feed.close_feed()
+
+    # full detection first, then the locked grid only samples colors
+    assert set(frames[0]) == {"decode", "gray", "detect", "grid", "sample", "classify"}
+    assert set(frames[-1]) == {"decode", "drift", "sample", "classify"}
+    assert all(t >= 0 for t in frames[0].values())
+
+
+def test_events_stream_the_move():
+    feed = CameraFeed(lock_grid=True, roi_margin=0.1)
+    feed.begin_feed(VIDEO)
+    events = [(e.kind, e.row, e.col, e.color) for e in feed.events()]
+    feed.close_feed()
+    assert events == [("found", None, None, None), ("stable", None, None, None),
+                      ("stable", None, None, None), ("piece", 5, 5, 2)]
+
+
+def test_async_events_match():
+    async def collect():
+        feed = CameraFeed(lock_grid=True, roi_margin=0.1)
+        feed.begin_feed(VIDEO)
+        kinds = [event.kind async for event in feed.async_events()]
+        feed.close_feed()
+        return kinds
+
+    assert asyncio.run(collect()) == ["found", "stable", "stable", "piece"]
+
+
+def first_frame(path=VIDEO):
+    cap = cv2.VideoCapture(path)
+    ok, frame = cap.read()
+    cap.release()
+    assert ok
+    return frame
+
+
+def test_motion_gate_reuses_still_frames():
+    frame = first_frame()
+    feed = CameraFeed(lock_grid=True, motion_gate=True)
+    reused = []
+    for _ in range(20):
+        result = feed.analyze(frame)
+        reused.append(feed.analysis_reused)
+    assert not any(reused[:feed.motion_gate.settle_frames])
+    assert all(reused[-5:])
+    assert result[1] == feed.analyze(frame)[1]
+
+
+def test_motion_gate_reanalyzes_on_change():
+    frame = first_frame()
+    feed = CameraFeed(lock_grid=True, motion_gate=True)
+    for _ in range(20):
+        feed.analyze(frame)
+    assert feed.analysis_reused
+
+    moved = frame.copy()
+    h, w = moved.shape[:2]
+    cv2.rectangle(moved, (0, 0), (w // 3, h // 3), (255, 255, 255), -1)   # a hand over the board
+    feed.analyze(moved)
+    assert feed.motion_gate.moving and not feed.analysis_reused
+
+
+def test_motion_gate_refreshes_a_still_board():
+    gate = MotionGate(settle_frames=2, refresh_interval=5)
+    frame = np.full((48, 64, 3), 80, np.uint8)
+    gate.update(frame)
+    assert gate.moving and gate.should_analyze()
+    for _ in range(3):
+        gate.update(frame)
+        gate.analyzed(None)
+    assert not gate.moving and not gate.should_analyze()
+    gate.since_analysis = 5
+    assert gate.should_analyze()
+
+
+def counting_detection(feed):
+    calls = []
+    detect = feed.detect_keypoints
+
+    def counted(frame):
+        calls.append(1)
+        return detect(frame)
+
+    feed.detect_keypoints = counted
+    return calls
+
+
+def test_grid_lock_is_reused_on_matching_frames():
+    frame = first_frame()
+    feed = CameraFeed(lock_grid=True)
+    calls = counting_detection(feed)
+    _, board, positions = feed.analyze(frame)
+    lock = feed.grid_lock
+    assert lock is not None and len(calls) == 1
+
+    for _ in range(3):
+        _, again, locked_positions = feed.analyze(frame)
+    assert feed.grid_lock is lock and lock.frames == 3 and len(calls) == 1
+    assert again == board and locked_positions is positions
+
+
+def test_probe_drift_relocks_the_grid():
+    frame = first_frame()
+    feed = CameraFeed(lock_grid=True)
+    calls = counting_detection(feed)
+    _, board, positions = feed.analyze(frame)
+    lock = feed.grid_lock
+
+    # board shifted by half a hole spacing: holes now sit under the probes
+    dx = int(round((positions[0, 1, 0] - positions[0, 0, 0]) / 2))
+    dy = int(round((positions[1, 0, 1] - positions[0, 0, 1]) / 2))
+    moved = np.ascontiguousarray(np.roll(frame, (dy, dx), axis=(0, 1)))
+    assert lock.drifted(moved, feed.drift_threshold, feed.drift_fraction)
+    _, moved_board, moved_positions = feed.analyze(moved)
+    assert len(calls) == 2
+    assert feed.grid_lock is not None and feed.grid_lock is not lock
+    assert moved_board == board
+    assert np.allclose(moved_positions - positions, (dx, dy), atol=2)
+
+
+def test_hand_over_a_locked_board_is_not_read_as_pieces():
+    renderer = BoardRenderer(seed=1)
+    covered = 0
+    for _ in range(20):
+        board = random_position(renderer.rng)
+        scene = dict(renderer.random_scene(), occluded=False)
+        feed = CameraFeed(lock_grid=True)
+        feed.analyze(renderer.render(board, scene)[0].copy())
+        if feed.grid_lock is None:
+            continue
+        frame, truth = renderer.render(board, dict(scene, occluded=True))   # same pose, hand in front
+        if not truth["occluded"].any():
+            continue
+        covered += 1
+        _, board_state, _ = feed.analyze(frame)
+        assert board_state is None or np.array_equal(board_state, board)
+    assert covered >= 10
+
+
+def mask_mean_color(frame, keypoint):
+    """Per-cell mean as read_board computed it before CellSampler: a full-frame circle mask."""
+    x, y = keypoint.pt
+    mask = np.zeros(frame.shape[:2], dtype=np.uint8)
+    cv2.circle(mask, (int(x), int(y)), int(keypoint.size / 2), 255, -1)
+    return cv2.mean(frame, mask=mask)[:3]
+
+
+def test_cell_sampler_matches_the_per_cell_mask_mean():
+    feed = CameraFeed(lock_grid=True)
+    feed.begin_feed(VIDEO)
+    try:
+        for _ in range(250):                 # past the first moves: all three colors on the board
+            frame, _, board_state, _ = feed.analyze_frame()
+    finally:
+        feed.close_feed()
+    lock = feed.grid_lock
+    assert lock is not None
+
+    expected = np.array([mask_mean_color(frame, lock.keypoints[i]) for i in lock.grid.reshape(-1)])
+    means = lock.sampler.mean_colors(frame)
+    assert np.abs(means - expected).max() < 3.0
+    assert np.array_equal(classify_colors(means), classify_colors(expected))
+    assert np.array_equal(board_state, classify_colors(expected).reshape(lock.grid.shape))
+    assert set(classify_colors(expected)) == {0, 1, 2}
+
+
+def test_scaled_and_cropped_detection_map_back_to_full_resolution():
+    frame = first_frame()
+    _, board, positions = CameraFeed().analyze(frame)
+    assert positions is not None
+
+    _, scaled_board, scaled_positions = CameraFeed(detection_scale=0.5).analyze(frame)
+    assert scaled_board == board
+    assert np.abs(scaled_positions - positions).max() <= 2.0
+
+    feed = CameraFeed(roi_margin=0.1)
+    feed.analyze(frame)                      # full frame; sets the ROI
+    x0, y0, x1, y1 = feed.board_roi
+    assert (x1 - x0) * (y1 - y0) < frame.shape[0] * frame.shape[1]
+    _, roi_board, roi_positions = feed.analyze(frame)
+    assert roi_board == board
+    assert np.abs(roi_positions - positions).max() <= 1.0
+
+    feed = CameraFeed(detection_scale=0.5, roi_margin=0.1)
+    feed.analyze(frame)
+    _, both_board, both_positions = feed.analyze(frame)
+    assert both_board == board and np.abs(both_positions - positions).max() <= 2.0
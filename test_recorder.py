@@ -0,0 +1,93 @@
+import json
+import threading
+
+import cv2
+import numpy as np
+
+from recorder import Recorder
+
+
+def read_sidecar(path):
+    return [json.loads(line) for line in open(path)]
+
+
+def test_frames_and_sidecar_line_up(tmp_path):
+    path = str(tmp_path / "game.mp4")
+    recorder = Recorder(path, fps=20.0)
+    frame = np.zeros((120, 160, 3), np.uint8)
+    board = np.zeros((6, 7))
+    board[5, 3] = 1
+    for i in range(10):
+        frame[:] = i * 20
+        recorder.write(frame, timestamp=100.0 + i / 20, board=board, suggestion=np.int64(3))
+    recorder.close()
+
+    records = read_sidecar(recorder.sidecar_path)
+    assert records[0]["type"] == "header" and records[0]["size"] == [160, 120]
+    frames = records[1:-1]
+    assert [r["frame"] for r in frames] == list(range(10))
+    assert frames[1]["t"] == 0.05
+    assert frames[0]["board"][5][3] == 1 and frames[0]["suggestion"] == 3
+    assert records[-1] == {"type": "summary", "frames": 10, "dropped": 0, "fps": 20.0}
+
+    cap = cv2.VideoCapture(path)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 10
+    cap.release()
+
+
+def test_video_plays_at_the_rate_frames_were_recorded(tmp_path):
+    path = str(tmp_path / "analyzed.mp4")
+    recorder = Recorder(path, fps=30.0)      # the camera's rate; only every 6th frame arrives
+    frame = np.zeros((120, 160, 3), np.uint8)
+    for i in range(12):
+        frame[:] = i * 20
+        recorder.write(frame, timestamp=i / 5)
+    recorder.close(wait=False)
+    recorder.join(timeout=10.0)
+
+    assert read_sidecar(recorder.sidecar_path)[-1]["fps"] == 5.0
+    cap = cv2.VideoCapture(path)
+    assert cap.get(cv2.CAP_PROP_FPS) == 5.0
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 12
+    ok, first = cap.read()
+    assert ok and first[0, 0, 0] < 5         # still the first frame
+    cap.release()
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    recorder = Recorder(str(tmp_path / "slow.mp4"), queue_size=2)
+    gate = threading.Event()
+    real_write = recorder._open_writer
+
+    def stalled_open(frame):
+        gate.wait()
+        real_write(frame)
+
+    recorder._open_writer = stalled_open
+    frame = np.zeros((60, 80, 3), np.uint8)
+    results = [recorder.write(frame) for _ in range(10)]
+    gate.set()
+    recorder.close()
+
+    assert not all(results)
+    assert recorder.written + recorder.dropped == 10
+    assert read_sidecar(recorder.sidecar_path)[-1]["frames"] == recorder.written
+
+
+def test_encoder_error_does_not_block_close(tmp_path):
+    recorder = Recorder(str(tmp_path / "broken.mp4"), queue_size=2)
+
+    def broken_open(frame):
+        raise RuntimeError("no encoder")
+
+    recorder._open_writer = broken_open
+    frame = np.zeros((60, 80, 3), np.uint8)
+    for _ in range(20):
+        recorder.write(frame)
+    closer = threading.Thread(target=recorder.close)
+    closer.start()
+    closer.join(timeout=5.0)
+
+    assert not closer.is_alive()
+    assert recorder.written == 0 and recorder.error == "no encoder"
+    assert read_sidecar(recorder.sidecar_path)[-1]["error"] == "no encoder"
@@ -0,0 +1,31 @@
+import threading
+import time
+
+import pytest
+
+from startup import Startup
+
+
+def test_steps_run_in_parallel_and_report_their_times():
+    startup = Startup()
+    release = threading.Event()
+    startup.run("slow", release.wait, 5.0)
+    startup.run("fast", lambda: 42)
+    assert startup.wait("fast", timeout=5.0)
+    assert startup.result("fast") == 42 and not startup.done("slow")
+
+    release.set()
+    assert startup.wait("slow", timeout=5.0)
+    assert list(startup.marks) == ["fast", "slow"]
+    assert startup.mark("first frame") and not startup.mark("first frame")
+    assert startup.report().startswith("fast 0.")
+
+
+def test_failed_step_raises_its_error_when_taken():
+    startup = Startup(start=time.perf_counter() - 1.0)
+    startup.run("camera", lambda: 1 / 0)
+    assert startup.wait("camera", timeout=5.0)
+    with pytest.raises(ZeroDivisionError):
+        startup.result("camera")
+    assert startup.marks["camera"] >= 1.0
+    assert "camera failed" in startup.report()
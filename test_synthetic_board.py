@@ -0,0 +1,51 @@
+import json
+
+import cv2
+import numpy as np
+
+from read_board import CameraFeed
+from synthetic_board import PLAIN, BoardRenderer, Variation, generate, random_position, write_video
+
+
+def test_plain_frame_is_read_exactly():
+    renderer = BoardRenderer(variation=PLAIN, seed=4)
+    board = random_position(np.random.default_rng(4), moves=17)
+    frame, truth = renderer.render(board)
+
+    _, board_state, positions = CameraFeed().analyze(frame)
+    assert np.array_equal(board_state, board)
+    assert np.abs(positions - truth["centers"]).max() < 1.5
+    assert truth["visible"] and not truth["occluded"].any()
+
+
+def test_positions_obey_gravity_and_frames_repeat_with_seed():
+    board = random_position(np.random.default_rng(0), moves=20)
+    assert np.count_nonzero(board == 1) == 10 and np.count_nonzero(board == 2) == 10
+    # no piece floats above an empty cell
+    assert not np.any((board[:-1] != 0) & (board[1:] == 0))
+
+    first = [(frame.copy(), truth) for frame, truth in generate(3, seed=9)]
+    second = [(frame.copy(), truth) for frame, truth in generate(3, seed=9)]
+    for (f1, t1), (f2, t2) in zip(first, second):
+        assert np.array_equal(f1, f2) and np.array_equal(t1["board"], t2["board"])
+
+
+def test_hand_marks_covered_cells():
+    renderer = BoardRenderer(variation=Variation(occlusion=1.0), seed=1)
+    covered = [renderer.render(np.zeros((6, 7), np.int8))[1]["occluded"].any() for _ in range(10)]
+    assert any(covered)
+
+
+def test_video_and_sidecar_line_up(tmp_path):
+    path = str(tmp_path / "synth.mp4")
+    sidecar = write_video(path, 6, seed=2, hold=3, size=(320, 240))
+    records = [json.loads(line) for line in open(sidecar)]
+    assert records[0]["type"] == "header" and records[0]["size"] == [320, 240]
+    frames = records[1:-1]
+    assert [r["frame"] for r in frames] == list(range(6))
+    assert frames[0]["board"] == frames[2]["board"] and len(frames[0]["centers"]) == 6
+    assert records[-1]["frames"] == 6
+
+    cap = cv2.VideoCapture(path)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 6
+    cap.release()
@@ -0,0 +1,61 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from telemetry import Telemetry, draw_overlay
+
+
+def run_frames(telemetry, frames):
+    for _ in range(frames):
+        telemetry.timer.start()
+        telemetry.timer.mark("decode")
+        telemetry.timer.mark("detect")
+        telemetry.timer.mark("render")
+        telemetry.end_frame()
+
+
+def test_jsonl_export(tmp_path):
+    path = str(tmp_path / "timing.jsonl")
+    telemetry = Telemetry(path=path)
+    run_frames(telemetry, 3)
+    telemetry.close()
+
+    records = [json.loads(line) for line in open(path)]
+    assert [r["frame"] for r in records] == [0, 1, 2]
+    assert set(records[0]["stages_ms"]) == {"decode", "detect", "render"}
+
+
+def test_csv_export_has_fixed_columns(tmp_path):
+    path = str(tmp_path / "timing.csv")
+    telemetry = Telemetry(path=path)
+    run_frames(telemetry, 2)
+    telemetry.close()
+
+    rows = list(csv.DictReader(open(path)))
+    assert len(rows) == 2
+    assert rows[0]["grid_ms"] == ""          # stage that did not run
+    assert float(rows[0]["detect_ms"]) >= 0
+
+
+def test_breakdown_and_overlay():
+    telemetry = Telemetry(window=5)
+    assert not telemetry.active
+    run_frames(telemetry, 10)
+
+    assert len(telemetry.frames) == 5
+    assert [stage for stage, _, _ in telemetry.breakdown()] == ["decode", "detect", "render"]
+    assert telemetry.fps() > 0
+    image = np.zeros((240, 320, 3), np.uint8)
+    assert draw_overlay(image, telemetry).any()
+
+
+def test_profile_stops_after_window(tmp_path, capsys):
+    path = str(tmp_path / "gui.prof")
+    telemetry = Telemetry()
+    telemetry.start_profile(frames=3, path=path)
+    assert telemetry.active
+    run_frames(telemetry, 3)
+    assert not telemetry.active
+    assert os.path.exists(path)
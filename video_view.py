@@ -0,0 +1,44 @@
+import cv2
+from PIL import Image, ImageTk
+
+# Tk video display.
+#
+# VideoView keeps one PhotoImage per display size and pastes every new frame
+# into it, instead of building a PIL image, a new PhotoImage and a label
+# reconfigure each tick. Frames come in at display size (pipeline.display_frame
+# scales them off the Tk thread); a frame shown under the same `key` as the
+# last one is skipped, so callers can pass (frame id, overlay state) and let
+# unchanged ticks cost nothing.
+#
+#   view = VideoView(label)
+#   view.show(rgb_image, key=(result.frame_id, overlay_key))
+
+
+class VideoView():
+    def __init__(self, label):
+        self.label = label
+        self.photo = None
+        self.key = None
+        self.shown = 0
+        self.skipped = 0
+
+    def show(self, image, key=None, bgr=False):
+        """
+        Put a display-size image (RGB, or BGR with `bgr`) on the label.
+        Returns False when `key` matches the image already shown.
+        """
+        if key is not None and key == self.key:
+            self.skipped += 1
+            return False
+        if bgr:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        h, w = image.shape[:2]
+        img = Image.frombuffer("RGB", (w, h), image, "raw", "RGB", 0, 1)
+        if self.photo is None or (self.photo.width(), self.photo.height()) != (w, h):
+            self.photo = ImageTk.PhotoImage(image=img)
+            self.label.config(image=self.photo)
+        else:
+            self.photo.paste(img)
+        self.key = key
+        self.shown += 1
+        return True